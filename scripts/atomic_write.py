@@ -0,0 +1,27 @@
+import os
+import stat
+import tempfile
+
+# Returns the permissions open() gives to a new file, as the umask can only be read by setting it
+def get_new_file_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# Writes the content to a temporary file next to the file, renamed over it once complete,
+# so an interrupted run never leaves a half written file. The temporary file is created
+# readable by its owner only, it gets the permissions of the file it replaces, or those
+# of a new file when there is none.
+def write_file_atomically(file_path : str, content : str, encoding : str = None):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), suffix='.tmp')
+    try:
+        if os.path.exists(file_path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+        else:
+            os.chmod(tmp_path, get_new_file_mode())
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
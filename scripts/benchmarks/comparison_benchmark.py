@@ -0,0 +1,44 @@
+import argparse
+import sys
+from compare_language_reports import ComparisonReport
+from benchmarks.run_benchmarks import best_time
+
+# Times the comparison of the keys of two reports, for a number of keys and for that
+# number times -factor, spread over a few scopes. The flattening of the keys used to be
+# the product of the scope sizes, six scopes of dozens of keys being then intractable.
+# Usage (from the scripts folder):
+#   python -m benchmarks.comparison_benchmark [-keys 1000 -factor 16 -scopes 6]
+# It fails when the larger comparison costs more than 4 times the factor (slack for noisy runners).
+
+MAX_SLOWDOWN = 4
+
+def make_keys(scopes : int, keys_per_scope : int, offset : int = 0) -> dict:
+    return {f'$Scope{s}': [f'key-{k}' for k in range(offset, offset + keys_per_scope)] for s in range(scopes)}
+
+# Returns the best time of the comparison of two reports of a locale with keys spread over the scopes
+def time_process(scopes : int, keys : int, repeat : int) -> float:
+    baseline = {'xx': make_keys(scopes, keys // scopes)}
+    target = {'xx': make_keys(scopes, keys // scopes, offset=3)}
+    return best_time(lambda: ComparisonReport.process(baseline, target), repeat)
+
+def get_arguments(argv : list = None):
+    parser = argparse.ArgumentParser(description="Checks that comparing reports scales linearly with the number of keys.")
+    parser.add_argument("-keys", type=int, default=1000, help="Number of keys of the smaller comparison")
+    parser.add_argument("-factor", type=int, default=16, help="Number of keys of the larger comparison, as a factor of -keys")
+    parser.add_argument("-scopes", type=int, default=6, help="Number of scopes")
+    parser.add_argument("-repeat", type=int, default=5, help="Runs per comparison, the best one is kept")
+    return parser.parse_args(argv)
+
+def main(argv : list = None):
+    args = get_arguments(argv)
+    small_time = time_process(args.scopes, args.keys, args.repeat)
+    large_time = time_process(args.scopes, args.keys * args.factor, args.repeat)
+    print(f'{args.keys} keys: {small_time:.4f}s')
+    print(f'{args.keys * args.factor} keys: {large_time:.4f}s ({large_time / small_time:.1f}x)')
+    sys.stdout.flush()
+    if large_time > small_time * args.factor * MAX_SLOWDOWN:
+        print(f'Problem: {args.factor}x more keys cost more than {args.factor * MAX_SLOWDOWN}x the time')
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
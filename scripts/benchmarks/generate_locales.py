@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import random
+import string
+
+# Generates a synthetic locales/ tree, together with the language configuration file,
+# to measure the localization scripts under load.
+# Usage (from the scripts folder):
+#   python -m benchmarks.generate_locales -output <dir> -locales 28 -scopes 10 -keys 20
+
+LOCALES_DIR = 'locales'
+CONFIG_FILE = os.path.join('src', 'configs', 'app.config.mjs')
+BASELINE_LANGUAGE = 'en'
+
+# Returns a code only made of letters, as expected when parsing the configuration file
+def get_locale_code(index : int) -> str:
+    code = ''
+    for _ in range(3):
+        index, letter = divmod(index, len(string.ascii_lowercase))
+        code = string.ascii_lowercase[letter] + code
+    return code
+
+# Strings are padded with words up to value_length characters, like long help texts
+def get_baseline(scopes : int, keys_per_scope : int, value_length : int = 0) -> dict:
+    return {f'$Scope{scope}': {f'key-{key}': get_value(f'English string {key} of scope {scope}', value_length)
+                               for key in range(keys_per_scope)}
+            for scope in range(scopes)}
+
+def get_value(value : str, value_length : int) -> str:
+    if len(value) >= value_length:
+        return value
+    padding = ' lorem ipsum' * (1 + (value_length - len(value)) // 12)
+    return (value + padding)[:value_length].rstrip()
+
+def get_language(locale : str, baseline : dict, untranslated_ratio : float, rng : random.Random) -> dict:
+    return {scope: {key: value if rng.random() < untranslated_ratio else f'{value} ({locale})'
+                    for key, value in entries.items()}
+            for scope, entries in baseline.items()}
+
+def write_json(file_path : str, content : dict):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w', encoding='utf8') as f:
+        json.dump(content, f, ensure_ascii=False, indent=4)
+
+# Writes the locales and configuration file under output, returning the generated locale codes
+def generate_locales(output : str, locales : int, scopes : int, keys_per_scope : int,
+                     untranslated_ratio : float = 0.1, seed : int = 0, value_length : int = 0) -> list:
+    rng = random.Random(seed)
+    baseline = get_baseline(scopes, keys_per_scope, value_length)
+    write_json(os.path.join(output, LOCALES_DIR, BASELINE_LANGUAGE, 'translation.json'), baseline)
+    codes = [get_locale_code(index) for index in range(locales)]
+    for code in codes:
+        language = get_language(code, baseline, untranslated_ratio, rng)
+        write_json(os.path.join(output, LOCALES_DIR, code, 'translation.json'), language)
+
+    config_file = os.path.join(output, CONFIG_FILE)
+    os.makedirs(os.path.dirname(config_file), exist_ok=True)
+    with open(config_file, 'w', encoding='utf8') as f:
+        f.write('const languages = {\n')
+        f.write(f"    '{BASELINE_LANGUAGE}': 'English',\n")
+        f.writelines(f"    '{code}': 'Language {code.upper()}',\n" for code in codes)
+        f.write('};\n')
+    return codes
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="Generates a synthetic locales tree.")
+    parser.add_argument("-output", help="Folder where the locales tree is written", required=True)
+    parser.add_argument("-locales", type=int, default=28, help="Number of locales, besides the baseline")
+    parser.add_argument("-scopes", type=int, default=10, help="Number of scopes")
+    parser.add_argument("-keys", type=int, default=20, help="Number of keys per scope")
+    parser.add_argument("-untranslated_ratio", type=float, default=0.1, help="Ratio of strings with the English value")
+    parser.add_argument("-value_length", type=int, default=0, help="Length of the strings, padded with words (0 keeps them short)")
+    parser.add_argument("-seed", type=int, default=0, help="Seed for the random generator")
+    return parser.parse_args()
+
+def main():
+    args = get_arguments()
+    generate_locales(args.output, args.locales, args.scopes, args.keys, args.untranslated_ratio, args.seed, args.value_length)
+
+if __name__ == "__main__":
+    main()
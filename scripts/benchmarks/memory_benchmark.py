@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from check_languages import LocaleStore, get_locale_results, get_locales, get_streaming_results
+from benchmarks.generate_locales import generate_locales
+
+# Measures the peak memory of checking large translation files, loading them as dicts
+# (LocaleStore and check_locale) against reading them as streams (-streaming).
+# Usage (from the scripts folder):
+#   python -m benchmarks.memory_benchmark [-locales 28 -scopes 20 -keys 500 -value_length 400] [-long_value_length 4000000]
+# Besides those strings, a few strings long enough to span many chunks are measured. It fails
+# when the streaming loader needs more memory than json.load, or is far slower.
+
+MB = 1024 * 1024
+# Locales, scopes and keys per scope of the long strings case, its strings being -long_value_length long
+LONG_STRINGS_CASE = (4, 1, 4)
+# Slowdown of the streaming loader over json.load considered a problem
+MAX_SLOWDOWN = 5
+
+# Returns the peak traced memory, in bytes, and the wall time of the function. Tracing slows
+# down allocations, so the function is timed in a run of its own.
+def measure(func) -> tuple:
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1], seconds
+    finally:
+        tracemalloc.stop()
+
+def check_loaded(locales : list):
+    get_locale_results(locales, LocaleStore())
+
+def check_streaming(locales : list):
+    get_streaming_results(locales)
+
+# Returns loader -> (peak memory, seconds), over the locales tree of the current folder
+def run_loaders(locales : list) -> dict:
+    return {
+        'json.load': measure(lambda: check_loaded(locales)),
+        'streaming': measure(lambda: check_streaming(locales)),
+    }
+
+def get_files_size(locales_path : str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(locales_path) for name in names)
+
+# Returns the problems of the streaming loader: peak memory above, or time far above, json.load.
+# A loader copying or scanning long strings again on every chunk fails the long strings case.
+def get_problems(case : str, measures : dict) -> list:
+    problems = []
+    loaded_peak, loaded_seconds = measures['json.load']
+    peak, seconds = measures['streaming']
+    if peak >= loaded_peak:
+        problems.append(f'{case}: streaming peak {peak / MB:.1f} MB, json.load {loaded_peak / MB:.1f} MB')
+    if seconds > loaded_seconds * MAX_SLOWDOWN:
+        problems.append(f'{case}: streaming {seconds:.2f}s, more than {MAX_SLOWDOWN}x json.load ({loaded_seconds:.2f}s)')
+    return problems
+
+# Returns the size of the translation files and the measures of the loaders over a generated tree
+def run_case(locales : int, scopes : int, keys : int, value_length : int, untranslated_ratio : float) -> tuple:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generate_locales(tmp_dir, locales, scopes, keys, untranslated_ratio, value_length=value_length)
+        os.chdir(tmp_dir)
+        try:
+            return get_files_size('locales'), run_loaders(get_locales())
+        finally:
+            os.chdir(cwd)
+
+def get_arguments(argv : list = None):
+    parser = argparse.ArgumentParser(description="Compares the peak memory of the translation file loaders.")
+    parser.add_argument("-locales", type=int, default=28, help="Number of locales, besides the baseline")
+    parser.add_argument("-scopes", type=int, default=20, help="Number of scopes")
+    parser.add_argument("-keys", type=int, default=500, help="Number of keys per scope")
+    parser.add_argument("-value_length", type=int, default=400, help="Length of the strings")
+    parser.add_argument("-long_value_length", type=int, default=4000000, help="Length of the strings of the long strings case, spanning many chunks")
+    parser.add_argument("-untranslated_ratio", type=float, default=0.1, help="Ratio of strings with the English value")
+    return parser.parse_args(argv)
+
+def main(argv : list = None):
+    args = get_arguments(argv)
+    cases = {
+        'many strings': (args.locales, args.scopes, args.keys, args.value_length),
+        'long strings': LONG_STRINGS_CASE + (args.long_value_length,),
+    }
+    problems = []
+    for case, (locales, scopes, keys, value_length) in cases.items():
+        files_size, measures = run_case(locales, scopes, keys, value_length, args.untranslated_ratio)
+        print(f'{case}, {locales + 1} translation files, {files_size / MB:.1f} MB:')
+        for loader, (peak, seconds) in measures.items():
+            print(f'- {loader}: peak {peak / MB:.1f} MB ({peak / files_size:.2f}x the files), {seconds:.2f}s')
+        problems += get_problems(case, measures)
+    sys.stdout.flush()
+    if problems:
+        print('Problems:')
+        print("\n".join(f'- {problem}' for problem in problems))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import contextlib
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import check_languages
+from check_languages import BASELINE_LANGUAGE, Config, LocaleStore, Report, count_total_string, get_locale_results
+from compare_language_reports import ComparisonReport
+from benchmarks.generate_locales import generate_locales, get_baseline
+
+# Times the localization scripts over synthetic locale trees of growing size, comparing
+# the results with the stored baseline and failing on regressions.
+# Usage (from the scripts folder):
+#   python -m benchmarks.run_benchmarks [-sizes small medium] [-update_baseline]
+#
+# Wall times depend on the machine, so every time is stored relative to a calibration
+# run, a fixed workload of JSON parsing and dict comparisons timed in the same process.
+# The baseline holds those ratios, and is only compared for the sizes it has: run with
+# -update_baseline to add a size. xlarge is too slow to be part of it.
+
+BENCHMARKS_DIR = os.path.dirname(os.path.realpath(__file__))
+DEFAULT_BASELINE_FILE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_OUTPUT_FILE = 'benchmark_results.json'
+DEFAULT_THRESHOLD = 0.5
+# Differences below this, in calibration runs, are considered noise whatever the threshold
+MIN_REGRESSION_RATIO = 0.4
+# Scopes and keys per scope of the calibration workload
+CALIBRATION_SIZE = (20, 100)
+
+# Name -> (locales, scopes, keys per scope)
+SIZES = {
+    'small': (28, 10, 20),
+    'medium': (100, 20, 100),
+    'large': (300, 50, 200),
+    'xlarge': (1000, 100, 500),
+}
+DEFAULT_SIZES = ['small', 'medium']
+
+def best_time(func, repeat : int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# Returns the best time of the calibration workload
+def calibrate(repeat : int) -> float:
+    text = json.dumps(get_baseline(*CALIBRATION_SIZE))
+    def workload():
+        for _ in range(10):
+            language = json.loads(text)
+            sum(value == language[scope][key] for scope, entries in json.loads(text).items() for key, value in entries.items())
+    return best_time(workload, repeat)
+
+def run_check_languages_main(output_dir : str):
+    check_languages.main(['-no_cache', '-report_summary', '-report_key_mismatch',
+                          '-report_missing_translations', '-link_to_missing',
+                          '-output', os.path.join(output_dir, 'missing.md'),
+                          '-raw_report', os.path.join(output_dir, 'raw.json')])
+
+def get_report(output_dir : str) -> tuple:
+    store = LocaleStore()
+    results = get_locale_results(check_languages.get_locales(), store)
+    missing_keys = {locale: result['missing_keys'] for locale, result in results.items() if result['missing_keys']}
+    extra_keys = {locale: result['extra_keys'] for locale, result in results.items() if result['extra_keys']}
+    missing_translations = {locale: result['missing_translations'] for locale, result in results.items()}
+    config = Config(True, True, True, True, os.path.join(output_dir, 'missing.md'))
+    return Report(config, missing_keys, extra_keys, missing_translations), count_total_string(store.get(BASELINE_LANGUAGE))
+
+# Returns a copy of the report where half of the locales fixed their first scope
+def get_target_report(report : Report) -> Report:
+    target = copy.deepcopy(report)
+    for locale in list(target.missing_translations)[::2]:
+        scopes = target.missing_translations[locale]
+        if scopes:
+            scopes.pop(next(iter(scopes)))
+    return target
+
+def run_size(size : str, repeat : int) -> dict:
+    locales, scopes, keys = SIZES[size]
+    timings = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generate_locales(tmp_dir, locales, scopes, keys)
+        os.chdir(tmp_dir)
+        # The configuration is cached per path, and the path is the same for every size
+        check_languages.get_locales_information_from_config.cache_clear()
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                timings['check_languages.main'] = best_time(lambda: run_check_languages_main(tmp_dir), repeat)
+                report, total_strings = get_report(tmp_dir)
+                timings['Report.generate'] = best_time(lambda: report.generate(total_strings), repeat)
+                timings['Report.toJson'] = best_time(report.toJson, repeat)
+                target = get_target_report(report)
+                comparison = ComparisonReport(os.path.join(tmp_dir, 'comparison.md'))
+                timings['ComparisonReport.report'] = best_time(lambda: comparison.report(report, target), repeat)
+        finally:
+            os.chdir(cwd)
+    return timings
+
+# Returns the timings as ratios of the calibration time
+def get_ratios(results : dict, calibration : float) -> dict:
+    return {size: {name: seconds / calibration for name, seconds in timings.items()} for size, timings in results.items()}
+
+# Returns the list of regressions, benchmarks slower than the baseline by more than threshold,
+# both as ratios of the calibration time
+def get_regressions(ratios : dict, baseline : dict, threshold : float) -> list:
+    regressions = []
+    for size, timings in ratios.items():
+        for name, ratio in timings.items():
+            expected = baseline.get(size, {}).get(name)
+            if expected and ratio > expected * (1 + threshold) and ratio - expected > MIN_REGRESSION_RATIO:
+                regressions.append(f'{size} - {name}: {ratio:.2f}x the calibration (baseline {expected:.2f}x)')
+    return regressions
+
+def load_json(file_path : str) -> dict:
+    if not os.path.isfile(file_path):
+        return {}
+    with open(file_path, encoding='utf8') as f:
+        return json.load(f)
+
+def write_json(file_path : str, content : dict):
+    with open(file_path, 'w', encoding='utf8') as f:
+        f.write(json.dumps(content, sort_keys=True, indent=4) + '\n')
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="Benchmarks the localization scripts.")
+    parser.add_argument("-sizes", nargs='+', choices=SIZES.keys(), default=DEFAULT_SIZES, help="Sizes to run")
+    parser.add_argument("-repeat", type=int, default=3, help="Runs per benchmark, the best one is kept")
+    parser.add_argument("-output", default=DEFAULT_OUTPUT_FILE, help="File path for the results")
+    parser.add_argument("-baseline", default=DEFAULT_BASELINE_FILE, help="File path for the baseline, as ratios of the calibration time")
+    parser.add_argument("-threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown over the baseline (0.5 is 50%%)")
+    parser.add_argument("-update_baseline", help="Stores the results as the new baseline", action='store_true')
+    return parser.parse_args()
+
+def main():
+    args = get_arguments()
+    calibration = calibrate(args.repeat)
+    print(f'Calibration: {calibration:.4f}s')
+    results = {}
+    for size in args.sizes:
+        results[size] = run_size(size, args.repeat)
+        print(f'{size} ({"x".join(str(x) for x in SIZES[size])}):')
+        print("\n".join(f'- {name}: {seconds:.4f}s ({seconds / calibration:.2f}x)' for name, seconds in results[size].items()))
+    ratios = get_ratios(results, calibration)
+    write_json(args.output, {'calibration_seconds': calibration, 'seconds': results, 'ratios': ratios})
+
+    baseline = load_json(args.baseline)
+    if args.update_baseline:
+        baseline.update(ratios)
+        write_json(args.baseline, baseline)
+        return
+
+    regressions = get_regressions(ratios, baseline, args.threshold)
+    if regressions:
+        print('Regressions:')
+        print("\n".join(f'- {regression}' for regression in regressions))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
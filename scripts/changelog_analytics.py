@@ -0,0 +1,170 @@
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+from collections import Counter
+from tool_context import get_context
+
+# Change types and contributors of every version of the changelog, from a single parse.
+# Entries look like "- Fix [#123]: Message" or, in older versions, "- Fix: [#123] Message".
+
+MAIN_CHANGE_TYPES = ["Enhancement", "Fix", "Translation"]
+OTHER_CHANGE_TYPE = "Other"
+CHANGE_REGEX = re.compile(
+    r"^-?\s*(?P<type>[A-Za-z][\w ]*?)\s*(?:\[#(?P<number>\d+)\])?\s*:\s*(?:\[#(?P<old_number>\d+)\]\s*)?(?P<message>.*)$"
+)
+
+
+class Change:
+    def __init__(self, version: str, line: str):
+        self.version = version
+        match = CHANGE_REGEX.match(line)
+        if match:
+            self.type = match.group("type")
+            number = match.group("number") or match.group("old_number")
+            self.pull_request = int(number) if number else None
+            self.message = match.group("message")
+        else:
+            self.type = OTHER_CHANGE_TYPE
+            self.pull_request = None
+            self.message = line.lstrip("- ")
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "type": self.type,
+            "pull_request": self.pull_request,
+            "message": self.message,
+        }
+
+
+class ChangelogAnalytics:
+    """Tables of the changes and users of each version, indexed by version, change type
+    and user so that the queries never scan the whole history"""
+
+    def __init__(self, sections: list):
+        # In the changelog order, the most recent version first
+        self.versions = []
+        self.changes = []
+        # version -> Counter of change types
+        self.type_counts = {}
+        # version -> users, change type -> changes, user -> versions
+        self.users_by_version = {}
+        self.changes_by_type = {}
+        self.versions_by_user = {}
+        for section in sections:
+            version = section.version
+            self.versions.append(version)
+            self.type_counts[version] = Counter()
+            for line in section.changes:
+                change = Change(version, line)
+                self.changes.append(change)
+                self.type_counts[version][change.type] += 1
+                self.changes_by_type.setdefault(change.type, []).append(change)
+            users = list(dict.fromkeys(user.lstrip("- ").strip() for user in section.users))
+            self.users_by_version[version] = users
+            for user in users:
+                self.versions_by_user.setdefault(user, []).append(version)
+
+    def get_change_types(self) -> list:
+        others = sorted(self.changes_by_type.keys() - set(MAIN_CHANGE_TYPES))
+        return MAIN_CHANGE_TYPES + others
+
+    def get_types_table(self) -> list:
+        """Rows of version, then the number of changes of each type and the total"""
+        change_types = self.get_change_types()
+        header = ["Version"] + change_types + ["Total"]
+        rows = [header]
+        for version in self.versions:
+            counts = self.type_counts[version]
+            rows.append([version] + [counts[change_type] for change_type in change_types] + [sum(counts.values())])
+        return rows
+
+    def get_users_table(self) -> list:
+        """Rows of user, number of versions, first and last versions, sorted by number of versions"""
+        rows = [["User", "Versions", "First version", "Last version"]]
+        users = sorted(self.versions_by_user.items(), key=lambda item: (-len(item[1]), item[0].lower()))
+        for user, versions in users:
+            rows.append([user, len(versions), versions[-1], versions[0]])
+        return rows
+
+    def to_json(self) -> dict:
+        return {
+            "versions": [
+                {
+                    "version": version,
+                    "change_types": dict(self.type_counts[version]),
+                    "users": self.users_by_version[version],
+                }
+                for version in self.versions
+            ],
+            "users": {user: versions for user, versions in self.versions_by_user.items()},
+            "changes": [change.to_dict() for change in self.changes],
+        }
+
+
+def get_markdown_table(rows: list) -> str:
+    lines = ["| " + " | ".join(str(cell) for cell in rows[0]) + " |"]
+    lines.append("|" + "|".join("-" * (len(str(cell)) + 2) for cell in rows[0]) + "|")
+    lines.extend("| " + " | ".join(str(cell) for cell in row) + " |" for row in rows[1:])
+    return "\n".join(lines) + "\n"
+
+
+def get_csv(rows: list) -> str:
+    output = io.StringIO()
+    csv.writer(output, lineterminator="\n").writerows(rows)
+    return output.getvalue()
+
+
+def get_report(analytics: ChangelogAnalytics, output_format: str, table: str) -> str:
+    if output_format == "json":
+        return json.dumps(analytics.to_json(), indent=2) + "\n"
+    tables = {
+        "types": ("Changes per version", analytics.get_types_table()),
+        "users": ("Contributors", analytics.get_users_table()),
+    }
+    if output_format == "csv":
+        return get_csv(tables[table][1])
+    names = [table] if table else list(tables)
+    return "\n".join(f"## {tables[name][0]}\n\n{get_markdown_table(tables[name][1])}" for name in names)
+
+
+def get_arguments(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description="Reports the change types and the contributors of each version of a changelog file."
+    )
+    parser.add_argument("-changelog-file", help="Changelog file", required=True)
+    parser.add_argument("-format", choices=["markdown", "csv", "json"], default="markdown", help="Output format")
+    parser.add_argument(
+        "-table",
+        choices=["types", "users"],
+        help="Table to output: change types per version or contributors. Required with csv, all of them by default",
+    )
+    parser.add_argument(
+        "-version-range",
+        help="Only the versions in the range MIN..MAX (both included, either can be omitted)",
+    )
+    parser.add_argument("-output-file", help="The output file name. If omitted, prints the report")
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None):
+    args = get_arguments(argv)
+    if args.format == "csv" and not args.table:
+        raise Exception("-table is required by the csv format")
+
+    min_version, _, max_version = (args.version_range or "..").partition("..")
+    sections = get_context().get_changelog_index(args.changelog_file).get_range(min_version, max_version)
+    report = get_report(ChangelogAnalytics(sections), args.format, args.table)
+
+    if args.output_file:
+        with open(args.output_file, "w", encoding="utf-8") as output:
+            output.write(report)
+    else:
+        sys.stdout.write(report)
+
+
+if __name__ == "__main__":
+    main()
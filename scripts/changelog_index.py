@@ -0,0 +1,122 @@
+import re
+
+# The version sections of the changelog, indexed by update_release.py and
+# changelog_analytics.py, and shared between the tools of a pipeline by the tool context.
+
+# Only heading lines start a section, entries may mention versions as well
+VERSION_REGEX = re.compile(r"^#+ *(\d+\.\d+\.\d+)")
+BEGIN_CHANGES = "<!--- Begin changes - Do not remove -->"
+END_CHANGES = "<!--- End changes - Do not remove -->"
+BEGIN_USERS = "<!--- Begin users - Do not remove -->"
+END_USERS = "<!--- End users - Do not remove -->"
+USERS_HEADER = "Who built"
+
+
+def version_key(version: str) -> tuple:
+    return tuple(int(part) for part in re.split(r"\D", version)[:3])
+
+
+class ChangeLogSection:
+    """A "## x.y.z" section of the changelog, from its header line (start) to the
+    next header line (end), as byte offsets in the file"""
+
+    def __init__(self, version: str, start: int, end: int = None):
+        self.version = version
+        self.start = start
+        self.end = end
+        self.changes = None
+        self.users = None
+
+    def parse(self, lines: list):
+        # Sections being edited keep their lists between begin and end markers, the older
+        # ones list the changes, then the users after a "Who built" line
+        if any(BEGIN_CHANGES in line for line in lines):
+            self.changes = self._get_list_between(lines, BEGIN_CHANGES, END_CHANGES)
+            self.users = self._get_list_between(lines, BEGIN_USERS, END_USERS)
+            return
+        self.changes = []
+        self.users = []
+        items = self.changes
+        for line in lines[1:]:
+            if line.startswith(USERS_HEADER):
+                items = self.users
+            elif line.strip():
+                items.append(line.strip())
+
+    def _get_list_between(self, lines: list, start_str: str, end_str: str) -> list:
+        # retrieves a list of lines between a start and an end token
+        in_items = False
+        items = []
+        for line in lines:
+            if start_str in line:
+                in_items = True
+            elif in_items and end_str in line:
+                break
+            elif in_items and line.startswith("-"):
+                items.append(line.strip())
+        return items
+
+
+class ChangeLogIndex:
+    """Index of the version sections of a changelog, built in a single pass over the file.
+    Only the header lines are parsed: the content of a section is read (seeking to its
+    offset) and parsed the first time it is needed."""
+
+    def __init__(self, changelog_file: str):
+        self._file_path = changelog_file
+        self.sections = []
+        self._sections_by_version = {}
+        offset = 0
+        with open(self._file_path, "rb") as file:
+            for line in file:
+                # Most lines cannot be headers, skip them without running the regex
+                if line[:1] == b"#":
+                    match = VERSION_REGEX.match(line.decode("utf-8"))
+                    if match:
+                        self._add_section(match.group(1), offset)
+                offset += len(line)
+        if self.sections:
+            self.sections[-1].end = offset
+
+    def _add_section(self, version: str, offset: int):
+        if self.sections:
+            self.sections[-1].end = offset
+        section = ChangeLogSection(version, offset)
+        self.sections.append(section)
+        # The first section of a version wins, as when scanning the file from the top
+        self._sections_by_version.setdefault(version, section)
+
+    @property
+    def versions(self) -> list:
+        return [section.version for section in self.sections]
+
+    def get(self, version: str = None) -> ChangeLogSection:
+        """Returns the parsed section of the version (the top-most one if None), or None"""
+        if version is None:
+            section = self.sections[0] if self.sections else None
+        else:
+            section = self._sections_by_version.get(version)
+        if section is not None and section.changes is None:
+            with open(self._file_path, "rb") as file:
+                self._parse(file, section)
+        return section
+
+    def get_range(self, min_version: str = None, max_version: str = None) -> list:
+        """Returns the parsed sections with a version in the range (both included, either
+        bound can be None), in the changelog order"""
+        sections = [
+            section
+            for section in self.sections
+            if (not min_version or version_key(section.version) >= version_key(min_version))
+            and (not max_version or version_key(section.version) <= version_key(max_version))
+        ]
+        with open(self._file_path, "rb") as file:
+            for section in sections:
+                if section.changes is None:
+                    self._parse(file, section)
+        return sections
+
+    def _parse(self, file, section: ChangeLogSection):
+        file.seek(section.start)
+        content = file.read(section.end - section.start).decode("utf-8")
+        section.parse(content.splitlines(keepends=True))
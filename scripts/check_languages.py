@@ -1,81 +1,57 @@
 import argparse
+import copy
 import json
 import os
 import re
+import sys
+from compare_language_reports import ComparisonReport
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from functools import lru_cache
+from git_locales import get_changed_locales, get_locale_blobs, get_results, read_blobs
 from math import floor
 from pathlib import Path
+from types import MappingProxyType
+from ignore_rules import IgnoreRules, get_ignore_rules
+from incremental import BaselineDelta, update_locale_results
+from key_index import KeyIndex
+from locale_checks import (BASELINE_LANGUAGE, LOCALES_PATH, LocaleStats, LocaleStore, check_locale, count_total_string, dump_json,
+                           get_keys_to_ignore, get_keys_to_ignore_hash, get_language, get_translation_file)
+from localization_cache import DEFAULT_CACHE_FILE, ResultCache, get_cache_key, hash_file
+from localization_metrics import record_metrics
+from profiler import get_profiler
+from raw_report import write_binary_report
+from streaming_loader import BaselineDigests, check_locale_file
+from string_validators import TranslationValidator
+from tool_context import get_context
+from translation_memory import TranslationMemory, apply_suggestions, write_translation_file
+from watch_locales import LocaleWatcher
 from urllib.parse import urlencode, unquote, urlparse, parse_qsl, ParseResult
 
-LOCALES_PATH = 'locales/'
-BASELINE_LANGUAGE = 'en'
 LANG_CONFIG_FILE = 'src/configs/app.config.mjs'
-SCOPE_KEY_TO_IGNORE = {'$Menu' : ['ttl-github']}
-
-LANG_SCOPE_KEY_TO_IGNORE = {'de-DE': {'$Preferences' : ['themes', 'hours-per-day'],
-                                      '$Menu' : ['export', 'import', 'ok'],
-                                      '$DateUtil' : ['april', 'august', 'september', 'november']},
-                             'pl': {'$Preferences' : ['cadentStar', 'hours-per-day'],
-                                    '$Menu' : ['menu']},
-                             'mr': {'$Preferences' : ['hours-per-day']},
-                             'it': {'$Preferences' : ['hours-per-day'],
-                                    '$Menu' : ['menu', 'ok'],
-                                    '$DayCalendar' : ['no'],
-                                    '$MonthCalendar' : ['no'],
-                                    '$WorkdayWaiver' : ['no']},
-                             'zh-TW': {'$Preferences' : ['hours-per-day']},
-                             'pt-BR': {'$Preferences' : ['hours-per-day'],
-                                       '$Menu' : ['menu', 'ok'],
-                                       '$MonthCalendar' : ['total']},
-                             'hi': {'$Preferences' : ['hours-per-day']},
-                             'gu': {'$Preferences' : ['hours-per-day']},
-                             'es': {'$Preferences' : ['hours-per-day'],
-                                    '$Menu' : ['ok'],
-                                    '$MonthCalendar' : ['no', 'total'],
-                                    '$DayCalendar' : ['no'],
-                                    '$WorkdayWaiver' : ['no']},
-                             'nl': {'$Preferences' : ['hours-per-day'],
-                                    '$Menu' : ['help', 'menu'],
-                                    '$DateUtil' : ['april', 'september', 'november', 'december']},
-                             'id': {'$Preferences' : ['cadentStar', 'hours-per-day'],
-                                    '$Menu' : ['edit', 'help', 'menu', 'ok'],
-                                    '$MonthCalendar' : ['total'],
-                                    '$DateUtil' : ['april', 'september', 'november']},
-                             'fr-FR': {'$Preferences' : ['notification', 'hours-per-day'],
-                                       '$Menu' : ['menu', 'ok'],
-                                       '$MonthCalendar' : ['total'],
-                                       '$WorkdayWaiver' : ['date']},
-                             'ko': {'$Preferences' : ['hours-per-day']},
-                             'ca': {'$Preferences' : ['hours-per-day'],
-                                       '$Menu' : ['menu', 'ok'],
-                                       '$DayCalendar' : ['no'],
-                                       '$MonthCalendar' : ['total', 'no'],
-                                       '$WorkdayWaiver' : ['no']},
-                             'ja': {'$Menu' : ['ok']},
-                             'ta': {'$Preferences' : ['hours-per-day']},
-                             'bn': {'$Preferences' : ['hours-per-day']},
-                             'fa-IR': {'$Preferences' : ['hours-per-day']},
-                             'he': {'$Preferences' : ['hours-per-day']},
-                             'sv-SE': {'$Preferences' : ['hours-per-day'],
-                                       '$DateUtil' : ['april', 'september', 'november', 'december'],
-                                       '$MonthCalendar' : ['total', 'no'],
-                                       '$Menu' : ['ok']},
-                             'pt-MI': {'$Preferences' : ['hours-per-day'],
-                                     '$Menu' : ['menu', 'ok'],
-                                     '$MonthCalendar' : ['total']}}
-
-def get_locales_information_from_config():
-    # Parses the language configuration file to retrieve the locale code
-    # and language name. As the file is JS, we are parsing it with regex.
-    with open(LANG_CONFIG_FILE, encoding="utf8") as f:
+
+# Parses the language configuration file to retrieve the locale code
+# and language name. As the file is JS, we are parsing it with regex.
+# The file is only parsed once per process, the map returned is read-only.
+@lru_cache(maxsize=None)
+def get_locales_information_from_config(config_file : str = LANG_CONFIG_FILE) -> MappingProxyType:
+    with open(config_file, encoding="utf8") as f:
         lines = f.readlines()
         locales_info = {}
         # We want only the lines that contain the locales
-        regexp = re.compile(".*'([a-zA-Z-]+)': '(.*)'.*")
+        regexp = re.compile(r".*'([a-zA-Z-]+)'\s*:\s*'(.*)'.*")
         for line in lines:
             match = regexp.match(line)
             if match:
                 locales_info[match.group(1)] = match.group(2)
-        return locales_info
+        return MappingProxyType(locales_info)
+
+# Returns the warnings about locales that are only in the configuration file or only in the locales directory
+def validate_locales_information(locales_info : MappingProxyType, locales_path : str = LOCALES_PATH) -> list:
+    locales = set(os.listdir(locales_path))
+    warnings = [f'Locale {locale} is not in {LANG_CONFIG_FILE}' for locale in sorted(locales - locales_info.keys())]
+    warnings += [f'Locale {locale} has no translation file in {locales_path}' for locale in sorted(locales_info.keys() - locales)]
+    return warnings
 
 def get_locale_name(locale):
     locales_map = get_locales_information_from_config()
@@ -126,47 +102,17 @@ def get_locales() -> list:
     languages.remove(BASELINE_LANGUAGE)
     return sorted(languages)
 
-# Reurns the dict of translations for a language
-def get_language(language : str) -> dict:
-    with open('{}/{}/translation.json'.format(LOCALES_PATH, language), encoding="utf8") as f:
-        return json.load(f)
-
 # Count number of strings for translation from locale
 def get_total_strings_for_translation(locale : str) -> int:
     baseline_language = get_language(locale)
     return count_total_string(baseline_language)
 
-# Count number of strings for translation from language dict
-def count_total_string(language : dict) -> int:
-    total = 0
-    for scope in language:
-        total += len(language[scope])
-    return total
-
 # Returns the values that haven't changed between the baseline scope and the scope
-# Ignore keys supplied in keys_to_ignore
+# Keys not present in the baseline scope are kept as well
+# Ignore keys supplied in keys_to_ignore. The scope passed is not modified
 def find_equal_values(keys_to_ignore : list, baseline_scope : dict, scope : dict) -> dict:
-    translations_baseline = baseline_scope.items()
-    translations = scope.items()
-    different_items = translations_baseline - translations
-    for item in different_items:
-        if item[0] in scope:
-            scope.pop(item[0])
-
-    for key_to_ignore in keys_to_ignore:
-        if key_to_ignore in scope:
-            scope.pop(key_to_ignore)
-
-    return scope
-
-# Get which keys should be ignored based on the information waived on the top of this file
-def get_keys_to_ignore(locale : str, scope : str) -> list:
-    keys_to_ignore = []
-    if scope in  SCOPE_KEY_TO_IGNORE:
-        keys_to_ignore.extend(SCOPE_KEY_TO_IGNORE[scope])
-    if locale in LANG_SCOPE_KEY_TO_IGNORE and scope in LANG_SCOPE_KEY_TO_IGNORE[locale]:
-        keys_to_ignore.extend(LANG_SCOPE_KEY_TO_IGNORE[locale][scope])
-    return keys_to_ignore
+    return {key: value for key, value in scope.items()
+            if key not in keys_to_ignore and baseline_scope.get(key, value) == value}
 
 # Compare two languages, passing over all scopes, returning the erros for the language
 def compare_language(locale : str, baseline_language : dict, language : dict) -> dict:
@@ -196,16 +142,35 @@ def get_missing_keys(baseline_language : dict, language : dict) -> dict:
             missing_keys[scope] = []
     return missing_keys
 
-def get_arguments():
+def get_arguments(argv : list = None):
     parser = argparse.ArgumentParser()
     parser.add_argument("-locale", action='store', type=str, nargs='+', default=get_locales(), help="Locale to analyze")
     parser.add_argument("-output", help="Output markdown report file")
     parser.add_argument("-report_summary", help="Include a summary of the translations", action='store_true')
     parser.add_argument("-report_key_mismatch", help="Include missing/extra keys", action='store_true')
     parser.add_argument("-report_missing_translations", help="Prints missing string translations", action='store_true')
+    parser.add_argument("-report_invalid_translations", help="Include the translations whose placeholders, markup or surrounding whitespace differ from the baseline", action='store_true')
+    parser.add_argument("-suggest_translations", help="Include, for the missing strings, the translations already used for the same English text in the locale", action='store_true')
+    parser.add_argument("-apply_suggestions", help="Writes the suggested translations to the translation files", action='store_true')
     parser.add_argument("-link_to_missing", help="Includes a link to the missing translations", action='store_true')
     parser.add_argument("-raw_report", help="File path for the raw report")
-    return parser.parse_args()
+    parser.add_argument("-summary_json", help="File path for a JSON summary with the counts of each locale")
+    parser.add_argument("-raw_report_format", choices=['json', 'binary'], default='json', help="Format of the raw report, binary is compact and loaded lazily")
+    parser.add_argument("-report_waivers", help="Prints how many translations each ignore rule waived and the unused rules", action='store_true')
+    parser.add_argument("-no_cache", help="Recompute the results of every locale, ignoring the result cache", action='store_true')
+    parser.add_argument("-verify_incremental", help="Checks the results updated incrementally from the previous run against a full check", action='store_true')
+    parser.add_argument("-cache_file", default=DEFAULT_CACHE_FILE, help="File path for the result cache")
+    parser.add_argument("-streaming", help="Checks the translation files while reading them instead of loading them, bounding the memory for very large files. The result cache is not used", action='store_true')
+    parser.add_argument("-jobs", type=int, default=1, help="Number of processes used to check the locales")
+    parser.add_argument("-profile", help="Prints the time, calls and peak memory of each phase to stderr", action='store_true')
+    parser.add_argument("-profile_output", help="File path for the profile, as JSON")
+    parser.add_argument("-watch", help="Keeps running, checking again the locales whose translation file changed", action='store_true')
+    parser.add_argument("-watch_interval", type=float, default=0.5, help="Seconds between two checks of the translation files, with -watch")
+    parser.add_argument("-metrics_db", help="File path for a SQLite database the per-locale and per-scope counts are appended to")
+    parser.add_argument("-metrics_commit", default='HEAD', help="Git ref the counts are recorded for, with -metrics_db")
+    parser.add_argument("-baseline_ref", help="Git ref used as baseline. Together with -target_ref, compares both refs and writes the comparison to -output")
+    parser.add_argument("-target_ref", help="Git ref compared against -baseline_ref")
+    return parser.parse_args(argv)
 
 def percentage_not_translated(total_strings_for_translation : int, missing_keys : dict) -> float:
     number_missing_keys = count_total_string(missing_keys)
@@ -214,57 +179,186 @@ def percentage_not_translated(total_strings_for_translation : int, missing_keys
 def percentage_translated(total_strings_for_translation : int, missing_keys : dict) -> float:
     return 100 - percentage_not_translated(total_strings_for_translation, missing_keys)
 
+# Returns the markdown section of a locale in the error report
+def get_locale_error_report(locale : str, number_missing_keys : int, total_strings_for_translation : int, percentage : float, errors_json : str) -> str:
+    result = '## {}\n{}/{} - {:.2f}% missing:\n'.format(locale,
+                                                number_missing_keys,
+                                                total_strings_for_translation,
+                                                percentage)
+    return result + '\n```\n{}\n```\n\n'.format(errors_json)
+
 # Returns a string for the error report
 def get_report_from_error(total_strings_for_translation : int, errors : dict) -> str:
     result = ''
     for language in errors:
         missing_keys = errors[language]
-        number_missing_keys = count_total_string(missing_keys)
-        result += '## {}\n{}/{} - {:.2f}% missing:\n'.format(language,
-                                                 number_missing_keys,
-                                                 total_strings_for_translation,
-                                                 percentage_not_translated(total_strings_for_translation, missing_keys))
-        try:
-            result += '\n```\n{}\n```\n\n'.format(json.dumps(missing_keys, indent=2))
-        except:
-            result += '\n```\n{}\n```\n\n'.format(missing_keys)
-
+        result += get_locale_error_report(language,
+                                          count_total_string(missing_keys),
+                                          total_strings_for_translation,
+                                          percentage_not_translated(total_strings_for_translation, missing_keys),
+                                          dump_json(missing_keys))
     return result
 
-def get_count_total_string_with_link(locale : str, missing_translations : dict, link_to_missing : bool) -> str:
-    if not missing_translations or not link_to_missing:
-        return f'{count_total_string(missing_translations)}'
-    missing_translations_count = count_total_string(missing_translations)
+def get_count_total_string_with_link(locale : str, missing_translations_count : int, link_to_missing : bool) -> str:
+    if not missing_translations_count or not link_to_missing:
+        return f'{missing_translations_count}'
     locale = locale.lower()
     return f'{missing_translations_count} [(See missing)](#{locale})'
 
-def get_progress_bar(total_strings_for_translation : int, missing_strings : dict) -> str:
-    percentage = percentage_translated(total_strings_for_translation, missing_strings)
+def get_progress_bar(percentage : float) -> str:
     return f'![Progress](https://progress-bar.dev/{floor(percentage)}/?width=200)'
 
-def get_new_issue_url(locale : str, missing_translations : dict) -> str:
+def get_new_issue_url(locale : str, missing_translations : dict, missing_translations_json : str = None, suggestions : dict = None) -> str:
+    with get_profiler().phase('issue_url', locale):
+        return _get_new_issue_url(locale, missing_translations, missing_translations_json, suggestions)
+
+def _get_new_issue_url(locale : str, missing_translations : dict, missing_translations_json : str = None, suggestions : dict = None) -> str:
     language = get_locale_name(locale)
     if not missing_translations:
         return ''
+    if missing_translations_json is None:
+        missing_translations_json = dump_json(missing_translations)
     body = f'Add translations for locale {language}\nRelevant file: `locales\\{locale}\\translation.json`\n\n'
     body += 'Please only translate into languages you are fluent on. :)\n\n'
-    try:
-        body += '\n```\n{}\n```\n\n'.format(json.dumps(missing_translations, indent=2))
-    except:
-        body += '\n```\n{}\n```\n\n'.format(missing_translations)
+    body += '\n```\n{}\n```\n\n'.format(missing_translations_json)
+    if suggestions:
+        body += 'Suggested translations, already used for the same English text in this locale:\n'
+        body += '\n```\n{}\n```\n\n'.format(dump_json(suggestions))
     base_url = f'https://github.com/TTLApp/time-to-leave/issues/new?labels=localization,good+first+issue,Hacktoberfest'
     opts = { 'body': body , 'title': f'Add missing translations for {language}'}
     return f'[(Open issue)]({add_url_params(base_url, opts)})'
 
+def get_summary_row(stats : 'LocaleStats', link_to_missing : bool) -> str:
+    return '| {} | {} | {} {} |'.format(stats.locale,
+                                        get_progress_bar(stats.percentage_translated),
+                                        get_count_total_string_with_link(stats.locale, stats.missing_strings, link_to_missing),
+                                        get_new_issue_url(stats.locale, stats.missing_translations, stats.get_json(), stats.suggestions))
+
+SUMMARY_TABLE_HEADER = '| Locale | Translation progress | Missing strings |\n|--------|----------------------|-----------------|\n'
+
 def get_summary_report(total_strings_for_translation : int, link_to_missing : bool, missing_translations : dict) -> str:
-    output = '| Locale | Translation progress | Missing strings |\n'
-    output += '|--------|----------------------|-----------------|\n'
-    output += '\n'.join('| {} | {} | {} {} |'.format(k,
-                        get_progress_bar(total_strings_for_translation, v),
-                        get_count_total_string_with_link(k, v, link_to_missing),
-                        get_new_issue_url(k, v)) for k, v in missing_translations.items())
+    output = SUMMARY_TABLE_HEADER
+    output += '\n'.join(get_summary_row(LocaleStats(k, v, total_strings_for_translation), link_to_missing)
+                        for k, v in missing_translations.items())
     return output + '\n\n'
 
+# Writes the report to stdout
+class StdoutSink:
+    def summary(self, total_strings_for_translation : int, stats : list):
+        # +1 for the baseline language (en)
+        print(f'Summary - {len(stats) + 1} languages supported ({total_strings_for_translation} strings)')
+        print("\n".join("- {}: {:.2f}".format(x.locale, x.percentage_translated) for x in stats))
+
+    def missing_keys(self, total_strings_for_translation : int, errors : dict):
+        print('Missing Keys/Scopes:')
+        print(errors)
+
+    def extra_keys(self, total_strings_for_translation : int, errors : dict):
+        print('Extra Keys/Scopes:')
+        print(errors)
+
+    def missing_translations(self, total_strings_for_translation : int, stats : list):
+        # Same as dumping the dict of all locales, reusing the JSON of each locale
+        print('Missing Translations')
+        print('{\n' + ',\n'.join('  {}: {}'.format(json.dumps(x.locale), x.get_json().replace('\n', '\n  ')) for x in stats) + '\n}')
+
+    def suggestions(self, total_strings_for_translation : int, suggestions : dict):
+        print('Suggested Translations:')
+        print(dump_json(suggestions))
+
+    def invalid_translations(self, total_strings_for_translation : int, errors : dict):
+        print('Invalid Translations:')
+        print(dump_json(errors))
+
+    def close(self):
+        pass
+
+# Writes the markdown report to a file, one locale at a time
+class MarkdownSink:
+    def __init__(self, output : str, link_to_missing : bool):
+        self.link_to_missing = link_to_missing
+        self.file = open(output, 'w')
+
+    def summary(self, total_strings_for_translation : int, stats : list):
+        # +1 for the baseline language (en)
+        self.file.write(f'# Summary - {len(stats) + 1} languages supported ({total_strings_for_translation} strings)\n')
+        self.file.write(SUMMARY_TABLE_HEADER)
+        for i, locale_stats in enumerate(stats):
+            self.file.write(('\n' if i else '') + get_summary_row(locale_stats, self.link_to_missing))
+        self.file.write('\n\n')
+
+    def _errors(self, total_strings_for_translation : int, errors : dict):
+        for locale, locale_errors in errors.items():
+            self.file.write(get_report_from_error(total_strings_for_translation, {locale: locale_errors}))
+
+    def missing_keys(self, total_strings_for_translation : int, errors : dict):
+        self.file.write('# Missing Keys/Scopes:\n')
+        self._errors(total_strings_for_translation, errors)
+
+    def extra_keys(self, total_strings_for_translation : int, errors : dict):
+        self.file.write('# Extra Keys/Scopes:\n')
+        self._errors(total_strings_for_translation, errors)
+
+    def missing_translations(self, total_strings_for_translation : int, stats : list):
+        self.file.write('# Missing Translations:\n')
+        for x in stats:
+            self.file.write(get_locale_error_report(x.locale, x.missing_strings, total_strings_for_translation,
+                                                    x.percentage_not_translated, x.get_json()))
+
+    def suggestions(self, total_strings_for_translation : int, suggestions : dict):
+        self.file.write('# Suggested Translations:\n')
+        for locale, locale_suggestions in suggestions.items():
+            self.file.write('## {}\n{} suggested:\n\n```\n{}\n```\n\n'.format(locale, count_total_string(locale_suggestions), dump_json(locale_suggestions)))
+
+    def invalid_translations(self, total_strings_for_translation : int, errors : dict):
+        self.file.write('# Invalid Translations:\n')
+        for locale, locale_errors in errors.items():
+            self.file.write('## {}\n{} invalid:\n\n```\n{}\n```\n\n'.format(locale, count_total_string(locale_errors), dump_json(locale_errors)))
+
+    def close(self):
+        self.file.close()
+
+# Writes a machine-readable summary of the report, with the counts of each locale
+class JsonSummarySink:
+    def __init__(self, output : str):
+        self.output = output
+        self.summary_data = {'languages': 0, 'strings': 0, 'locales': {}}
+
+    def _locale(self, locale : str) -> dict:
+        return self.summary_data['locales'].setdefault(locale, {
+            'missing_strings': 0, 'percentage_translated': 100.0, 'missing_keys': 0, 'extra_keys': 0})
+
+    def summary(self, total_strings_for_translation : int, stats : list):
+        self.summary_data['languages'] = len(stats) + 1
+        self.summary_data['strings'] = total_strings_for_translation
+        for x in stats:
+            locale = self._locale(x.locale)
+            locale['missing_strings'] = x.missing_strings
+            locale['percentage_translated'] = x.percentage_translated
+
+    def missing_keys(self, total_strings_for_translation : int, errors : dict):
+        for locale, locale_errors in errors.items():
+            self._locale(locale)['missing_keys'] = count_total_string(locale_errors)
+
+    def extra_keys(self, total_strings_for_translation : int, errors : dict):
+        for locale, locale_errors in errors.items():
+            self._locale(locale)['extra_keys'] = count_total_string(locale_errors)
+
+    def missing_translations(self, total_strings_for_translation : int, stats : list):
+        pass
+
+    def suggestions(self, total_strings_for_translation : int, suggestions : dict):
+        for locale, locale_suggestions in suggestions.items():
+            self._locale(locale)['suggestions'] = count_total_string(locale_suggestions)
+
+    def invalid_translations(self, total_strings_for_translation : int, errors : dict):
+        for locale, locale_errors in errors.items():
+            self._locale(locale)['invalid_translations'] = count_total_string(locale_errors)
+
+    def close(self):
+        with open(self.output, 'w', encoding='utf8') as f:
+            f.write(json.dumps(self.summary_data, indent=4, sort_keys=True))
+
 class Config:
     def __init__(self, report_summary: bool, link_to_missing: bool, report_key_mismatch: bool, report_missing_translations: bool, output: str):
         self.report_summary = report_summary
@@ -288,76 +382,335 @@ def fromJSON(json_data):
         return Report(**dictionary)
 
     # Report in stdout and on the output file (if passed) the errors found
-    def generate(self):
-        total_strings_for_translation = get_total_strings_for_translation(BASELINE_LANGUAGE)
+    # Each section is computed once and written to every sink
+    # The invalid translations and suggestions (if passed) are only reported, they are not part of the raw report
+    # The counts of the results of each locale (if passed) give the number of missing translations
+    def generate(self, total_strings_for_translation : int = None, summary_json : str = None, invalid_translations : dict = None, suggestions : dict = None, counts : dict = None):
+        if total_strings_for_translation is None:
+            total_strings_for_translation = get_total_strings_for_translation(BASELINE_LANGUAGE)
+        sinks = [StdoutSink()]
+        if self.config.output:
+            sinks.append(MarkdownSink(self.config.output, self.config.link_to_missing))
+        if summary_json:
+            sinks.append(JsonSummarySink(summary_json))
+        try:
+            with get_profiler().phase('render_report'):
+                self.render(total_strings_for_translation, sinks, invalid_translations, suggestions, counts)
+        finally:
+            for sink in sinks:
+                sink.close()
+
+    def render(self, total_strings_for_translation : int, sinks : list, invalid_translations : dict = None, suggestions : dict = None, counts : dict = None):
         config = self.config
-        
+        suggestions = suggestions or {}
+        counts = counts or {}
+        stats = [LocaleStats(k, v, total_strings_for_translation, suggestions.get(k), counts[k]['missing_translations'] if k in counts else None)
+                 for k, v in self.missing_translations.items()]
         if config.report_summary:
-            # +1 for the baseline language (en)
-            print(f'Summary - {len(self.missing_translations) + 1} languages supported ({total_strings_for_translation} strings)')
-            print("\n".join("- {}: {:.2f}".format(k,
-                percentage_translated(total_strings_for_translation, v)) 
-                    for k, v in self.missing_translations.items()))
+            for sink in sinks:
+                sink.summary(total_strings_for_translation, stats)
 
         if config.report_key_mismatch and self.errors_missing_keys:
-            print('Missing Keys/Scopes:')
-            print(self.errors_missing_keys)
+            for sink in sinks:
+                sink.missing_keys(total_strings_for_translation, self.errors_missing_keys)
 
         if config.report_key_mismatch and self.errors_extra_keys:
-            print('Extra Keys/Scopes:')
-            print(self.errors_extra_keys)
-
-        languages_with_missing_keys = dict((k, v) for k, v in self.missing_translations.items() if v)
-        if config.report_missing_translations and languages_with_missing_keys:
-            print('Missing Translations')
-            print(json.dumps(languages_with_missing_keys, indent=2))
-
-        if config.output:
-            with open(config.output, 'w') as f:
-                if config.report_summary:
-                    # +1 for the baseline language (en)
-                    f.write(f'# Summary - {len(self.missing_translations) + 1} languages supported ({total_strings_for_translation} strings)\n')
-                    f.write(get_summary_report(total_strings_for_translation, config.link_to_missing, self.missing_translations))
-                if config.report_key_mismatch and self.errors_missing_keys:
-                    f.write('# Missing Keys/Scopes:\n')
-                    f.write(get_report_from_error(total_strings_for_translation, self.errors_missing_keys))
-                if config.report_key_mismatch and self.errors_extra_keys:
-                    f.write('# Extra Keys/Scopes:\n')
-                    f.write(get_report_from_error(total_strings_for_translation, self.errors_extra_keys))
-                if config.report_missing_translations and languages_with_missing_keys:
-                    f.write('# Missing Translations:\n')
-                    f.write(get_report_from_error(total_strings_for_translation, languages_with_missing_keys))
-
-def main():
-    args = get_arguments()
+            for sink in sinks:
+                sink.extra_keys(total_strings_for_translation, self.errors_extra_keys)
+
+        stats_with_missing_keys = [x for x in stats if x.missing_translations]
+        if config.report_missing_translations and stats_with_missing_keys:
+            for sink in sinks:
+                sink.missing_translations(total_strings_for_translation, stats_with_missing_keys)
+
+        if suggestions:
+            for sink in sinks:
+                sink.suggestions(total_strings_for_translation, suggestions)
+
+        if invalid_translations:
+            for sink in sinks:
+                sink.invalid_translations(total_strings_for_translation, invalid_translations)
+
+# Index of the baseline keys and validator for the worker processes, built once per worker
+_worker_index = None
+_worker_validator = None
+
+def _init_worker(baseline_language : dict):
+    global _worker_index, _worker_validator
+    _worker_index = KeyIndex(baseline_language)
+    _worker_validator = TranslationValidator(_worker_index)
+
+# Parses and checks a locale in a worker process, returning plain result dicts
+def _check_locale_file(locale : str, locales_path : str) -> dict:
+    return check_locale(locale, _worker_index.baseline_language, get_language(locale, locales_path), _worker_index, _worker_validator)
+
+# Returns the results of each locale, reusing the cached results for locales whose
+# translation file, baseline and waivers did not change. Only the translation files
+# of the locales that need to be recomputed are parsed.
+# When only the baseline changed since the previous run, the previous results are
+# updated incrementally with the keys that changed. With verify_incremental, those
+# are compared with a full check, raising if they differ.
+# With more than one job the locales are parsed and checked in a process pool, the
+# results being merged in the same order as the serial run.
+def get_locale_results(locales : list, store : LocaleStore, cache : ResultCache = None, jobs : int = 1, verify_incremental : bool = False) -> dict:
+    profiler = get_profiler()
+    cache_keys = {}
+    previous_keys = {}
+    results = {}
+    with profiler.phase('cache_lookup'):
+        if cache is not None:
+            previous_baseline = cache.get(BASELINE_CACHE_KEY)
+            results = _get_cached_results(locales, store, cache, cache_keys, previous_baseline, previous_keys)
+
+    with profiler.phase('incremental'):
+        if previous_keys:
+            updated = _get_incremental_results([locale for locale in locales if locale not in results], store, cache,
+                                               previous_baseline['language'], previous_keys)
+            for locale, result in updated.items():
+                results[locale] = result
+                cache.put(cache_keys[locale], result)
+            if verify_incremental:
+                verify_incremental_results(updated, store)
+
+    to_check = [locale for locale in locales if locale not in results]
+    use_pool = jobs > 1 and len(to_check) > 1
+    with profiler.phase('load_locales'):
+        baseline_language = store.get(BASELINE_LANGUAGE)
+        if not use_pool:
+            store.load(to_check)
+    if use_pool:
+        # The per-locale phases run in the workers and are not profiled
+        with profiler.phase('check_locales_pool'):
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(baseline_language,)) as executor:
+                checked = list(executor.map(_check_locale_file, to_check, repeat(store.locales_path)))
+    else:
+        with profiler.phase('key_index'):
+            index = KeyIndex(baseline_language)
+        with profiler.phase('validator'):
+            validator = TranslationValidator(index)
+        checked = [check_locale(locale, baseline_language, store.get(locale), index, validator) for locale in to_check]
+
+    for locale, result in zip(to_check, checked):
+        results[locale] = result
+        if cache is not None:
+            cache.put(cache_keys[locale], result)
+
+    return {locale: results[locale] for locale in locales}
+
+# Same results as get_locale_results without a cache, reading the translation files as streams
+# so that no translation file is loaded. Returns the results and the number of baseline strings.
+def get_streaming_results(locales : list, locales_path : str = LOCALES_PATH) -> tuple:
+    profiler = get_profiler()
+    with profiler.phase('baseline_digests'):
+        baseline = BaselineDigests.from_file(get_translation_file(BASELINE_LANGUAGE, locales_path))
+    results = {}
+    for locale in locales:
+        with profiler.phase('check_locale_file', locale):
+            results[locale] = check_locale_file(baseline, get_translation_file(locale, locales_path),
+                                                lambda scope, locale=locale: get_keys_to_ignore(locale, scope))
+    return results, len(baseline)
+
+# Cache entry with the baseline of the last run, to compute the delta of the next one
+BASELINE_CACHE_KEY = get_cache_key('baseline')
+
+# Returns the cached results of the locales, filling cache_keys with the key of each locale.
+# If the baseline changed since the last run, previous_keys is filled with the key of the
+# results of each locale for the previous baseline, and the new baseline is cached.
+def _get_cached_results(locales : list, store : LocaleStore, cache : ResultCache, cache_keys : dict, previous_baseline : dict, previous_keys : dict) -> dict:
+    results = {}
+    baseline_hash = hash_file(get_translation_file(BASELINE_LANGUAGE, store.locales_path))
+    ignore_hash = get_keys_to_ignore_hash()
+    previous_hash = previous_baseline['hash'] if previous_baseline else baseline_hash
+    for locale in locales:
+        locale_hash = hash_file(get_translation_file(locale, store.locales_path))
+        cache_keys[locale] = get_cache_key(baseline_hash, locale, locale_hash, ignore_hash)
+        if previous_hash != baseline_hash:
+            previous_keys[locale] = get_cache_key(previous_hash, locale, locale_hash, ignore_hash)
+        result = cache.get(cache_keys[locale])
+        if result is not None:
+            results[locale] = result
+    if previous_hash != baseline_hash or previous_baseline is None:
+        cache.put(BASELINE_CACHE_KEY, {'hash': baseline_hash, 'language': store.get(BASELINE_LANGUAGE)})
+    return results
+
+# Returns the results of the locales updated from their results for the previous baseline,
+# for the locales that have them
+def _get_incremental_results(locales : list, store : LocaleStore, cache : ResultCache, previous_baseline : dict, previous_keys : dict) -> dict:
+    previous_results = {}
+    for locale in locales:
+        result = cache.get(previous_keys[locale])
+        if result is not None:
+            previous_results[locale] = result
+    if not previous_results:
+        return {}
+    store.load(list(previous_results))
+    baseline_language = store.get(BASELINE_LANGUAGE)
+    delta = BaselineDelta(previous_baseline, baseline_language)
+    results = {}
+    for locale, result in previous_results.items():
+        # The previous results stay in the cache, they must not be modified
+        results[locale] = update_locale_results(copy.deepcopy(result), delta, baseline_language, store.get(locale),
+                                                lambda scope, locale=locale: get_keys_to_ignore(locale, scope))
+    return results
+
+# Checks that the incremental results are the same as a full check, in the same order
+def verify_incremental_results(results : dict, store : LocaleStore):
+    baseline_language = store.get(BASELINE_LANGUAGE)
+    index = KeyIndex(baseline_language)
+    validator = TranslationValidator(index)
+    mismatches = [locale for locale, result in results.items()
+                  if dump_json(result) != dump_json(check_locale(locale, baseline_language, store.get(locale), index, validator))]
+    if mismatches:
+        raise Exception(f'Incremental results differ from a full check for: {", ".join(mismatches)}')
+
+# Returns the suggested translations of the missing strings and keys of each locale,
+# from the translation memory of the locale
+def get_suggestions(results : dict, store : LocaleStore) -> dict:
+    memory = TranslationMemory(store.get(BASELINE_LANGUAGE))
+    suggestions = {}
+    for locale, result in results.items():
+        keys = {scope: list(keys) for scope, keys in result['missing_translations'].items()}
+        for scope, scope_keys in result['missing_keys'].items():
+            keys.setdefault(scope, []).extend(scope_keys or store.get(BASELINE_LANGUAGE)[scope])
+        if not keys:
+            continue
+        memory.add_locale(locale, store.get(locale))
+        locale_suggestions = memory.get_suggestions(locale, keys)
+        if locale_suggestions:
+            suggestions[locale] = locale_suggestions
+    return suggestions
+
+# Writes the suggested translations to the translation file of each locale, once per file
+def write_suggestions(suggestions : dict, store : LocaleStore):
+    baseline_language = store.get(BASELINE_LANGUAGE)
+    for locale, locale_suggestions in suggestions.items():
+        file_path = get_translation_file(locale, store.locales_path)
+        language = apply_suggestions(store.get(locale), baseline_language, locale_suggestions)
+        write_translation_file(file_path, language)
+        store.set(locale, language)
+        print(f'Applied {count_total_string(locale_suggestions)} suggested translations to {file_path}')
+
+def print_waivers_report(ignore_rules : IgnoreRules):
+    print('Ignore rules hits:')
+    print("\n".join(f'- {rule}: {ignore_rules.hits[rule.rule]}' for rule in ignore_rules.rules))
+    unused_rules = ignore_rules.get_unused_rules()
+    if unused_rules:
+        print('Unused ignore rules:')
+        print("\n".join(f'- {rule} (line {rule.line_number})' for rule in unused_rules))
+
+def get_report(config : Config, results : dict) -> Report:
+    errors_missing_keys = {locale: result['missing_keys'] for locale, result in results.items() if result['missing_keys']}
+    errors_extra_keys = {locale: result['extra_keys'] for locale, result in results.items() if result['extra_keys']}
+    missing_translations = {locale: result['missing_translations'] for locale, result in results.items()}
+    return Report(config, errors_missing_keys, errors_extra_keys, missing_translations)
+
+# Compares the localization of two refs, read from git, writing the comparison markdown to output_file (if passed)
+def compare_refs(baseline_ref : str, target_ref : str, config : Config, output_file : str, cache : ResultCache = None):
+    baseline_blobs = get_locale_blobs(baseline_ref)
+    target_blobs = get_locale_blobs(target_ref)
+    locales = get_changed_locales(baseline_blobs, target_blobs)
+
+    blob_ids = []
+    for blobs in [baseline_blobs, target_blobs]:
+        needed = [BASELINE_LANGUAGE] + [locale for locale in locales if locale in blobs]
+        blob_ids.extend(blobs[locale] for locale in needed)
+    # Identical blobs are only read and parsed once, even if used by both refs
+    languages = read_blobs(blob_ids) if locales else {}
+
+    baseline_report = get_report(config, get_results(locales, baseline_blobs, languages, cache))
+    target_report = get_report(config, get_results(locales, target_blobs, languages, cache))
+    ComparisonReport(output_file).report(baseline_report, target_report)
+
+def main(argv : list = None):
+    args = get_arguments(argv)
+    profiler = get_profiler()
+    if args.profile or args.profile_output:
+        profiler.enable()
+    run(args)
+    if profiler.enabled:
+        profiler.report(args.profile_output)
+
+def run(args):
     locales = args.locale
     output = args.output
+    profiler = get_profiler()
 
-    baseline_language = get_language(BASELINE_LANGUAGE)
+    with profiler.phase('load_cache'):
+        cache = None if args.no_cache or args.streaming else ResultCache(args.cache_file).load()
+    config = Config(args.report_summary, args.link_to_missing, args.report_key_mismatch, args.report_missing_translations, output)
+
+    if args.baseline_ref or args.target_ref:
+        if not args.baseline_ref or not args.target_ref:
+            raise Exception("Both -baseline_ref and -target_ref are required")
+        with profiler.phase('compare_refs'):
+            compare_refs(args.baseline_ref, args.target_ref, config, output, cache)
+        with profiler.phase('save_cache'):
+            if cache is not None:
+                cache.save()
+        return
+
+    if args.watch:
+        LocaleWatcher(locales, get_context().get_locale_store(), args.report_key_mismatch, args.report_missing_translations).run(args.watch_interval)
+        return
+
+    with profiler.phase('config'):
+        if config.report_summary:
+            for warning in validate_locales_information(get_locales_information_from_config()):
+                print(f'Warning: {warning}', file=sys.stderr)
+
+    store = get_context().get_locale_store()
+    if args.streaming:
+        results, total_strings = get_streaming_results(locales, store.locales_path)
+    else:
+        results = get_locale_results(locales, store, cache, args.jobs, args.verify_incremental)
+        total_strings = count_total_string(store.get(BASELINE_LANGUAGE))
+    with profiler.phase('save_cache'):
+        if cache is not None:
+            cache.save()
 
     errors_missing_keys = {}
     errors_extra_keys = {}
-
-    for locale in locales:
-        mising_keys = get_missing_keys(baseline_language, get_language(locale))
-        extra_keys = get_missing_keys(get_language(locale), baseline_language)
-        if mising_keys:
-            errors_missing_keys[locale] = mising_keys
-        if extra_keys:
-            errors_extra_keys[locale] = extra_keys
-
     missing_translations = {}
-    for locale in locales:
-        language = get_language(locale)
-        language_error = compare_language(locale, baseline_language, language)
-        missing_translations[locale] = language_error
+    invalid_translations = {}
+    ignore_rules = get_ignore_rules()
+    for locale, result in results.items():
+        ignore_rules.record_hits(locale, result['waived_translations'])
+        if result['missing_keys']:
+            errors_missing_keys[locale] = result['missing_keys']
+        if result['extra_keys']:
+            errors_extra_keys[locale] = result['extra_keys']
+        missing_translations[locale] = result['missing_translations']
+        if args.report_invalid_translations and result['invalid_translations']:
+            invalid_translations[locale] = result['invalid_translations']
+
+    suggestions = {}
+    if args.suggest_translations or args.apply_suggestions:
+        with profiler.phase('suggestions'):
+            suggestions = get_suggestions(results, store)
 
-    config = Config(args.report_summary, args.link_to_missing, args.report_key_mismatch, args.report_missing_translations, output)
     report = Report(config, errors_missing_keys, errors_extra_keys, missing_translations)
-    report.generate()
+    with profiler.phase('generate'):
+        report.generate(total_strings, args.summary_json, invalid_translations,
+                        suggestions if args.suggest_translations else None,
+                        {locale: result['counts'] for locale, result in results.items()})
+
+    if args.apply_suggestions:
+        with profiler.phase('apply_suggestions'):
+            write_suggestions(suggestions, store)
+
+    if args.metrics_db:
+        with profiler.phase('record_metrics'):
+            record_metrics(args.metrics_db, args.metrics_commit, store.get(BASELINE_LANGUAGE), results)
+
+    if args.report_waivers:
+        print_waivers_report(ignore_rules)
     
     if args.raw_report:
-        Path(args.raw_report).write_text(report.toJson())
+        with profiler.phase('raw_report'):
+            if args.raw_report_format == 'binary':
+                write_binary_report(report, args.raw_report)
+            else:
+                Path(args.raw_report).write_text(report.toJson())
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,16 @@
 import argparse
-import itertools
 import json
-from check_languages import Report
 from collections import defaultdict
+from profiler import get_profiler
+from raw_report import BinaryReport, is_binary_report
 
-def load_report(file : str) -> Report:
+# The reports are compared by their keys only: binary reports are read lazily, and the
+# checker, needed to load JSON reports, is only imported for them.
+
+def load_report(file : str) -> 'Report':
+    if is_binary_report(file):
+        return BinaryReport(file)
+    from check_languages import Report
     with open(file, 'r') as f:
         return Report.fromJSON(f.read())
 
@@ -18,28 +24,40 @@ def __init__(self, output_file : str):
         self.introduced_missing_translations = defaultdict(dict)
         self.output_file = output_file
 
-    def flattenize_keys(keys : dict):
+    def flattenize_keys(keys : dict) -> set:
         # keys are stored as in the translation file, that is, with a scope as a key
         # and then the list of strings. To allow comparison, we flattenize the keys,
-        # creating a set of strings like '$scope.string' for example
-        out = [list(zip(keys, x)) for x in itertools.product(*keys.values())]
-        out = [f'{x[0][0]}.{x[0][1]}' if x else None for x in out]
-        return set(filter(lambda x: x, out))
+        # creating a set of strings like '$scope.string' for example.
+        # A whole scope missing (or extra) is stored as an empty list, and kept as '$scope'.
+        # This is linear on the total number of keys across all scopes.
+        return {f'{scope}.{key}' for scope, scope_keys in keys.items() for key in scope_keys} | \
+            {scope for scope, scope_keys in keys.items() if not scope_keys}
+
+    def diff_keys(baseline_keys : dict, target_keys : dict):
+        # Single hash pass over both sides: returns the flattened keys only present
+        # on the baseline (fixed) and only present on the target (introduced), sorted
+        # so the output does not depend on set iteration order
+        baseline = ComparisonReport.flattenize_keys(baseline_keys)
+        target = ComparisonReport.flattenize_keys(target_keys)
+        return sorted(baseline - target), sorted(target - baseline)
 
     def process(baseline_info : dict, target_info : dict):
         fixed_report = {}
         introduced_report = {}
-        for locale in set(baseline_info | target_info):
-            baseline = ComparisonReport.flattenize_keys(baseline_info.get(locale, {}))
-            target = ComparisonReport.flattenize_keys(target_info.get(locale, {}))
-            fixed = baseline - target
-            new = target - baseline
+        for locale in sorted(baseline_info.keys() | target_info.keys()):
+            fixed, new = ComparisonReport.diff_keys(baseline_info.get(locale, {}), target_info.get(locale, {}))
             if fixed:
-                fixed_report[locale] = list(fixed)
+                fixed_report[locale] = fixed
             if new:
-                introduced_report[locale] = list(new)
+                introduced_report[locale] = new
         return fixed_report, introduced_report
 
+    def get_keys(report : 'Report', name : str) -> dict:
+        # Binary raw reports can return the keys without reading the translated values
+        if hasattr(report, 'get_keys'):
+            return report.get_keys(name)
+        return getattr(report, name)
+
     def get_snippet_report(fixed : dict, introduced : dict):
         out_str = ''
         if fixed:
@@ -48,14 +66,22 @@ def get_snippet_report(fixed : dict, introduced : dict):
             out_str += f'**⚠️ Introduced**: \n```\n{json.dumps(introduced, indent=2)}\n```\n'
         return out_str
 
-    def report(self, baseline_report : Report, target_report : Report):
-        self.fixed_missing_keys, self.introduced_missing_keys = ComparisonReport.process(
-            baseline_report.errors_missing_keys, target_report.errors_missing_keys)
-        self.fixed_extra_keys, self.introduced_extra_keys = ComparisonReport.process(
-            baseline_report.errors_extra_keys, target_report.errors_extra_keys)
-        self.fixed_missing_translations, self.introduced_missing_translations = ComparisonReport.process(
-            baseline_report.missing_translations, target_report.missing_translations)
+    def report(self, baseline_report : 'Report', target_report : 'Report'):
+        with get_profiler().phase('diff_reports'):
+            self.fixed_missing_keys, self.introduced_missing_keys = ComparisonReport.process(
+                ComparisonReport.get_keys(baseline_report, 'errors_missing_keys'),
+                ComparisonReport.get_keys(target_report, 'errors_missing_keys'))
+            self.fixed_extra_keys, self.introduced_extra_keys = ComparisonReport.process(
+                ComparisonReport.get_keys(baseline_report, 'errors_extra_keys'),
+                ComparisonReport.get_keys(target_report, 'errors_extra_keys'))
+            self.fixed_missing_translations, self.introduced_missing_translations = ComparisonReport.process(
+                ComparisonReport.get_keys(baseline_report, 'missing_translations'),
+                ComparisonReport.get_keys(target_report, 'missing_translations'))
 
+        with get_profiler().phase('write_comparison'):
+            self.write()
+
+    def write(self):
         out_str = '# Localization report\n'
         if self.fixed_missing_keys or self.introduced_missing_keys:
             out_str += '## Missing Keys:\n'
@@ -79,23 +105,33 @@ def report(self, baseline_report : Report, target_report : Report):
             with open(self.output_file, 'w', encoding="utf8") as f:
                 f.write(out_str)
         
-def get_arguments():
+def get_arguments(argv : list = None):
     parser = argparse.ArgumentParser()
     parser.add_argument("-output", help="Output markdown report file")
     parser.add_argument("-baseline", help="File path for the baseline report")
     parser.add_argument("-target", help="File path for the target report")
-    return parser.parse_args()
+    parser.add_argument("-profile", help="Prints the time, calls and peak memory of each phase to stderr", action='store_true')
+    parser.add_argument("-profile_output", help="File path for the profile, as JSON")
+    return parser.parse_args(argv)
 
-def main():
-    args = get_arguments()
+def main(argv : list = None):
+    args = get_arguments(argv)
 
     if not args.baseline or not args.target:
         raise Exception("Missing arguments")
 
-    baseline_report = load_report(args.baseline)
-    target_report = load_report(args.target)
+    profiler = get_profiler()
+    if args.profile or args.profile_output:
+        profiler.enable()
+
+    with profiler.phase('load_reports'):
+        baseline_report = load_report(args.baseline)
+        target_report = load_report(args.target)
     report = ComparisonReport(args.output)
     report.report(baseline_report, target_report)
 
+    if profiler.enabled:
+        profiler.report(args.profile_output)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+import json
+import re
+import subprocess
+from key_index import KeyIndex
+from locale_checks import BASELINE_LANGUAGE, LOCALES_PATH, check_locale, get_keys_to_ignore_hash
+from localization_cache import ResultCache, get_cache_key
+from string_validators import TranslationValidator
+
+# Reads and checks the translation files of refs straight from the git object store,
+# without checking out any of them, to compare two refs and to backfill the metrics.
+# Only the translation files whose blob differs between the two refs need to be read
+# and checked, as the results of a locale only depend on its translation file and on
+# the baseline one.
+
+TRANSLATION_PATH_REGEX = re.compile(r'^{}/?([^/]+)/translation\.json$'.format(re.escape(LOCALES_PATH.rstrip('/'))))
+
+def run_git(args : list, input : bytes = None) -> bytes:
+    return subprocess.run(['git', *args], input=input, stdout=subprocess.PIPE, check=True).stdout
+
+# Returns a dict of locale -> blob id of its translation file for the given ref
+def get_locale_blobs(ref : str) -> dict:
+    output = run_git(['ls-tree', '-r', '--full-tree', ref, '--', LOCALES_PATH]).decode('utf8')
+    blobs = {}
+    for line in output.splitlines():
+        info, path = line.split('\t', 1)
+        _, object_type, blob_id = info.split()
+        match = TRANSLATION_PATH_REGEX.match(path)
+        if object_type == 'blob' and match:
+            blobs[match.group(1)] = blob_id
+    return blobs
+
+# Reads and parses all the blobs with a single git process, returning a dict of blob id -> language
+def read_blobs(blob_ids : list) -> dict:
+    blob_ids = list(dict.fromkeys(blob_ids))
+    if not blob_ids:
+        return {}
+    output = run_git(['cat-file', '--batch'], input='\n'.join(blob_ids).encode('utf8') + b'\n')
+    languages = {}
+    position = 0
+    for blob_id in blob_ids:
+        header_end = output.index(b'\n', position)
+        _, _, size = output[position:header_end].split()
+        content_start = header_end + 1
+        content_end = content_start + int(size)
+        languages[blob_id] = json.loads(output[content_start:content_end].decode('utf8'))
+        # Each content is followed by a line feed
+        position = content_end + 1
+    return languages
+
+# Returns the locales whose results may differ between the two refs
+def get_changed_locales(baseline_blobs : dict, target_blobs : dict) -> list:
+    locales = (baseline_blobs.keys() | target_blobs.keys()) - {BASELINE_LANGUAGE}
+    if baseline_blobs.get(BASELINE_LANGUAGE) != target_blobs.get(BASELINE_LANGUAGE):
+        return sorted(locales)
+    return sorted(locale for locale in locales if baseline_blobs.get(locale) != target_blobs.get(locale))
+
+# Returns the results of the locales available in the ref, taken from the cache when possible
+def get_results(locales : list, blobs : dict, languages : dict, cache : ResultCache = None) -> dict:
+    baseline_blob = blobs[BASELINE_LANGUAGE]
+    ignore_hash = get_keys_to_ignore_hash()
+    index = None
+    validator = None
+    results = {}
+    for locale in locales:
+        if locale not in blobs:
+            continue
+        cache_key = get_cache_key('git', baseline_blob, locale, blobs[locale], ignore_hash)
+        result = cache.get(cache_key) if cache is not None else None
+        if result is None:
+            if index is None:
+                index = KeyIndex(languages[baseline_blob])
+                validator = TranslationValidator(index)
+            result = check_locale(locale, languages[baseline_blob], languages[blobs[locale]], index, validator)
+            if cache is not None:
+                cache.put(cache_key, result)
+        results[locale] = result
+    return results
@@ -0,0 +1,113 @@
+import fnmatch
+import os
+import re
+from collections import Counter
+from localization_cache import hash_bytes
+
+# Waivers for translations allowed to have the same value as the baseline one.
+# Rules are read from a data file, one per line, as [<locale>:]<scope>.<key>, where
+# each part can use wildcards. They are compiled lazily, once per (locale, scope),
+# into a frozenset of literal keys plus a single regex for the wildcard keys.
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'resources', 'ignored_translations.txt')
+WILDCARD_CHARS = re.compile(r'[*?\[]')
+
+class IgnoreRule:
+    def __init__(self, rule : str, line_number : int = 0):
+        self.rule = rule
+        self.line_number = line_number
+        locale_pattern, separator, scope_key = rule.partition(':')
+        if not separator or '.' in locale_pattern:
+            # No locale given, the rule applies to all of them
+            locale_pattern, scope_key = '*', rule
+        self.locale = locale_pattern
+        self.scope, separator, self.key = scope_key.partition('.')
+        if not separator or not self.scope or not self.key:
+            raise ValueError(f'Invalid ignore rule in line {line_number}: {rule}')
+        self.has_key_wildcard = bool(WILDCARD_CHARS.search(self.key))
+        self._key_regex = re.compile(fnmatch.translate(self.key)) if self.has_key_wildcard else None
+
+    def applies_to(self, locale : str, scope : str) -> bool:
+        return fnmatch.fnmatchcase(locale, self.locale) and fnmatch.fnmatchcase(scope, self.scope)
+
+    def matches_key(self, key : str) -> bool:
+        return bool(self._key_regex.match(key)) if self.has_key_wildcard else key == self.key
+
+    def __repr__(self):
+        return self.rule
+
+# Keys ignored for a (locale, scope), supporting `key in keys_to_ignore`
+class IgnoredKeys:
+    def __init__(self, keys : frozenset, pattern : re.Pattern = None):
+        self.keys = keys
+        self.pattern = pattern
+
+    def __contains__(self, key : str) -> bool:
+        return key in self.keys or (self.pattern is not None and self.pattern.match(key) is not None)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys) or self.pattern is not None
+
+NO_IGNORED_KEYS = IgnoredKeys(frozenset())
+
+class IgnoreRules:
+    def __init__(self, rules : list, source : str = ''):
+        self.rules = rules
+        self.hash = hash_bytes(source.encode('utf8'))
+        # Number of translations each rule waived
+        self.hits = Counter()
+        self._compiled = {}
+        self._rules_for = {}
+
+    def parse(text : str) -> 'IgnoreRules':
+        rules = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                rules.append(IgnoreRule(line, line_number))
+        return IgnoreRules(rules, text)
+
+    def load(file_path : str = DEFAULT_RULES_FILE) -> 'IgnoreRules':
+        with open(file_path, encoding='utf8') as f:
+            return IgnoreRules.parse(f.read())
+
+    def get_rules(self, locale : str, scope : str) -> list:
+        if (locale, scope) not in self._rules_for:
+            self._rules_for[(locale, scope)] = [rule for rule in self.rules if rule.applies_to(locale, scope)]
+        return self._rules_for[(locale, scope)]
+
+    def get_keys_to_ignore(self, locale : str, scope : str) -> IgnoredKeys:
+        compiled = self._compiled.get((locale, scope))
+        if compiled is None:
+            rules = self.get_rules(locale, scope)
+            keys = frozenset(rule.key for rule in rules if not rule.has_key_wildcard)
+            patterns = [fnmatch.translate(rule.key) for rule in rules if rule.has_key_wildcard]
+            pattern = re.compile('|'.join(patterns)) if patterns else None
+            compiled = IgnoredKeys(keys, pattern) if keys or pattern else NO_IGNORED_KEYS
+            self._compiled[(locale, scope)] = compiled
+        return compiled
+
+    # Counts the rules responsible for the waived keys of a locale, a dict of scope -> list of keys
+    def record_hits(self, locale : str, waived : dict):
+        for scope, keys in waived.items():
+            rules = self.get_rules(locale, scope)
+            for key in keys:
+                self.hits.update(rule.rule for rule in rules if rule.matches_key(key))
+
+    # Rules that did not waive any translation, candidates to be removed
+    def get_unused_rules(self) -> list:
+        return [rule for rule in self.rules if not self.hits[rule.rule]]
+
+# Rules of the default file shared by the scripts of a process, loaded once
+_ignore_rules = None
+
+def get_ignore_rules() -> IgnoreRules:
+    global _ignore_rules
+    if _ignore_rules is None:
+        _ignore_rules = IgnoreRules.load()
+    return _ignore_rules
+
+# Drops the shared rules and their hits, the next call to get_ignore_rules loading them again
+def reset_ignore_rules():
+    global _ignore_rules
+    _ignore_rules = None
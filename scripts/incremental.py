@@ -0,0 +1,164 @@
+from string_validators import validate_translation
+
+# Incremental update of the per-locale results when the baseline language changes.
+#
+# The results of a locale only change in the keys touched by the baseline delta, so
+# instead of checking every scope again, only those (scope, key) cells are updated.
+# Scopes added to or removed from the baseline change the meaning of the whole scope
+# for the locale (e.g. all its keys become extra keys), so those are checked again.
+# Updated entries keep the order of a full check: baseline order, followed by the
+# keys the baseline does not have, in the order of the locale file.
+
+RESULT_SECTIONS = ['missing_keys', 'extra_keys', 'missing_translations', 'waived_translations', 'invalid_translations']
+# Sections following the order of the locale file, instead of the baseline one
+LANGUAGE_ORDER_SECTIONS = ['extra_keys', 'invalid_translations']
+
+class BaselineDelta:
+    def __init__(self, old_baseline : dict, new_baseline : dict):
+        self.added_scopes = [scope for scope in new_baseline if scope not in old_baseline]
+        self.removed_scopes = [scope for scope in old_baseline if scope not in new_baseline]
+        # scope -> keys added, removed or with a different value
+        self.changed_keys = {}
+        for scope, entries in new_baseline.items():
+            if scope not in old_baseline:
+                continue
+            old_entries = old_baseline[scope]
+            changed = [key for key, value in entries.items() if old_entries.get(key, None) != value or key not in old_entries]
+            changed.extend(key for key in old_entries if key not in entries)
+            if changed:
+                self.changed_keys[scope] = changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added_scopes or self.removed_scopes or self.changed_keys)
+
+    def count_cells(self) -> int:
+        return sum(len(keys) for keys in self.changed_keys.values())
+
+# Returns the results of a single scope, as a full check would compute them
+def check_scope(scope : str, baseline_language : dict, language : dict, keys_to_ignore) -> dict:
+    results = {section: {} for section in RESULT_SECTIONS}
+    if scope in baseline_language and scope not in language:
+        results['missing_keys'][scope] = []
+    elif scope in language and scope not in baseline_language:
+        results['extra_keys'][scope] = []
+    elif scope in language:
+        baseline_scope = baseline_language[scope]
+        scope_values = language[scope]
+        missing_keys = [key for key in baseline_scope if key not in scope_values]
+        extra_keys = [key for key in scope_values if key not in baseline_scope]
+        if missing_keys:
+            results['missing_keys'][scope] = missing_keys
+        if extra_keys:
+            results['extra_keys'][scope] = extra_keys
+        ignored = keys_to_ignore(scope)
+        equal_keys = [key for key in baseline_scope if key in scope_values and scope_values[key] == baseline_scope[key]]
+        equal_keys.extend(extra_keys)
+        untranslated = {key: scope_values[key] for key in equal_keys if key not in ignored}
+        waived = [key for key in equal_keys if key in ignored]
+        if untranslated:
+            results['missing_translations'][scope] = untranslated
+        if waived:
+            results['waived_translations'][scope] = waived
+        invalid = {}
+        for key, value in scope_values.items():
+            if key in baseline_scope and value != baseline_scope[key]:
+                errors = validate_translation(baseline_scope[key], value)
+                if errors:
+                    invalid[key] = errors
+        if invalid:
+            results['invalid_translations'][scope] = invalid
+    return results
+
+# Returns a function giving the position of a key in the order of a full check
+def _get_key_order(baseline_scope : dict, scope_values : dict):
+    baseline_positions = {key: position for position, key in enumerate(baseline_scope)}
+    language_positions = {}
+    def order(key : str) -> int:
+        if key in baseline_positions:
+            return baseline_positions[key]
+        if not language_positions:
+            language_positions.update((key, position) for position, key in enumerate(scope_values))
+        # A key removed from the baseline, still listed until its own update removes it
+        return len(baseline_positions) + language_positions.get(key, len(language_positions))
+    return order
+
+# Order of the scopes of a section of the results in a full check
+def _get_scope_order(section : str, baseline_language : dict, language : dict) -> list:
+    if section in LANGUAGE_ORDER_SECTIONS:
+        return list(language)
+    return list(baseline_language)
+
+# Places the scope entry of a section of the results at the position a full check would give it
+def _set_scope(results : dict, section : str, scope : str, value, baseline_language : dict, language : dict):
+    entries = results[section]
+    if value is None:
+        entries.pop(scope, None)
+        return
+    if scope in entries:
+        entries[scope] = value
+        return
+    entries[scope] = value
+    positions = {x: position for position, x in enumerate(_get_scope_order(section, baseline_language, language))}
+    scopes = sorted(entries, key=lambda x: positions.get(x, len(positions)))
+    if list(entries) != scopes:
+        reordered = {x: entries[x] for x in scopes}
+        entries.clear()
+        entries.update(reordered)
+
+def _update_cell(results : dict, scope : str, key : str, baseline_language : dict, language : dict, keys_to_ignore):
+    baseline_scope = baseline_language[scope]
+    scope_values = language[scope]
+    in_baseline = key in baseline_scope
+    in_language = key in scope_values
+    is_equal = in_language and (not in_baseline or baseline_scope[key] == scope_values[key])
+    is_ignored = is_equal and key in keys_to_ignore(scope)
+    order = _get_key_order(baseline_scope, scope_values)
+
+    def update_list(section : str, include : bool):
+        keys = [x for x in results[section].get(scope, []) if x != key]
+        if include:
+            keys.append(key)
+            keys.sort(key=order)
+        _set_scope(results, section, scope, keys or None, baseline_language, language)
+
+    update_list('missing_keys', in_baseline and not in_language)
+    update_list('extra_keys', in_language and not in_baseline)
+    update_list('waived_translations', is_ignored)
+    untranslated = {x: value for x, value in results['missing_translations'].get(scope, {}).items() if x != key}
+    if is_equal and not is_ignored:
+        untranslated[key] = scope_values[key]
+        untranslated = {x: untranslated[x] for x in sorted(untranslated, key=order)}
+    _set_scope(results, 'missing_translations', scope, untranslated or None, baseline_language, language)
+
+    invalid = {x: errors for x, errors in results['invalid_translations'].get(scope, {}).items() if x != key}
+    errors = validate_translation(baseline_scope[key], scope_values[key]) if in_baseline and in_language and not is_equal else []
+    if errors:
+        invalid[key] = errors
+        language_positions = {x: position for position, x in enumerate(scope_values)}
+        invalid = {x: invalid[x] for x in sorted(invalid, key=language_positions.get)}
+    _set_scope(results, 'invalid_translations', scope, invalid or None, baseline_language, language)
+
+# Same counts as LocaleCoverage.counts, from the results, as the updated results have no coverage
+def count_results(results : dict, baseline_language : dict, language : dict) -> dict:
+    return {
+        'missing_keys': sum(len(keys) or len(baseline_language[scope]) for scope, keys in results['missing_keys'].items()),
+        'extra_keys': sum(len(keys) or len(language[scope]) for scope, keys in results['extra_keys'].items()),
+        'missing_translations': sum(len(values) for values in results['missing_translations'].values()),
+    }
+
+# Updates, in place, the results of a locale after the baseline changed by delta
+def update_locale_results(results : dict, delta : BaselineDelta, baseline_language : dict, language : dict, keys_to_ignore):
+    for section in RESULT_SECTIONS:
+        results.setdefault(section, {})
+    for scope, keys in delta.changed_keys.items():
+        if scope not in language:
+            # The whole scope is missing, whatever keys changed
+            continue
+        for key in keys:
+            _update_cell(results, scope, key, baseline_language, language, keys_to_ignore)
+    for scope in delta.added_scopes + delta.removed_scopes:
+        scope_results = check_scope(scope, baseline_language, language, keys_to_ignore)
+        for section in RESULT_SECTIONS:
+            _set_scope(results, section, scope, scope_results[section].get(scope), baseline_language, language)
+    results['counts'] = count_results(results, baseline_language, language)
+    return results
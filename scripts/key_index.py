@@ -0,0 +1,152 @@
+# Interned index of the baseline keys, giving every '$scope.key' an integer id.
+#
+# The coverage of a locale is kept as two flag vectors over those ids: keys present
+# in the locale and keys whose value is identical to the baseline one. Each vector is
+# a bytearray with one byte per key, so the keys of a scope with a flag set (or not)
+# are found with bytes.find over the range of ids of the scope, and the counts of the
+# reports are bytes.count over the whole vectors.
+
+# Returns the ids of the keys whose flag is the given one, in the [start, end) range
+def get_flagged_ids(vector : bytes, start : int = 0, end : int = None, flag : int = 1) -> list:
+    end = len(vector) if end is None else end
+    ids = []
+    key_id = vector.find(flag, start, end)
+    while key_id != -1:
+        ids.append(key_id)
+        key_id = vector.find(flag, key_id + 1, end)
+    return ids
+
+class KeyIndex:
+    def __init__(self, baseline_language : dict):
+        self.baseline_language = baseline_language
+        # id -> (scope, key), ids of a scope are contiguous
+        self.keys = []
+        # id -> baseline value
+        self.values = []
+        # scope -> {key: id}
+        self.ids = {}
+        # scope -> (first id, last id + 1)
+        self.scope_ranges = {}
+        for scope, entries in baseline_language.items():
+            start = len(self.keys)
+            self.ids[scope] = {}
+            for key, value in entries.items():
+                self.ids[scope][key] = len(self.keys)
+                self.keys.append((scope, key))
+                self.values.append(value)
+            self.scope_ranges[scope] = (start, len(self.keys))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get_coverage(self, language : dict, validator = None) -> 'LocaleCoverage':
+        return LocaleCoverage(self, language, validator)
+
+# Coverage of a locale over the baseline keys. Keys the baseline does not have cannot
+# be indexed, so they are kept apart as extra keys.
+# The validator (if passed) checks, in the same pass, every translated key (present with
+# a value different from the baseline one) of the scopes needing validation.
+class LocaleCoverage:
+    def __init__(self, index : KeyIndex, language : dict, validator = None):
+        self.index = index
+        self.language = language
+        present = bytearray(len(index))
+        identical = bytearray(len(index))
+        values = index.values
+        # scope -> list of keys not in the baseline (empty if the whole scope is not in the baseline)
+        self.extra = {}
+        # scope -> {key: errors}
+        self.invalid = {}
+        # Number of keys of the scopes the baseline does not have
+        self.unknown_scope_keys = 0
+        for scope, entries in language.items():
+            scope_ids = index.ids.get(scope)
+            if scope_ids is None:
+                self.extra[scope] = []
+                self.unknown_scope_keys += len(entries)
+                continue
+            extra_keys = []
+            invalid_keys = {}
+            validate = validator is not None and validator.needs_validation(scope, entries)
+            for key, value in entries.items():
+                key_id = scope_ids.get(key)
+                if key_id is None:
+                    extra_keys.append(key)
+                else:
+                    present[key_id] = 1
+                    if values[key_id] == value:
+                        identical[key_id] = 1
+                    elif validate:
+                        errors = validator.validate(key_id, value)
+                        if errors:
+                            invalid_keys[key] = errors
+            if extra_keys:
+                self.extra[scope] = extra_keys
+            if invalid_keys:
+                self.invalid[scope] = invalid_keys
+        self.present = present
+        self.identical = identical
+
+    # Same as get_missing_keys(baseline_language, language)
+    def missing_keys(self) -> dict:
+        index = self.index
+        missing_keys = {}
+        for scope, (start, end) in index.scope_ranges.items():
+            if scope not in self.language:
+                missing_keys[scope] = []
+                continue
+            ids = get_flagged_ids(self.present, start, end, flag=0)
+            if ids:
+                missing_keys[scope] = [index.keys[key_id][1] for key_id in ids]
+        return missing_keys
+
+    # Same as get_missing_keys(language, baseline_language)
+    def extra_keys(self) -> dict:
+        return {scope: list(keys) for scope, keys in self.extra.items()}
+
+    # Errors of the translated keys found by the validate function, per scope
+    def invalid_keys(self) -> dict:
+        return {scope: dict(keys) for scope, keys in self.invalid.items()}
+
+    # Keys with the same value as the baseline, and keys the baseline does not have, per scope
+    def _equal_keys(self):
+        index = self.index
+        for scope, (start, end) in index.scope_ranges.items():
+            if scope in self.language:
+                keys = [index.keys[key_id][1] for key_id in get_flagged_ids(self.identical, start, end)]
+                keys.extend(self.extra.get(scope, []))
+                yield scope, keys
+
+    # Same values as compare_language(locale, baseline_language, language), given the keys to
+    # ignore as a function of scope -> keys. The keys are listed in the baseline order, then
+    # the extra keys in the locale order, where compare_language follows the locale order.
+    def untranslated(self, get_keys_to_ignore) -> dict:
+        errors = {}
+        for scope, keys in self._equal_keys():
+            keys_to_ignore = get_keys_to_ignore(scope)
+            scope_values = self.language[scope]
+            equal_values = {key: scope_values[key] for key in keys if key not in keys_to_ignore}
+            if equal_values:
+                errors[scope] = equal_values
+        return errors
+
+    # Keys left out of untranslated() because they are ignored
+    def waived(self, get_keys_to_ignore) -> dict:
+        waived = {}
+        for scope, keys in self._equal_keys():
+            keys_to_ignore = get_keys_to_ignore(scope)
+            waived_keys = [key for key in keys if key in keys_to_ignore] if keys_to_ignore else []
+            if waived_keys:
+                waived[scope] = waived_keys
+        return waived
+
+    # Counts of the results, from the flag vectors: the missing keys (all the keys of a missing
+    # scope), the extra keys (all the keys of a scope not in the baseline) and the missing
+    # translations, the equal values and extra keys of the baseline scopes not waived
+    def counts(self, waived : dict) -> dict:
+        extra_keys = sum(len(keys) for keys in self.extra.values())
+        return {
+            'missing_keys': len(self.index) - self.present.count(1),
+            'extra_keys': extra_keys + self.unknown_scope_keys,
+            'missing_translations': self.identical.count(1) + extra_keys - sum(len(keys) for keys in waived.values()),
+        }
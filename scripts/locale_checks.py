@@ -0,0 +1,123 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from ignore_rules import get_ignore_rules
+from key_index import KeyIndex
+from profiler import get_profiler
+from string_validators import TranslationValidator
+
+# The translation files of the locales and the checks of a locale against the baseline
+# language. They are kept apart from the reports of check_languages.py, so the modules
+# check_languages.py runs (git_locales.py, watch_locales.py, localization_metrics.py and
+# the tool context) can use them without importing it back.
+
+LOCALES_PATH = 'locales/'
+BASELINE_LANGUAGE = 'en'
+
+# Returns the path of the translation file for a language
+def get_translation_file(language : str, locales_path : str = LOCALES_PATH) -> str:
+    return '{}/{}/translation.json'.format(locales_path, language)
+
+# Reurns the dict of translations for a language
+def get_language(language : str, locales_path : str = LOCALES_PATH) -> dict:
+    with open(get_translation_file(language, locales_path), encoding="utf8") as f:
+        return json.load(f)
+
+# Parses each translation file only once, loading them concurrently, so all the
+# checks share the same dicts. The dicts handed out must be treated as read-only.
+class LocaleStore:
+    def __init__(self, locales_path : str = LOCALES_PATH):
+        self.locales_path = locales_path
+        self._languages = {}
+
+    def load(self, locales : list, jobs : int = None):
+        to_load = [locale for locale in dict.fromkeys(locales) if locale not in self._languages]
+        if to_load:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                languages = executor.map(lambda locale: get_language(locale, self.locales_path), to_load)
+                self._languages.update(zip(to_load, languages))
+        return self
+
+    def get(self, locale : str) -> dict:
+        if locale not in self._languages:
+            self._languages[locale] = get_language(locale, self.locales_path)
+        return self._languages[locale]
+
+    # Replaces the language of the locale, after its translation file was written
+    def set(self, locale : str, language : dict):
+        self._languages[locale] = language
+
+    # Parses the translation file of the locale again, after it changed
+    def reload(self, locale : str) -> dict:
+        self._languages[locale] = get_language(locale, self.locales_path)
+        return self._languages[locale]
+
+    def __contains__(self, locale : str) -> bool:
+        return locale in self._languages
+
+# Count number of strings for translation from language dict
+def count_total_string(language : dict) -> int:
+    total = 0
+    for scope in language:
+        total += len(language[scope])
+    return total
+
+# Returns the data as indented JSON, as used by the reports and the issue bodies
+def dump_json(data) -> str:
+    try:
+        return json.dumps(data, indent=2)
+    except:
+        return f'{data}'
+
+# Statistics of the missing translations of a locale, computed once per report
+class LocaleStats:
+    def __init__(self, locale : str, missing_translations : dict, total_strings_for_translation : int, suggestions : dict = None, missing_strings : int = None):
+        self.locale = locale
+        self.missing_translations = missing_translations
+        self.suggestions = suggestions
+        # The count of the results if passed, counted from the missing translations otherwise
+        self.missing_strings = count_total_string(missing_translations) if missing_strings is None else missing_strings
+        self.percentage_not_translated = (100 * self.missing_strings)/total_strings_for_translation
+        self.percentage_translated = 100 - self.percentage_not_translated
+        self._json = None
+
+    def get_json(self) -> str:
+        if self._json is None:
+            self._json = dump_json(self.missing_translations)
+        return self._json
+
+# Get which keys should be ignored based on the waivers in the ignore rules file
+def get_keys_to_ignore(locale : str, scope : str):
+    return get_ignore_rules().get_keys_to_ignore(locale, scope)
+
+# Hash of the waivers, so cached results are invalidated when they change
+def get_keys_to_ignore_hash() -> str:
+    return get_ignore_rules().hash
+
+# Runs all the checks for a single locale, returning its results
+# The index of the baseline keys and the validator of its strings can be shared between locales
+def check_locale(locale : str, baseline_language : dict, language : dict, index : KeyIndex = None, validator : TranslationValidator = None) -> dict:
+    profiler = get_profiler()
+    if index is None:
+        with profiler.phase('key_index'):
+            index = KeyIndex(baseline_language)
+    if validator is None:
+        with profiler.phase('validator'):
+            validator = TranslationValidator(index)
+    # The translations are validated in the same pass
+    with profiler.phase('coverage', locale):
+        coverage = index.get_coverage(language, validator)
+    keys_to_ignore = lambda scope: get_keys_to_ignore(locale, scope)
+    with profiler.phase('key_diff', locale):
+        missing_keys = coverage.missing_keys()
+        extra_keys = coverage.extra_keys()
+    with profiler.phase('equal_values', locale):
+        missing_translations = coverage.untranslated(keys_to_ignore)
+        waived_translations = coverage.waived(keys_to_ignore)
+    return {
+        'missing_keys': missing_keys,
+        'extra_keys': extra_keys,
+        'missing_translations': missing_translations,
+        'waived_translations': waived_translations,
+        'invalid_translations': coverage.invalid_keys(),
+        'counts': coverage.counts(waived_translations),
+    }
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from atomic_write import write_file_atomically
+from collections import OrderedDict
+
+# Bump whenever the content of the cached results changes, so stale entries are not reused
+CACHE_VERSION = 4
+DEFAULT_CACHE_FILE = '.localization_cache.json'
+DEFAULT_MAX_ENTRIES = 512
+
+def hash_bytes(data : bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(file_path : str) -> str:
+    with open(file_path, 'rb') as f:
+        return hash_bytes(f.read())
+
+def get_cache_key(*parts : str) -> str:
+    return hash_bytes(':'.join([str(CACHE_VERSION), *parts]).encode('utf8'))
+
+# On-disk cache of the per-locale localization results, bounded in size.
+# Entries are kept in least-recently-used order and the oldest ones are evicted
+# when there are more than max_entries.
+class ResultCache:
+    def __init__(self, cache_file : str = DEFAULT_CACHE_FILE, max_entries : int = DEFAULT_MAX_ENTRIES):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._modified = False
+
+    def load(self):
+        try:
+            with open(self.cache_file, encoding='utf8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # Missing or corrupted cache, start from scratch
+            return self
+        if isinstance(data, dict) and data.get('version') == CACHE_VERSION:
+            self._entries = OrderedDict(data.get('entries', {}))
+        return self
+
+    def get(self, key : str) -> dict:
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        self._modified = True
+        return self._entries[key]
+
+    def put(self, key : str, result : dict):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._modified = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self):
+        if not self._modified:
+            return
+        # Written atomically, so an interrupted run never leaves a broken cache
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+        write_file_atomically(self.cache_file, json.dumps({'version': CACHE_VERSION, 'entries': self._entries}), 'utf8')
+        self._modified = False
@@ -0,0 +1,322 @@
+import argparse
+import sqlite3
+from datetime import datetime, timezone
+from git_locales import get_locale_blobs, get_results, read_blobs, run_git
+from locale_checks import BASELINE_LANGUAGE, count_total_string
+from localization_cache import ResultCache
+from profiler import get_profiler
+
+# History of the localization metrics, stored in SQLite keyed by commit: the translated
+# percentage and missing counts of every locale, and of every scope of every locale.
+#
+# The metrics tables are clustered on (locale, ..., commit), so the trend of a locale or
+# a scope is a range scan, and the recent commits are found through the commit position index.
+# Queries only ever read the rows of the commits they cover, whatever the history size.
+
+DEFAULT_METRICS_DB = 'localization_metrics.db'
+# The results of the backfilled commits have a cache file of their own, so a backfill
+# never pushes the results of check_languages.py out of its cache
+DEFAULT_CACHE_FILE = '.localization_metrics_cache.json'
+DEFAULT_LAST_COMMITS = 200
+# Commits recorded by the backfill between two writes to the database
+BACKFILL_BATCH_SIZE = 100
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS commits (
+    id INTEGER PRIMARY KEY,
+    sha TEXT NOT NULL UNIQUE,
+    -- Number of first-parent ancestors, ordering the commits of a branch even when
+    -- several share the same date
+    position INTEGER NOT NULL,
+    committed_at INTEGER NOT NULL,
+    total_strings INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS commits_by_position ON commits (position, committed_at, id);
+CREATE TABLE IF NOT EXISTS locale_metrics (
+    locale TEXT NOT NULL,
+    commit_id INTEGER NOT NULL REFERENCES commits (id) ON DELETE CASCADE,
+    percentage_translated REAL NOT NULL,
+    missing_keys INTEGER NOT NULL,
+    missing_translations INTEGER NOT NULL,
+    PRIMARY KEY (locale, commit_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS locale_metrics_by_commit ON locale_metrics (commit_id);
+CREATE TABLE IF NOT EXISTS scope_metrics (
+    locale TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    commit_id INTEGER NOT NULL REFERENCES commits (id) ON DELETE CASCADE,
+    total_strings INTEGER NOT NULL,
+    missing_keys INTEGER NOT NULL,
+    missing_translations INTEGER NOT NULL,
+    PRIMARY KEY (locale, scope, commit_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scope_metrics_by_commit ON scope_metrics (commit_id);
+-- Scopes of a locale whose missing strings (untranslated or missing keys) increased in a
+-- commit compared to the previous recorded one, so the regressions are never recomputed
+CREATE TABLE IF NOT EXISTS scope_regressions (
+    commit_id INTEGER NOT NULL REFERENCES commits (id) ON DELETE CASCADE,
+    locale TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    regressed_strings INTEGER NOT NULL,
+    PRIMARY KEY (commit_id, locale, scope)
+) WITHOUT ROWID;
+'''
+
+# The last commits, by position in the history
+RECENT_COMMITS = 'SELECT id, sha, position, committed_at FROM commits ORDER BY position DESC, committed_at DESC, id DESC LIMIT ?'
+
+TREND_QUERY = f'''
+WITH recent AS ({RECENT_COMMITS})
+SELECT recent.sha, recent.committed_at, m.percentage_translated, m.missing_translations, m.missing_keys
+FROM recent JOIN locale_metrics AS m ON m.locale = ? AND m.commit_id = recent.id
+ORDER BY recent.position, recent.committed_at, recent.id
+'''
+
+REGRESSIONS_QUERY = f'''
+WITH recent AS ({RECENT_COMMITS})
+SELECT r.scope, COUNT(*) AS regressions, SUM(r.regressed_strings) AS regressed_strings, COUNT(DISTINCT r.locale) AS locales
+FROM recent JOIN scope_regressions AS r ON r.commit_id = recent.id
+GROUP BY r.scope
+ORDER BY regressed_strings DESC, regressions DESC, r.scope
+LIMIT ?
+'''
+
+# The commit recorded right before or after the given one in the history
+PREVIOUS_COMMIT = '''SELECT id FROM commits WHERE (position, committed_at, id) < (?, ?, ?)
+                     ORDER BY position DESC, committed_at DESC, id DESC LIMIT 1'''
+NEXT_COMMIT = '''SELECT id FROM commits WHERE (position, committed_at, id) > (?, ?, ?)
+                 ORDER BY position, committed_at, id LIMIT 1'''
+
+# A regression is a commit increasing the missing strings (untranslated or missing keys)
+# of a scope of a locale, compared to the previous recorded commit
+UPDATE_REGRESSIONS = '''
+INSERT INTO scope_regressions
+SELECT * FROM (
+    SELECT current.commit_id, current.locale, current.scope,
+           current.missing_keys + current.missing_translations - previous.missing_keys - previous.missing_translations AS regressed_strings
+    FROM scope_metrics AS current
+    JOIN scope_metrics AS previous ON previous.locale = current.locale AND previous.scope = current.scope AND previous.commit_id = ?
+    WHERE current.commit_id = ?
+)
+WHERE regressed_strings > 0
+'''
+
+# Metrics of a locale, from its check_locale result: the locale row
+# (percentage translated, missing keys, missing translations), from the counts of the
+# result, and the rows of each baseline scope (scope, total strings, missing keys,
+# missing translations)
+class LocaleMetrics:
+    def __init__(self, baseline_language : dict, result : dict):
+        self.scopes = []
+        total_strings = 0
+        for scope, entries in baseline_language.items():
+            missing_keys = result['missing_keys'].get(scope)
+            # A missing scope misses all its keys
+            missing_keys = 0 if missing_keys is None else len(missing_keys) or len(entries)
+            missing_translations = len(result['missing_translations'].get(scope, {}))
+            self.scopes.append((scope, len(entries), missing_keys, missing_translations))
+            total_strings += len(entries)
+        counts = result['counts']
+        # Same percentage as the summary of the report
+        self.percentage_translated = 100 - (100 * counts['missing_translations']) / total_strings if total_strings else 100.0
+        self.missing_keys = counts['missing_keys']
+        self.missing_translations = counts['missing_translations']
+
+class MetricsStore:
+    def __init__(self, db_file : str = DEFAULT_METRICS_DB):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def has_commit(self, sha : str) -> bool:
+        return self.connection.execute('SELECT 1 FROM commits WHERE sha = ?', (sha,)).fetchone() is not None
+
+    # Records the metrics of a commit, a dict of locale -> LocaleMetrics, replacing the ones
+    # already recorded for it. Written to the database on commit().
+    def add_commit(self, commit : 'Commit', total_strings : int, metrics : dict):
+        self.connection.execute('DELETE FROM commits WHERE sha = ?', (commit.sha,))
+        commit_id = self.connection.execute('INSERT INTO commits (sha, position, committed_at, total_strings) VALUES (?, ?, ?, ?)',
+                                            (commit.sha, commit.position, commit.committed_at, total_strings)).lastrowid
+        self.connection.executemany('INSERT INTO locale_metrics VALUES (?, ?, ?, ?, ?)',
+                                    [(locale, commit_id, m.percentage_translated, m.missing_keys, m.missing_translations)
+                                     for locale, m in metrics.items()])
+        self.connection.executemany('INSERT INTO scope_metrics VALUES (?, ?, ?, ?, ?, ?)',
+                                    [(locale, scope, commit_id, total, missing_keys, missing_translations)
+                                     for locale, m in metrics.items()
+                                     for scope, total, missing_keys, missing_translations in m.scopes])
+        # The commit may be recorded out of order, in which case the regressions of the next one change too
+        order = (commit.position, commit.committed_at, commit_id)
+        previous_id = self._get_commit_id(PREVIOUS_COMMIT, order)
+        next_id = self._get_commit_id(NEXT_COMMIT, order)
+        self._update_regressions(previous_id, commit_id)
+        self._update_regressions(commit_id, next_id)
+
+    def _get_commit_id(self, query : str, order : tuple) -> int:
+        row = self.connection.execute(query, order).fetchone()
+        return row[0] if row else None
+
+    # Computes again the regressions of the commit compared to the previous one
+    def _update_regressions(self, previous_id : int, commit_id : int):
+        if commit_id is None:
+            return
+        self.connection.execute('DELETE FROM scope_regressions WHERE commit_id = ?', (commit_id,))
+        if previous_id is not None:
+            self.connection.execute(UPDATE_REGRESSIONS, (previous_id, commit_id))
+
+    def commit(self):
+        self.connection.commit()
+
+    # Returns the (sha, committed_at, percentage translated, missing translations, missing keys)
+    # of the locale over the last commits, oldest first
+    def get_trend(self, locale : str, last : int = DEFAULT_LAST_COMMITS) -> list:
+        return self.connection.execute(TREND_QUERY, (last, locale)).fetchall()
+
+    # Returns the (scope, regressions, regressed strings, locales) of the scopes with the most
+    # strings regressed over the last commits
+    def get_regressions(self, last : int = DEFAULT_LAST_COMMITS, top : int = 10) -> list:
+        return self.connection.execute(REGRESSIONS_QUERY, (last, top)).fetchall()
+
+def get_metrics(baseline_language : dict, results : dict) -> dict:
+    return {locale: LocaleMetrics(baseline_language, result) for locale, result in results.items()}
+
+class Commit:
+    def __init__(self, sha : str, position : int, committed_at : int):
+        self.sha = sha
+        # Number of first-parent ancestors
+        self.position = position
+        self.committed_at = committed_at
+
+def count_first_parents(ref : str) -> int:
+    return int(run_git(['rev-list', '--first-parent', '--count', ref]))
+
+def get_commit(ref : str) -> Commit:
+    sha, committed_at = run_git(['show', '-s', '--format=%H %ct', ref]).decode('utf8').split()
+    return Commit(sha, count_first_parents(ref) - 1, int(committed_at))
+
+# Records the results of the working tree as the metrics of the ref
+def record_metrics(db_file : str, ref : str, baseline_language : dict, results : dict):
+    with MetricsStore(db_file) as store:
+        store.add_commit(get_commit(ref), count_total_string(baseline_language), get_metrics(baseline_language, results))
+
+# Returns the commits of the first-parent history of the ref, oldest first
+def get_history(ref : str, max_count : int = None) -> list:
+    args = ['rev-list', '--first-parent', '--timestamp', '--reverse']
+    if max_count:
+        args.append(f'--max-count={max_count}')
+    lines = run_git([*args, ref]).decode('utf8').splitlines()
+    first_position = count_first_parents(ref) - len(lines)
+    history = []
+    for position, line in enumerate(lines, first_position):
+        committed_at, sha = line.split()
+        history.append(Commit(sha, position, int(committed_at)))
+    return history
+
+# Records the metrics of the commits of the ref history not recorded yet. Each translation
+# file blob is read and parsed at most once, and the metrics of a locale are only computed
+# again when its blob or the baseline one changed from a previous commit.
+# Returns the number of commits recorded.
+def backfill(store : MetricsStore, ref : str, max_count : int = None, cache : ResultCache = None) -> int:
+    profiler = get_profiler()
+    # (baseline blob, locale blob) -> LocaleMetrics
+    metrics_by_blobs = {}
+    baseline_blob = None
+    baseline_language = None
+    recorded = 0
+    for commit in get_history(ref, max_count):
+        if store.has_commit(commit.sha):
+            continue
+        blobs = get_locale_blobs(commit.sha)
+        if BASELINE_LANGUAGE not in blobs:
+            continue
+        locales = sorted(locale for locale in blobs if locale != BASELINE_LANGUAGE)
+        if blobs[BASELINE_LANGUAGE] != baseline_blob:
+            baseline_blob = blobs[BASELINE_LANGUAGE]
+            baseline_language = read_blobs([baseline_blob])[baseline_blob]
+        changed = [locale for locale in locales if (baseline_blob, blobs[locale]) not in metrics_by_blobs]
+        if changed:
+            with profiler.phase('backfill_check'):
+                languages = read_blobs([blobs[locale] for locale in changed])
+                languages[baseline_blob] = baseline_language
+                for locale, result in get_results(changed, blobs, languages, cache).items():
+                    metrics_by_blobs[(baseline_blob, blobs[locale])] = LocaleMetrics(baseline_language, result)
+        store.add_commit(commit, count_total_string(baseline_language),
+                         {locale: metrics_by_blobs[(baseline_blob, blobs[locale])] for locale in locales})
+        recorded += 1
+        if recorded % BACKFILL_BATCH_SIZE == 0:
+            store.commit()
+    store.commit()
+    return recorded
+
+def format_date(timestamp : int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+def get_trend_markdown(locale : str, trend : list) -> str:
+    output = f'## Translation progress of {locale}\n\n'
+    output += '| Commit | Date | Translated | Missing strings | Missing keys |\n'
+    output += '|--------|------|------------|-----------------|--------------|\n'
+    for sha, committed_at, percentage, missing_translations, missing_keys in trend:
+        output += f'| {sha[:8]} | {format_date(committed_at)} | {percentage:.1f}% | {missing_translations} | {missing_keys} |\n'
+    return output
+
+def get_regressions_markdown(regressions : list) -> str:
+    output = '## Scopes regressing the most\n\n'
+    output += '| Scope | Regressions | Strings regressed | Locales |\n'
+    output += '|-------|-------------|-------------------|---------|\n'
+    for scope, count, strings, locales in regressions:
+        output += f'| {scope} | {count} | {strings} | {locales} |\n'
+    return output
+
+def get_arguments(argv : list = None):
+    parser = argparse.ArgumentParser(description="Records the localization metrics of the commits and queries their history.")
+    parser.add_argument("command", choices=['backfill', 'trend', 'regressions'],
+                        help="backfill: records the commits of -ref; trend: progress of -locale; regressions: scopes regressing the most")
+    parser.add_argument("-db", default=DEFAULT_METRICS_DB, help="File path for the metrics database")
+    parser.add_argument("-locale", help="Locale of the trend")
+    parser.add_argument("-last", type=int, default=DEFAULT_LAST_COMMITS, help="Number of recent commits queried")
+    parser.add_argument("-top", type=int, default=10, help="Number of scopes listed by regressions")
+    parser.add_argument("-ref", default='HEAD', help="Git ref whose history is backfilled")
+    parser.add_argument("-max_count", type=int, help="Maximum number of commits backfilled, the most recent ones")
+    parser.add_argument("-no_cache", help="Recompute the results of every locale, ignoring the result cache", action='store_true')
+    parser.add_argument("-cache_file", default=DEFAULT_CACHE_FILE, help="File path for the result cache")
+    parser.add_argument("-profile", help="Prints the time, calls and peak memory of each phase to stderr", action='store_true')
+    return parser.parse_args(argv)
+
+def main(argv : list = None):
+    args = get_arguments(argv)
+    profiler = get_profiler()
+    if args.profile:
+        profiler.enable()
+    with MetricsStore(args.db) as store:
+        if args.command == 'backfill':
+            cache = None if args.no_cache else ResultCache(args.cache_file).load()
+            with profiler.phase('backfill'):
+                recorded = backfill(store, args.ref, args.max_count, cache)
+            if cache is not None:
+                cache.save()
+            print(f'Recorded the metrics of {recorded} commits to {args.db}')
+        elif args.command == 'trend':
+            if not args.locale:
+                raise Exception("-locale is required by trend")
+            with profiler.phase('query'):
+                trend = store.get_trend(args.locale, args.last)
+            print(get_trend_markdown(args.locale, trend))
+        else:
+            with profiler.phase('query'):
+                regressions = store.get_regressions(args.last, args.top)
+            print(get_regressions_markdown(regressions))
+    if profiler.enabled:
+        profiler.report()
+
+if __name__ == "__main__":
+    main()
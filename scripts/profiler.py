@@ -0,0 +1,94 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Records the wall time, number of calls and peak traced memory of named phases,
+# optionally per locale. Disabled by default, in which case phases cost nothing.
+# Phases can be nested: the peak memory of a phase includes its inner phases.
+
+class PhaseStats:
+    def __init__(self, phase : str, locale : str = None):
+        self.phase = phase
+        self.locale = locale
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_memory = 0
+
+    def to_dict(self) -> dict:
+        return {'phase': self.phase, 'locale': self.locale, 'calls': self.calls,
+                'seconds': self.seconds, 'peak_memory': self.peak_memory}
+
+class Profiler:
+    def __init__(self, enabled : bool = False):
+        self.enabled = False
+        self.stats = {}
+        # Peak memory of the running phases, as tracemalloc only keeps a single peak
+        self._peaks = []
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # Disables the profiler and drops the stats recorded so far
+    def reset(self):
+        self.disable()
+        self.stats = {}
+        self._peaks = []
+
+    @contextmanager
+    def phase(self, name : str, locale : str = None):
+        if not self.enabled:
+            yield
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(current)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            phase_peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], phase_peak)
+            stats = self.stats.setdefault((name, locale), PhaseStats(name, locale))
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.peak_memory = max(stats.peak_memory, phase_peak - current)
+
+    def to_json(self) -> str:
+        return json.dumps([stats.to_dict() for stats in self.stats.values()], indent=4)
+
+    def get_table(self) -> str:
+        output = '| Phase | Locale | Calls | Time (ms) | Peak memory (KiB) |\n'
+        output += '|-------|--------|-------|-----------|-------------------|\n'
+        output += '\n'.join('| {} | {} | {} | {:.2f} | {:.1f} |'.format(
+                            stats.phase, stats.locale or '-', stats.calls,
+                            stats.seconds * 1000, stats.peak_memory / 1024) for stats in self.stats.values())
+        return output + '\n'
+
+    # Prints the table to stderr, so it does not mix with the reports, and writes the JSON (if passed)
+    def report(self, json_file : str = None):
+        print(self.get_table(), file=sys.stderr)
+        if json_file:
+            with open(json_file, 'w', encoding='utf8') as f:
+                f.write(self.to_json())
+
+# Profiler shared by the scripts of a process, enabled by their -profile option
+_profiler = Profiler()
+
+def get_profiler() -> Profiler:
+    return _profiler
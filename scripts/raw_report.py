@@ -0,0 +1,210 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+# Compact binary format for the raw reports, loaded lazily.
+#
+# Layout (little-endian):
+#   header:    magic 'TTLR', format version (u16), number of sections (u16)
+#   directory: per section, name length (u16), name (utf8), offset (u64), length (u64)
+#   sections:  'config' is JSON; 'strings' is the interned string table, holding every
+#              locale, scope, key and value once; the other sections are u32 arrays of
+#              string ids.
+#
+# Key sections ('errors_missing_keys', 'errors_extra_keys', 'missing_translations') are
+# encoded as: number of locales, then per locale its id and number of scopes, then per
+# scope its id, number of keys and the key ids. The values of the missing translations
+# are kept apart in 'missing_translation_values', in the same order as their keys, so
+# comparing reports never has to read them.
+
+MAGIC = b'TTLR'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH')
+SECTION_NAME_LENGTH = struct.Struct('<H')
+SECTION_POSITION = struct.Struct('<QQ')
+KEY_SECTIONS = ['errors_missing_keys', 'errors_extra_keys', 'missing_translations']
+VALUES_SECTION = 'missing_translation_values'
+
+def _to_bytes(ids : array) -> bytes:
+    if sys.byteorder == 'big':
+        ids = array('I', ids)
+        ids.byteswap()
+    return ids.tobytes()
+
+def _from_bytes(data) -> memoryview:
+    if sys.byteorder == 'big':
+        ids = array('I', bytes(data))
+        ids.byteswap()
+        return memoryview(ids)
+    return memoryview(data).cast('I')
+
+class StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, string : str) -> int:
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    # Number of strings, the end offset of each string, then the utf8 data
+    def to_bytes(self) -> bytes:
+        encoded = [string.encode('utf8') for string in self.strings]
+        offsets = array('I', [len(encoded)])
+        end = 0
+        for data in encoded:
+            end += len(data)
+            offsets.append(end)
+        return _to_bytes(offsets) + b''.join(encoded)
+
+def _encode_keys(errors : dict, strings : StringTable, values : array = None) -> bytes:
+    ids = array('I', [len(errors)])
+    for locale, scopes in errors.items():
+        ids.extend([strings.intern(locale), len(scopes)])
+        for scope, keys in scopes.items():
+            ids.extend([strings.intern(scope), len(keys)])
+            ids.extend(strings.intern(key) for key in keys)
+            if values is not None:
+                values.extend(strings.intern(value) for value in keys.values())
+    return _to_bytes(ids)
+
+def _get_config(config) -> dict:
+    return config if isinstance(config, dict) else config.__dict__
+
+def write_binary_report(report, file_path : str):
+    strings = StringTable()
+    values = array('I')
+    sections = {name: _encode_keys(getattr(report, name), strings, values if name == 'missing_translations' else None)
+                for name in KEY_SECTIONS}
+    sections[VALUES_SECTION] = _to_bytes(values)
+    sections['config'] = json.dumps(_get_config(report.config), sort_keys=True).encode('utf8')
+    sections['strings'] = strings.to_bytes()
+
+    directory_size = HEADER.size + sum(SECTION_NAME_LENGTH.size + len(name.encode('utf8')) + SECTION_POSITION.size
+                                       for name in sections)
+    directory = [HEADER.pack(MAGIC, FORMAT_VERSION, len(sections))]
+    offset = directory_size
+    for name, data in sections.items():
+        encoded_name = name.encode('utf8')
+        directory.append(SECTION_NAME_LENGTH.pack(len(encoded_name)) + encoded_name)
+        directory.append(SECTION_POSITION.pack(offset, len(data)))
+        offset += len(data)
+
+    with open(file_path, 'wb') as f:
+        f.write(b''.join(directory))
+        for data in sections.values():
+            f.write(data)
+
+def is_binary_report(file_path : str) -> bool:
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+# Raw report read from a memory-mapped binary file. Sections are only read and
+# decoded when accessed, strings only when referenced.
+class BinaryReport:
+    def __init__(self, file_path : str):
+        with open(file_path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, section_count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{file_path} is not a binary raw report')
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unsupported raw report version {version} in {file_path}')
+        self._sections = {}
+        position = HEADER.size
+        for _ in range(section_count):
+            (name_length,) = SECTION_NAME_LENGTH.unpack_from(self._data, position)
+            position += SECTION_NAME_LENGTH.size
+            name = self._data[position:position + name_length].decode('utf8')
+            position += name_length
+            self._sections[name] = SECTION_POSITION.unpack_from(self._data, position)
+            position += SECTION_POSITION.size
+        self._string_offsets = None
+        self._strings = {}
+        self._keys = {}
+
+    def _section(self, name : str) -> memoryview:
+        offset, length = self._sections[name]
+        with memoryview(self._data) as data:
+            return data[offset:offset + length]
+
+    def _string(self, string_id : int) -> str:
+        string = self._strings.get(string_id)
+        if string is None:
+            if self._string_offsets is None:
+                section = self._section('strings')
+                count = _from_bytes(section[:4])[0]
+                self._string_offsets = _from_bytes(section[4:4 * (count + 1)])
+                self._string_data = section[4 * (count + 1):]
+            start = self._string_offsets[string_id - 1] if string_id else 0
+            end = self._string_offsets[string_id]
+            string = self._strings[string_id] = bytes(self._string_data[start:end]).decode('utf8')
+        return string
+
+    # Returns a dict of locale -> {scope: [key ids]} for a key section
+    def _key_ids(self, name : str) -> dict:
+        if name not in self._keys:
+            ids = _from_bytes(self._section(name))
+            errors = {}
+            position = 1
+            for _ in range(ids[0]):
+                locale, scope_count = ids[position], ids[position + 1]
+                position += 2
+                scopes = errors[self._string(locale)] = {}
+                for _ in range(scope_count):
+                    scope, key_count = ids[position], ids[position + 1]
+                    position += 2
+                    scopes[self._string(scope)] = ids[position:position + key_count].tolist()
+                    position += key_count
+            ids.release()
+            self._keys[name] = errors
+        return self._keys[name]
+
+    # Returns a dict of locale -> {scope: [keys]}, without reading any value
+    def get_keys(self, name : str) -> dict:
+        return {locale: {scope: [self._string(key) for key in keys] for scope, keys in scopes.items()}
+                for locale, scopes in self._key_ids(name).items()}
+
+    @property
+    def config(self) -> dict:
+        return json.loads(bytes(self._section('config')).decode('utf8'))
+
+    @property
+    def errors_missing_keys(self) -> dict:
+        return self.get_keys('errors_missing_keys')
+
+    @property
+    def errors_extra_keys(self) -> dict:
+        return self.get_keys('errors_extra_keys')
+
+    @property
+    def missing_translations(self) -> dict:
+        values = _from_bytes(self._section(VALUES_SECTION)).tolist()
+        position = 0
+        missing_translations = {}
+        for locale, scopes in self._key_ids('missing_translations').items():
+            missing_translations[locale] = {}
+            for scope, keys in scopes.items():
+                scope_values = values[position:position + len(keys)]
+                position += len(keys)
+                missing_translations[locale][scope] = {self._string(key): self._string(value)
+                                                       for key, value in zip(keys, scope_values)}
+        return missing_translations
+
+    def close(self):
+        if self._string_offsets is not None:
+            self._string_offsets.release()
+            self._string_data.release()
+            self._string_offsets = None
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
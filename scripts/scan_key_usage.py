@@ -0,0 +1,175 @@
+import argparse
+import fnmatch
+import os
+import re
+import sys
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from key_index import KeyIndex
+from locale_checks import BASELINE_LANGUAGE, dump_json
+from localization_cache import ResultCache, get_cache_key, hash_bytes
+from profiler import get_profiler
+from tool_context import get_context
+
+# Scans the source code for the translation keys it uses, like '$Menu.quit' or
+# data-i18n="$Preferences.title", and cross-references them with the baseline keys:
+# - undefined keys are used by the code but not in the baseline
+# - unused keys are in the baseline but never used by the code
+# - dynamic keys are built at runtime, like `$DateUtil.${monthNames[monthIndex]}`, so
+#   the baseline keys they can match are not reported as unused
+# The results of each file are cached by modification time and content hash, in a cache
+# file of their own, so they never push the results of check_languages.py out of its cache.
+
+DEFAULT_CACHE_FILE = '.key_usage_cache.json'
+# One entry per source file
+MAX_CACHE_ENTRIES = 4096
+
+SOURCE_PATHS = ['js', 'src', 'renderer', 'main', 'main.mjs']
+SOURCE_EXTENSIONS = ('.js', '.mjs', '.cjs', '.html')
+SKIPPED_DIRS = {'node_modules', '__tests__', '__mocks__'}
+
+# Keys in quotes, or in the attribute lists of data-i18n="[placeholder]$Scope.key;[title]$Scope.key"
+KEY_PATTERN = re.compile(r'''(?<=['"`\];])(\$[A-Za-z][\w-]*)\.([\w-]+)(?=['"`;])''')
+# Template literals starting like a key and building part of it
+DYNAMIC_KEY_PATTERN = re.compile(r'`(\$[^`\s]*\$\{[^`]*\}[^`\s]*)`')
+PLACEHOLDER_PATTERN = re.compile(r'\$\{[^}]*\}')
+# Cached results are invalidated when the patterns change
+PATTERNS_HASH = hash_bytes('\n'.join(pattern.pattern for pattern in [KEY_PATTERN, DYNAMIC_KEY_PATTERN, PLACEHOLDER_PATTERN]).encode('utf8'))
+
+# Returns the pattern matching the keys a dynamic key can be, '$DateUtil.*' for
+# `$DateUtil.${monthNames[monthIndex]}`, or None if it does not look like a key
+def get_dynamic_key_pattern(text : str) -> str:
+    pattern = PLACEHOLDER_PATTERN.sub('*', text)
+    scope, _, key = pattern.partition('.')
+    if not key or not scope.startswith('$'):
+        return None
+    return pattern
+
+# Returns the keys used by the source, as JSON-compatible lists so they can be cached:
+# keys as [scope, key, line] and dynamic keys as [text, line]
+def scan_source(source : str) -> dict:
+    line_starts = None
+    def get_line(position : int) -> int:
+        nonlocal line_starts
+        if line_starts is None:
+            line_starts = [0] + [match.end() for match in re.finditer('\n', source)]
+        return bisect_right(line_starts, position)
+
+    keys = [[match.group(1), match.group(2), get_line(match.start())] for match in KEY_PATTERN.finditer(source)]
+    dynamic_keys = [[match.group(1), get_line(match.start())] for match in DYNAMIC_KEY_PATTERN.finditer(source)
+                    if get_dynamic_key_pattern(match.group(1))]
+    return {'keys': keys, 'dynamic_keys': dynamic_keys}
+
+# Returns the source files under the paths, sorted
+def get_source_files(paths : list) -> list:
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for root, dirs, file_names in os.walk(path):
+            dirs[:] = [x for x in dirs if x not in SKIPPED_DIRS]
+            files.extend(os.path.join(root, x) for x in file_names if x.endswith(SOURCE_EXTENSIONS))
+    return sorted(files)
+
+# Returns the cache entry of the file, scanning it only if it changed
+def _scan_file(file_path : str, entry : dict) -> dict:
+    stat = os.stat(file_path)
+    if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        return entry
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    file_hash = hash_bytes(data)
+    if entry and entry['hash'] == file_hash:
+        usage = entry['usage']
+    else:
+        usage = scan_source(data.decode('utf8', errors='replace'))
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': file_hash, 'usage': usage}
+
+# Returns the keys used by each file, scanning the files concurrently
+def scan_files(files : list, cache : ResultCache = None, jobs : int = None) -> dict:
+    cache_keys = {file_path: get_cache_key('key_usage', PATTERNS_HASH, file_path) for file_path in files}
+    entries = [cache.get(cache_keys[file_path]) if cache is not None else None for file_path in files]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        scanned = list(executor.map(_scan_file, files, entries))
+    if cache is not None:
+        for file_path, entry, new_entry in zip(files, entries, scanned):
+            if new_entry is not entry:
+                cache.put(cache_keys[file_path], new_entry)
+    return {file_path: entry['usage'] for file_path, entry in zip(files, scanned)}
+
+class KeyUsageReport:
+    def __init__(self, baseline_language : dict, usages : dict):
+        index = KeyIndex(baseline_language)
+        used = bytearray(len(index))
+        # [file, line, '$scope.key']
+        self.undefined_keys = []
+        # [file, line, text, number of baseline keys matched]
+        self.dynamic_keys = []
+        for file_path, usage in usages.items():
+            for scope, key, line in usage['keys']:
+                key_id = index.ids.get(scope, {}).get(key)
+                if key_id is None:
+                    self.undefined_keys.append([file_path, line, f'{scope}.{key}'])
+                else:
+                    used[key_id] = 1
+            for text, line in usage['dynamic_keys']:
+                pattern = get_dynamic_key_pattern(text)
+                matched = [key_id for key_id, (scope, key) in enumerate(index.keys) if fnmatch.fnmatchcase(f'{scope}.{key}', pattern)]
+                for key_id in matched:
+                    used[key_id] = 1
+                self.dynamic_keys.append([file_path, line, text, len(matched)])
+        # scope -> [keys]
+        self.unused_keys = {}
+        for key_id in range(len(index)):
+            if not used[key_id]:
+                scope, key = index.keys[key_id]
+                self.unused_keys.setdefault(scope, []).append(key)
+
+    def get_markdown(self) -> str:
+        output = '## Undefined keys\n'
+        output += ''.join(f'- `{key}` ({file_path}:{line})\n' for file_path, line, key in self.undefined_keys) or 'None\n'
+        output += '\n## Unused keys\n'
+        output += f'```\n{dump_json(self.unused_keys)}\n```\n' if self.unused_keys else 'None\n'
+        output += '\n## Dynamic keys\n'
+        output += ''.join(f'- `{text}` ({file_path}:{line}): {matched} keys\n'
+                          for file_path, line, text, matched in self.dynamic_keys) or 'None\n'
+        return output
+
+def get_arguments(argv : list = None):
+    parser = argparse.ArgumentParser(description="Reports the translation keys undefined in, or unused from, the baseline language.")
+    parser.add_argument("-paths", nargs='+', default=SOURCE_PATHS, help="Source folders and files to scan")
+    parser.add_argument("-output", help="Output markdown report file")
+    parser.add_argument("-fail_on_undefined", help="Exits with an error if the code uses undefined keys", action='store_true')
+    parser.add_argument("-no_cache", help="Scans every file, ignoring the result cache", action='store_true')
+    parser.add_argument("-cache_file", default=DEFAULT_CACHE_FILE, help="File path for the result cache")
+    parser.add_argument("-jobs", type=int, help="Number of threads used to scan the files")
+    parser.add_argument("-profile", help="Prints the time, calls and peak memory of each phase to stderr", action='store_true')
+    return parser.parse_args(argv)
+
+def main(argv : list = None):
+    args = get_arguments(argv)
+    profiler = get_profiler()
+    if args.profile:
+        profiler.enable()
+    with profiler.phase('load_cache'):
+        cache = None if args.no_cache else ResultCache(args.cache_file, MAX_CACHE_ENTRIES).load()
+    with profiler.phase('scan_files'):
+        usages = scan_files(get_source_files(args.paths), cache, args.jobs)
+    with profiler.phase('save_cache'):
+        if cache is not None:
+            cache.save()
+    with profiler.phase('usage_report'):
+        report = KeyUsageReport(get_context().get_locale_store().get(BASELINE_LANGUAGE), usages)
+        output = report.get_markdown()
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as f:
+            f.write(output)
+    if profiler.enabled:
+        profiler.report()
+    if args.fail_on_undefined and report.undefined_keys:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import hashlib
+import re
+from json.decoder import JSONDecodeError, scanstring
+from string_validators import TOKEN_CHARACTERS, VALIDATORS, StringTokens, validate_string
+
+# Checks translation files while reading them, without loading them into dicts, so the
+# memory needed grows with the longest string of a file, not with the size of the file.
+#
+# The file is read in chunks and walked as (scope, key, value) events. Each value is
+# compared with the baseline one as it is read, and only the values that are reported
+# (the ones equal to the baseline and the extra keys) are kept. The baseline is kept as
+# a digest of each value, plus the tokens of the values with placeholders, markup or
+# surrounding whitespace, the only ones a translation must be validated against.
+#
+# Translation files are objects of scopes, each an object of string values. Unlike
+# json.load, a scope found twice in a file is an error.
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Separators before a value and before the next key, matched at once when in the buffer
+VALUE_START = re.compile(r'[ \t\n\r]*:[ \t\n\r]*"')
+NEXT_KEY = re.compile(r'[ \t\n\r]*,[ \t\n\r]*"')
+# Characters of a string up to its closing quote, an escape being a backslash and the next character
+STRING_CONTENT = re.compile(r'[^"\\]*(?:\\[\s\S][^"\\]*)*')
+# The tokens of any plain baseline string, see is_plain in string_validators
+PLAIN_TOKENS = StringTokens('')
+TOKEN_START = re.compile(f'[{re.escape(TOKEN_CHARACTERS)}]')
+
+# Same as is_plain((value,))
+def is_plain_value(value : str) -> bool:
+    return not TOKEN_START.search(value) and len(value.strip()) == len(value)
+
+def get_digest(value : str) -> bytes:
+    return hashlib.blake2b(value.encode('utf8', 'surrogatepass'), digest_size=16).digest()
+
+# Reads the events of a translation file, holding at most a chunk and the string being read
+class TranslationReader:
+    def __init__(self, file, chunk_size : int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+
+    # Appends the next chunk to the unread part of the buffer, returning False at the end of the file
+    def _read(self) -> bool:
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    # Returns the next character that is not whitespace, without consuming it, or '' at the end of the file
+    def _peek(self) -> str:
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read():
+                return ''
+
+    def _expect(self, characters : str) -> str:
+        character = self._peek()
+        if not character or character not in characters:
+            found = repr(character) if character else 'the end of the file'
+            raise ValueError(f'Expected {" or ".join(map(repr, characters))} but found {found}')
+        self.position += 1
+        return character
+
+    def _string(self) -> str:
+        self._expect('"')
+        return self._scan()
+
+    # Returns the string whose opening quote was read. The closing quote is searched from
+    # where the previous chunk ended, the parts of the string read so far kept aside, so a
+    # long string is scanned and copied once whatever the number of chunks it spans.
+    def _scan(self) -> str:
+        try:
+            value, self.position = scanstring(self.buffer, self.position)
+            return value
+        except JSONDecodeError:
+            # Most likely the string continues in the next chunk
+            pass
+        parts = []
+        while True:
+            end = STRING_CONTENT.match(self.buffer, self.position).end()
+            if end < len(self.buffer) and self.buffer[end] == '"':
+                parts.append(self.buffer[self.position:end + 1])
+                self.position = end + 1
+                return scanstring(''.join(parts), 0)[0]
+            # A backslash ending the chunk is kept with the next one, with the character it escapes
+            parts.append(self.buffer[self.position:end])
+            self.position = end
+            if not self._read():
+                raise ValueError('Unterminated string at the end of the file')
+
+    # Yields (scope, None, None) when a scope starts, then (scope, key, value) for each of its strings
+    def __iter__(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self.position += 1
+        else:
+            while True:
+                scope = self._string()
+                self._expect(':')
+                self._expect('{')
+                yield scope, None, None
+                if self._peek() == '}':
+                    self.position += 1
+                else:
+                    key = self._string()
+                    while True:
+                        match = VALUE_START.match(self.buffer, self.position)
+                        if match:
+                            self.position = match.end()
+                        else:
+                            self._expect(':')
+                            if self._peek() != '"':
+                                raise ValueError(f'Expected a string value for {scope}.{key}')
+                            self.position += 1
+                        yield scope, key, self._scan()
+                        match = NEXT_KEY.match(self.buffer, self.position)
+                        if match:
+                            self.position = match.end()
+                            key = self._scan()
+                        elif self._expect(',}') == '}':
+                            break
+                        else:
+                            key = self._string()
+                if self._expect(',}') == '}':
+                    break
+        if self._peek():
+            raise ValueError('Unexpected content after the translations')
+
+# Returns the events of a translation file
+def read_translation_file(file_path : str, chunk_size : int = CHUNK_SIZE):
+    with open(file_path, encoding="utf8") as f:
+        yield from TranslationReader(f, chunk_size)
+
+# Digests of the baseline strings, with the same ids as KeyIndex
+class BaselineDigests:
+    def __init__(self, events):
+        # id -> (scope, key), ids of a scope are contiguous
+        self.keys = []
+        # id -> digest and length of the baseline value
+        self.digests = []
+        self.lengths = []
+        # id -> tokens, only for the values that are not plain
+        self.tokens = {}
+        # scope -> {key: id}
+        self.ids = {}
+        # scope -> (first id, last id + 1)
+        self.scope_ranges = {}
+        for scope, key, value in events:
+            if key is None:
+                if scope in self.ids:
+                    raise ValueError(f'Duplicate scope {scope}')
+                self.ids[scope] = {}
+                self.scope_ranges[scope] = (len(self.keys), len(self.keys))
+                continue
+            scope_ids = self.ids[scope]
+            key_id = scope_ids.get(key)
+            if key_id is None:
+                # As json.load, the last value of a duplicate key is kept
+                key_id = scope_ids[key] = len(self.keys)
+                self.keys.append((scope, key))
+                self.digests.append(None)
+                self.lengths.append(0)
+                self.scope_ranges[scope] = (self.scope_ranges[scope][0], len(self.keys))
+            self.digests[key_id] = get_digest(value)
+            self.lengths[key_id] = len(value)
+            self.tokens.pop(key_id, None)
+            if not is_plain_value(value):
+                self.tokens[key_id] = StringTokens(value)
+
+    @staticmethod
+    def from_file(file_path : str, chunk_size : int = CHUNK_SIZE) -> 'BaselineDigests':
+        return BaselineDigests(read_translation_file(file_path, chunk_size))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def is_equal(self, key_id : int, value : str) -> bool:
+        return self.lengths[key_id] == len(value) and self.digests[key_id] == get_digest(value)
+
+    def validate(self, key_id : int, value : str, validators : list = VALIDATORS) -> list:
+        tokens = self.tokens.get(key_id)
+        # Only the default validators are known to accept any plain translation of a plain value
+        if tokens is None and validators is VALIDATORS and is_plain_value(value):
+            return []
+        return validate_string(tokens or PLAIN_TOKENS, value, validators)
+
+# Same results as check_locale(locale, baseline_language, language), given the keys to ignore
+# as a function of scope -> keys, for the translation file of the language
+def check_locale_file(baseline : BaselineDigests, file_path : str, get_keys_to_ignore, chunk_size : int = CHUNK_SIZE) -> dict:
+    present = bytearray(len(baseline))
+    # id -> value, for the values equal to the baseline one
+    identical = {}
+    # scope -> {key: value} of the keys not in the baseline, or [] if the whole scope is not in the baseline
+    extra = {}
+    # scope -> {key: errors}
+    invalid = {}
+    scopes = set()
+    # scope -> keys, of the scopes not in the baseline, only to count them
+    unknown_scope_keys = {}
+    scope_ids = None
+    for scope, key, value in read_translation_file(file_path, chunk_size):
+        if key is None:
+            if scope in scopes:
+                raise ValueError(f'Duplicate scope {scope} in {file_path}')
+            scopes.add(scope)
+            scope_ids = baseline.ids.get(scope)
+            if scope_ids is None:
+                extra[scope] = []
+                unknown_scope_keys[scope] = set()
+            continue
+        if scope_ids is None:
+            unknown_scope_keys[scope].add(key)
+            continue
+        key_id = scope_ids.get(key)
+        if key_id is None:
+            extra.setdefault(scope, {})[key] = value
+            continue
+        present[key_id] = 1
+        # A duplicate key replaces the results of its previous value
+        identical.pop(key_id, None)
+        invalid.get(scope, {}).pop(key, None)
+        if baseline.is_equal(key_id, value):
+            identical[key_id] = value
+        else:
+            errors = baseline.validate(key_id, value)
+            if errors:
+                invalid.setdefault(scope, {})[key] = errors
+
+    missing_keys = {}
+    missing_translations = {}
+    waived_translations = {}
+    for scope, (start, end) in baseline.scope_ranges.items():
+        if scope not in scopes:
+            missing_keys[scope] = []
+            continue
+        missing = []
+        equal_values = {}
+        for key_id in range(start, end):
+            if not present[key_id]:
+                missing.append(baseline.keys[key_id][1])
+            elif key_id in identical:
+                equal_values[baseline.keys[key_id][1]] = identical[key_id]
+        if missing:
+            missing_keys[scope] = missing
+        equal_values.update(extra.get(scope, {}))
+        keys_to_ignore = get_keys_to_ignore(scope)
+        untranslated = {key: value for key, value in equal_values.items() if key not in keys_to_ignore}
+        if untranslated:
+            missing_translations[scope] = untranslated
+        waived = [key for key in equal_values if key in keys_to_ignore] if keys_to_ignore else []
+        if waived:
+            waived_translations[scope] = waived
+    return {
+        'missing_keys': missing_keys,
+        'extra_keys': {scope: list(keys) for scope, keys in extra.items()},
+        'missing_translations': missing_translations,
+        'waived_translations': waived_translations,
+        'invalid_translations': {scope: keys for scope, keys in invalid.items() if keys},
+        'counts': {
+            'missing_keys': len(baseline) - present.count(1),
+            'extra_keys': sum(map(len, extra.values())) + sum(map(len, unknown_scope_keys.values())),
+            'missing_translations': len(identical) + sum(len(keys) for keys in extra.values()) - sum(map(len, waived_translations.values())),
+        },
+    }
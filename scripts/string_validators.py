@@ -0,0 +1,102 @@
+import re
+from collections import Counter
+
+# Checks that the translated strings keep the interpolation placeholders, the markup
+# and the surrounding whitespace of their baseline string.
+#
+# Each string is tokenized once, by a single regex, and every validator works on the
+# tokens, so adding validators does not add passes over the strings. The tokens of the
+# baseline strings are computed once per index and shared by all the locales.
+
+# {{name}}, {name}, ${name}, %s, %d and %1$s placeholders, and HTML tags
+TOKEN_PATTERN = re.compile(r'(?P<placeholder>\{\{[^{}]*\}\}|\$\{[^{}]*\}|\{[\w.-]+\}|%(?:\d+\$)?[sd])'
+                           r'|(?P<tag><(?P<closing>/)?(?P<name>[a-zA-Z][\w-]*)[^<>]*?(?P<self_closing>/)?>)')
+# Tags without content, which are never closed
+VOID_TAGS = {'br', 'hr', 'img', 'input', 'wbr'}
+
+# Strings without any character a token starts with and without leading or trailing
+# whitespace, the case of most strings, can only be valid translations of each other
+# for the validators below. The strings of a whole scope are checked at once, without
+# a loop in Python. Other validators may reject plain strings, so they always run.
+TOKEN_CHARACTERS = '{%<'
+
+def is_plain(values) -> bool:
+    if sum(map(len, map(str.strip, values))) != sum(map(len, values)):
+        return False
+    joined = ''.join(values)
+    return not any(character in joined for character in TOKEN_CHARACTERS)
+
+class StringTokens:
+    def __init__(self, value : str):
+        self.placeholders = Counter()
+        # (name, is closing tag), ignoring void and self-closing tags
+        self.tags = []
+        for match in TOKEN_PATTERN.finditer(value):
+            if match.group('placeholder'):
+                self.placeholders[match.group('placeholder')] += 1
+            elif not match.group('self_closing') and match.group('name').lower() not in VOID_TAGS:
+                self.tags.append((match.group('name').lower(), bool(match.group('closing'))))
+        self.leading = value[:len(value) - len(value.lstrip())]
+        self.trailing = value[len(value.rstrip()):] if value.strip() else ''
+
+# Each validator returns the error found in the translation, or None
+
+def check_placeholders(baseline : StringTokens, translation : StringTokens) -> str:
+    if baseline.placeholders == translation.placeholders:
+        return None
+    missing = sorted((baseline.placeholders - translation.placeholders).elements())
+    unexpected = sorted((translation.placeholders - baseline.placeholders).elements())
+    errors = []
+    if missing:
+        errors.append('missing placeholders {}'.format(', '.join(missing)))
+    if unexpected:
+        errors.append('unexpected placeholders {}'.format(', '.join(unexpected)))
+    return '; '.join(errors)
+
+def check_tags(baseline : StringTokens, translation : StringTokens) -> str:
+    open_tags = []
+    for name, closing in translation.tags:
+        if not closing:
+            open_tags.append(name)
+        elif open_tags and open_tags[-1] == name:
+            open_tags.pop()
+        else:
+            return f'unbalanced tag </{name}>'
+    if open_tags:
+        return f'unclosed tag <{open_tags[-1]}>'
+    if Counter(baseline.tags) != Counter(translation.tags):
+        return 'different tags than the baseline'
+    return None
+
+def check_whitespace(baseline : StringTokens, translation : StringTokens) -> str:
+    if (baseline.leading, baseline.trailing) == (translation.leading, translation.trailing):
+        return None
+    return 'different leading or trailing whitespace than the baseline'
+
+VALIDATORS = [check_placeholders, check_tags, check_whitespace]
+
+# Returns the errors of a translation against its baseline string
+def validate_string(baseline_tokens : StringTokens, value : str, validators : list = VALIDATORS) -> list:
+    tokens = StringTokens(value)
+    return [error for error in (validator(baseline_tokens, tokens) for validator in validators) if error]
+
+# Same as validate_string, given the baseline string
+def validate_translation(baseline_value : str, value : str, validators : list = VALIDATORS) -> list:
+    return validate_string(StringTokens(baseline_value), value, validators)
+
+# Validates the translations of the baseline keys of an index, by key id
+class TranslationValidator:
+    def __init__(self, index, validators : list = VALIDATORS):
+        self.validators = validators
+        self.baseline_tokens = [StringTokens(value) for value in index.values]
+        # The scopes whose translations are valid when plain, only known for the default validators
+        self.plain_scopes = set()
+        if validators is VALIDATORS:
+            self.plain_scopes = {scope for scope, entries in index.baseline_language.items() if is_plain(entries.values())}
+
+    # Whether the translations of the scope need to be validated at all
+    def needs_validation(self, scope : str, entries : dict) -> bool:
+        return scope not in self.plain_scopes or not is_plain(entries.values())
+
+    def validate(self, key_id : int, value : str) -> list:
+        return validate_string(self.baseline_tokens[key_id], value, self.validators)
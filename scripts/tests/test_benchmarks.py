@@ -0,0 +1,49 @@
+from unittest import TestCase
+from benchmarks.generate_locales import generate_locales, get_locale_code
+from benchmarks.memory_benchmark import run_loaders
+from benchmarks.run_benchmarks import get_ratios, get_regressions
+from check_languages import get_language, get_locales_information_from_config
+import os
+import tempfile
+
+
+class TestGenerateLocales(TestCase):
+    def test_locale_code(self):
+        self.assertEqual(get_locale_code(0), "aaa")
+        self.assertEqual(get_locale_code(27), "abb")
+
+    def test_generate(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            codes = generate_locales(tmp_dir, 3, 2, 5, untranslated_ratio=1)
+            locales_path = os.path.join(tmp_dir, "locales")
+            self.assertEqual(sorted(os.listdir(locales_path)), sorted(codes + ["en"]))
+            baseline = get_language("en", locales_path)
+            self.assertEqual(len(baseline), 2)
+            self.assertEqual(get_language(codes[0], locales_path), baseline)
+            config = get_locales_information_from_config(os.path.join(tmp_dir, "src", "configs", "app.config.mjs"))
+            self.assertEqual(sorted(config), sorted(codes + ["en"]))
+
+
+class TestRegressions(TestCase):
+    def test_regressions(self):
+        baseline = {"small": {"a": 1.0, "b": 1.0, "c": 0.001}}
+        results = {"small": {"a": 1.2, "b": 2.0, "c": 0.003, "d": 5.0}}
+        self.assertEqual(len(get_regressions(results, baseline, 0.5)), 1)
+
+    def test_ratios(self):
+        self.assertEqual(get_ratios({"small": {"a": 0.5, "b": 0.02}}, 0.01), {"small": {"a": 50.0, "b": 2.0}})
+
+
+class TestMemoryBenchmark(TestCase):
+    def test_loaders(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            generate_locales(tmp_dir, 2, 2, 5, value_length=200)
+            cwd = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                self.assertEqual(len(get_language("en", "locales")["$Scope0"]["key-0"]), 200)
+                measures = run_loaders(["aaa", "aab"])
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(sorted(measures), ["json.load", "streaming"])
+        self.assertTrue(all(peak > 0 for peak, _ in measures.values()))
@@ -0,0 +1,40 @@
+from unittest import TestCase
+from changelog_analytics import Change, ChangelogAnalytics, get_csv, get_report
+from update_release import ChangeLogIndex
+import os
+
+
+class TestChange(TestCase):
+    def test_formats(self):
+        change = Change("3.0.1", "- Fix [#1008]: Sourced conflicting holidays")
+        self.assertEqual((change.type, change.pull_request, change.message), ("Fix", 1008, "Sourced conflicting holidays"))
+        change = Change("2.0.1", "-   Enhancement: [#328] Swap position")
+        self.assertEqual((change.type, change.pull_request, change.message), ("Enhancement", 328, "Swap position"))
+        change = Change("3.0.0", "- Translation: Now available in Greek (el)!")
+        self.assertEqual((change.type, change.pull_request), ("Translation", None))
+        self.assertEqual(Change("2.0.1", "- New site for the app! Available in timetoleave.app").type, "Other")
+
+
+class TestChangelogAnalytics(TestCase):
+    def setUp(self):
+        changelog_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), "changelog_mock.md")
+        self.analytics = ChangelogAnalytics(ChangeLogIndex(changelog_file).get_range())
+
+    def test_types_table(self):
+        rows = self.analytics.get_types_table()
+        self.assertEqual(rows[0], ["Version", "Enhancement", "Fix", "Translation", "Total"])
+        self.assertEqual(rows[1], ["1.25.6", 8, 6, 0, 14])
+        self.assertEqual(rows[3], ["1.5.4", 0, 1, 0, 1])
+
+    def test_users(self):
+        self.assertEqual(self.analytics.versions_by_user["thamara"], ["1.25.6", "1.5.5", "1.5.4"])
+        self.assertEqual(self.analytics.users_by_version["1.5.3"], [])
+        self.assertEqual(self.analytics.get_users_table()[1], ["thamara", 3, "1.5.4", "1.25.6"])
+        self.assertEqual(len(self.analytics.changes_by_type["Fix"]), sum(row[2] for row in self.analytics.get_types_table()[1:]))
+
+    def test_outputs(self):
+        self.assertTrue(get_csv(self.analytics.get_types_table()).startswith("Version,Enhancement,Fix,Translation,Total\n1.25.6,8,6,0,14\n"))
+        markdown = get_report(self.analytics, "markdown", None)
+        self.assertIn("| Version | Enhancement | Fix | Translation | Total |\n|---------|", markdown)
+        self.assertIn("## Contributors", markdown)
+        self.assertIn('"pull_request": 328', get_report(self.analytics, "json", None))
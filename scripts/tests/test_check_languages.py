@@ -0,0 +1,208 @@
+from unittest import TestCase
+from unittest.mock import patch
+from check_languages import (Config, LocaleStore, Report, check_locale, find_equal_values, get_locale_results,
+                             get_locales_information_from_config, validate_locales_information,
+                             verify_incremental_results)
+import contextlib
+import io
+from localization_cache import ResultCache
+import json
+import os
+import tempfile
+
+
+def write_locales(root: str, locales: dict):
+    for locale, language in locales.items():
+        os.makedirs(os.path.join(root, locale))
+        with open(os.path.join(root, locale, "translation.json"), "w", encoding="utf8") as f:
+            json.dump(language, f)
+
+
+class TestFindEqualValues(TestCase):
+    def test_equal_values(self):
+        baseline = {"ok": "OK", "help": "Help", "menu": "Menu"}
+        scope = {"ok": "OK", "help": "Ajuda", "menu": "Menu", "extra": "Extra"}
+        self.assertEqual(
+            find_equal_values(["menu"], baseline, scope),
+            {"ok": "OK", "extra": "Extra"},
+        )
+
+    def test_scope_is_not_modified(self):
+        baseline = {"ok": "OK", "help": "Help"}
+        scope = {"ok": "OK", "help": "Ajuda"}
+        find_equal_values(["ok"], baseline, scope)
+        self.assertEqual(scope, {"ok": "OK", "help": "Ajuda"})
+
+
+class TestLocaleStore(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.locales = {
+            "en": {"$Menu": {"ok": "OK"}},
+            "pt-BR": {"$Menu": {"ok": "Ok"}},
+            "it": {"$Menu": {}},
+        }
+        write_locales(self.tmp_dir.name, self.locales)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load(self):
+        store = LocaleStore(self.tmp_dir.name).load(["en", "pt-BR", "it", "en"], jobs=2)
+        for locale, language in self.locales.items():
+            self.assertIn(locale, store)
+            self.assertEqual(store.get(locale), language)
+
+    def test_parses_once(self):
+        store = LocaleStore(self.tmp_dir.name).load(["en"])
+        language = store.get("en")
+        store.load(["en", "it"])
+        self.assertIs(store.get("en"), language)
+        self.assertNotIn("pt-BR", store)
+        self.assertEqual(store.get("pt-BR"), self.locales["pt-BR"])
+
+
+class TestLocaleResults(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.locales_path = os.path.join(self.tmp_dir.name, "locales")
+        self.cache_file = os.path.join(self.tmp_dir.name, "cache.json")
+        write_locales(self.locales_path, {
+            "en": {"$Menu": {"ok": "OK", "help": "Help"}},
+            "xx": {"$Menu": {"ok": "OK", "extra": "Extra"}},
+            "yy": {"$Menu": {"ok": "Dobrze", "help": "Pomoc"}},
+        })
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_check_locale(self):
+        result = check_locale("xx", {"$Menu": {"ok": "OK", "help": "Help"}}, {"$Menu": {"ok": "OK", "extra": "Extra"}})
+        self.assertEqual(result, {
+            "missing_keys": {"$Menu": ["help"]},
+            "extra_keys": {"$Menu": ["extra"]},
+            "missing_translations": {"$Menu": {"ok": "OK", "extra": "Extra"}},
+            "waived_translations": {},
+            "invalid_translations": {},
+            "counts": {"missing_keys": 1, "extra_keys": 1, "missing_translations": 2},
+        })
+
+    def test_counts(self):
+        # A whole scope missing or extra counts all its keys
+        result = check_locale("xx", {"$Menu": {"ok": "OK", "help": "Help"}, "$About": {"title": "About"}},
+                              {"$Menu": {"ok": "OK"}, "$Old": {"a": "A", "b": "B"}})
+        self.assertEqual(result["counts"], {"missing_keys": 2, "extra_keys": 2, "missing_translations": 1})
+
+    def test_cached_results(self):
+        expected = get_locale_results(["xx", "yy"], LocaleStore(self.locales_path))
+
+        cache = ResultCache(self.cache_file)
+        self.assertEqual(get_locale_results(["xx", "yy"], LocaleStore(self.locales_path), cache), expected)
+        # The baseline is cached as well, for the incremental updates
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+        # Only the changed locale is parsed and recomputed
+        with open(os.path.join(self.locales_path, "yy", "translation.json"), "w", encoding="utf8") as f:
+            json.dump({"$Menu": {"ok": "OK", "help": "Pomoc"}}, f)
+        store = LocaleStore(self.locales_path)
+        results = get_locale_results(["xx", "yy"], store, cache)
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+        self.assertNotIn("xx", store)
+        self.assertEqual(results["xx"], expected["xx"])
+        self.assertEqual(results["yy"]["missing_translations"], {"$Menu": {"ok": "OK"}})
+
+    def test_incremental_results(self):
+        cache = ResultCache(self.cache_file)
+        get_locale_results(["xx", "yy"], LocaleStore(self.locales_path), cache)
+
+        # Only the baseline changed, the previous results are updated with the changed keys
+        baseline = {"$Menu": {"ok": "Okay", "help": "Help", "new": "New"}}
+        with open(os.path.join(self.locales_path, "en", "translation.json"), "w", encoding="utf8") as f:
+            json.dump(baseline, f)
+        store = LocaleStore(self.locales_path)
+        with patch("check_languages.check_locale", side_effect=AssertionError("full check")):
+            results = get_locale_results(["xx", "yy"], store, cache)
+        self.assertEqual(json.dumps(results), json.dumps(get_locale_results(["xx", "yy"], LocaleStore(self.locales_path))))
+        self.assertEqual(results["xx"]["missing_keys"], {"$Menu": ["help", "new"]})
+
+    def test_verify_incremental_results(self):
+        store = LocaleStore(self.locales_path)
+        verify_incremental_results({"xx": check_locale("xx", store.get("en"), store.get("xx"))}, store)
+        with self.assertRaises(Exception):
+            verify_incremental_results({"xx": check_locale("xx", {"$Menu": {"new": "New"}}, store.get("xx"))}, store)
+
+    def test_parallel_results(self):
+        serial = get_locale_results(["xx", "yy"], LocaleStore(self.locales_path))
+        parallel = get_locale_results(["xx", "yy"], LocaleStore(self.locales_path), jobs=2)
+        self.assertEqual(json.dumps(parallel), json.dumps(serial))
+
+
+class TestLocalesConfig(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.tmp_dir.name, "app.config.mjs")
+        with open(self.config_file, "w", encoding="utf8") as f:
+            f.write("const languages = {\n    'bn':'বাংলা',\n    'pt-BR': 'Português - Brasil',\n};\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parsed_once(self):
+        locales_info = get_locales_information_from_config(self.config_file)
+        self.assertEqual(dict(locales_info), {"bn": "বাংলা", "pt-BR": "Português - Brasil"})
+        self.assertIs(get_locales_information_from_config(self.config_file), locales_info)
+        with self.assertRaises(TypeError):
+            locales_info["xx"] = "Unknown"
+
+    def test_validate(self):
+        locales_path = os.path.join(self.tmp_dir.name, "locales")
+        write_locales(locales_path, {"bn": {}, "xx": {}})
+        locales_info = get_locales_information_from_config(self.config_file)
+        self.assertEqual(len(validate_locales_information(locales_info, locales_path)), 2)
+
+
+class TestReportRendering(TestCase):
+    def setUp(self):
+        # The language names are read from the configuration of the repository
+        self.cwd = os.getcwd()
+        os.chdir(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", ".."))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.missing_translations = {
+            "xx": {"$Menu": {"ok": "OK", "help": "Help \"me\"\nnow"}, "$DateUtil": {"april": "April"}},
+            "yy": {},
+            "zz": {"$Menu": {"ok": "OK"}},
+        }
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def generate(self, **config) -> str:
+        config = Config(**{"report_summary": True, "link_to_missing": False, "report_key_mismatch": True,
+                           "report_missing_translations": True, "output": None, **config})
+        report = Report(config, {"xx": {"$Menu": ["menu"]}}, {"zz": {"$Extra": []}}, self.missing_translations)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            report.generate(10, os.path.join(self.tmp_dir.name, "summary.json"))
+        return stdout.getvalue()
+
+    def test_stdout(self):
+        stdout = self.generate()
+        self.assertIn("- xx: 70.00\n- yy: 100.00\n- zz: 90.00\n", stdout)
+        languages_with_missing_keys = {k: v for k, v in self.missing_translations.items() if v}
+        self.assertTrue(stdout.endswith("Missing Translations\n" + json.dumps(languages_with_missing_keys, indent=2) + "\n"))
+
+    def test_sinks(self):
+        output = os.path.join(self.tmp_dir.name, "missing.md")
+        self.generate(output=output, link_to_missing=True)
+        with open(output) as f:
+            markdown = f.read()
+        self.assertTrue(markdown.startswith("# Summary - 4 languages supported (10 strings)\n"))
+        self.assertIn("| yy | ![Progress](https://progress-bar.dev/100/?width=200) | 0  |\n", markdown)
+        self.assertIn("## xx\n3/10 - 30.00% missing:\n", markdown)
+        with open(os.path.join(self.tmp_dir.name, "summary.json")) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["languages"], 4)
+        self.assertEqual(summary["locales"]["xx"]["missing_strings"], 3)
+        self.assertEqual(summary["locales"]["xx"]["missing_keys"], 1)
+        self.assertEqual(summary["locales"]["zz"]["extra_keys"], 0)
@@ -0,0 +1,37 @@
+from unittest import TestCase
+from compare_language_reports import ComparisonReport
+
+
+class TestComparisonReport(TestCase):
+    def test_flattenize_keys(self):
+        keys = {
+            "$Menu": ["ok", "help"],
+            "$DateUtil": {"april": "April"},
+            "$Preferences": [],
+        }
+        self.assertEqual(
+            ComparisonReport.flattenize_keys(keys),
+            {"$Menu.ok", "$Menu.help", "$DateUtil.april", "$Preferences"},
+        )
+
+    def test_process_whole_scopes(self):
+        baseline = {"de-DE": {"$Menu": ["ok"], "$About": []}}
+        target = {"de-DE": {"$Menu": ["ok"], "$Balance": []}}
+        self.assertEqual(ComparisonReport.process(baseline, target), ({"de-DE": ["$About"]}, {"de-DE": ["$Balance"]}))
+
+    def test_process(self):
+        baseline = {
+            "de-DE": {"$Menu": ["ok", "help"], "$DateUtil": ["april"]},
+            "it": {"$Menu": ["ok"]},
+        }
+        target = {
+            "de-DE": {"$Menu": ["ok"], "$DateUtil": ["april", "may"]},
+            "pl": {"$Menu": ["menu"]},
+        }
+        fixed, introduced = ComparisonReport.process(baseline, target)
+        self.assertEqual(fixed, {"de-DE": ["$Menu.help"], "it": ["$Menu.ok"]})
+        self.assertEqual(introduced, {"de-DE": ["$DateUtil.may"], "pl": ["$Menu.menu"]})
+
+    def test_process_no_differences(self):
+        info = {"es": {"$Menu": ["ok"], "$MonthCalendar": ["no", "total"]}}
+        self.assertEqual(ComparisonReport.process(info, info), ({}, {}))
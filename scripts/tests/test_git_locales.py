@@ -0,0 +1,64 @@
+from unittest import TestCase
+from check_languages import Config, compare_refs
+from git_locales import get_changed_locales, get_locale_blobs, read_blobs
+import json
+import os
+import subprocess
+import tempfile
+
+
+class TestChangedLocales(TestCase):
+    def test_only_changed_locales(self):
+        baseline = {"en": "1", "es": "2", "pl": "3", "it": "4"}
+        target = {"en": "1", "es": "2", "pl": "5", "ja": "6"}
+        self.assertEqual(get_changed_locales(baseline, target), ["it", "ja", "pl"])
+
+    def test_baseline_language_changed(self):
+        baseline = {"en": "1", "es": "2"}
+        target = {"en": "7", "es": "2"}
+        self.assertEqual(get_changed_locales(baseline, target), ["es"])
+
+
+class TestCompareRefs(TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        self.git("init", "-q")
+        self.commit({
+            "en": {"$Menu": {"ok": "OK", "help": "Help"}},
+            "xx": {"$Menu": {"ok": "OK", "help": "Ajuda"}},
+            "yy": {"$Menu": {"ok": "Ok", "help": "Help"}},
+        })
+        self.git("tag", "baseline")
+        self.commit({"xx": {"$Menu": {"ok": "Ok", "help": "Ajuda", "extra": "Extra"}}})
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def git(self, *args):
+        subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@test", *args], check=True)
+
+    def commit(self, locales: dict):
+        for locale, language in locales.items():
+            os.makedirs(os.path.join("locales", locale), exist_ok=True)
+            with open(os.path.join("locales", locale, "translation.json"), "w", encoding="utf8") as f:
+                json.dump(language, f)
+        self.git("add", "locales")
+        self.git("commit", "-q", "-m", "update")
+
+    def test_read_blobs(self):
+        blobs = get_locale_blobs("HEAD")
+        self.assertEqual(sorted(blobs), ["en", "xx", "yy"])
+        languages = read_blobs(list(blobs.values()))
+        self.assertEqual(languages[blobs["en"]], {"$Menu": {"ok": "OK", "help": "Help"}})
+
+    def test_compare_refs(self):
+        config = Config(False, False, True, True, None)
+        compare_refs("baseline", "HEAD", config, "comparison.md")
+        with open("comparison.md", encoding="utf8") as f:
+            comparison = f.read()
+        self.assertIn('"$Menu.extra"', comparison)
+        self.assertIn('"xx": [\n    "$Menu.ok"\n  ]', comparison)
+        self.assertNotIn('"yy"', comparison)
@@ -0,0 +1,57 @@
+from unittest import TestCase
+from ignore_rules import IgnoreRule, IgnoreRules
+
+RULES = """
+# Comment
+$Menu.ttl-github
+*.hours-per-day
+pt-*:$Menu.ok
+it:$DateUtil.a*
+"""
+
+
+class TestIgnoreRule(TestCase):
+    def test_parse(self):
+        rule = IgnoreRule("pt-*:$Menu.ok")
+        self.assertEqual((rule.locale, rule.scope, rule.key), ("pt-*", "$Menu", "ok"))
+        rule = IgnoreRule("$Menu.ttl-github")
+        self.assertEqual((rule.locale, rule.scope, rule.key), ("*", "$Menu", "ttl-github"))
+
+    def test_invalid_rule(self):
+        with self.assertRaises(ValueError):
+            IgnoreRule("pt-BR:$Menu")
+
+
+class TestIgnoreRules(TestCase):
+    def setUp(self):
+        self.rules = IgnoreRules.parse(RULES)
+
+    def test_keys_to_ignore(self):
+        self.assertEqual(len(self.rules.rules), 4)
+        keys = self.rules.get_keys_to_ignore("pt-BR", "$Menu")
+        self.assertIn("ok", keys)
+        self.assertIn("ttl-github", keys)
+        self.assertNotIn("menu", keys)
+        self.assertIn("hours-per-day", self.rules.get_keys_to_ignore("es", "$Preferences"))
+        self.assertNotIn("ok", self.rules.get_keys_to_ignore("es", "$Menu"))
+        self.assertIn("april", self.rules.get_keys_to_ignore("it", "$DateUtil"))
+        self.assertNotIn("may", self.rules.get_keys_to_ignore("it", "$DateUtil"))
+        self.assertNotIn("no", self.rules.get_keys_to_ignore("es", "$DayCalendar"))
+
+    def test_compiled_once(self):
+        self.assertIs(
+            self.rules.get_keys_to_ignore("pt-BR", "$Menu"),
+            self.rules.get_keys_to_ignore("pt-BR", "$Menu"),
+        )
+
+    def test_hits(self):
+        self.rules.record_hits("pt-BR", {"$Menu": ["ok"], "$Preferences": ["hours-per-day"]})
+        self.rules.record_hits("it", {"$DateUtil": ["april", "august"]})
+        self.assertEqual(self.rules.hits["pt-*:$Menu.ok"], 1)
+        self.assertEqual(self.rules.hits["it:$DateUtil.a*"], 2)
+        self.assertEqual([rule.rule for rule in self.rules.get_unused_rules()], ["$Menu.ttl-github"])
+
+    def test_default_rules(self):
+        rules = IgnoreRules.load()
+        self.assertIn("ttl-github", rules.get_keys_to_ignore("es", "$Menu"))
+        self.assertIn("hours-per-day", rules.get_keys_to_ignore("pt-BR", "$Preferences"))
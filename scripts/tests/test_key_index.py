@@ -0,0 +1,68 @@
+from unittest import TestCase
+from check_languages import BASELINE_LANGUAGE, compare_language, get_keys_to_ignore, get_language, get_missing_keys
+from key_index import KeyIndex
+import copy
+import os
+
+LOCALES_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "..", "locales")
+
+BASELINE = {
+    "$Menu": {"ok": "OK", "help": "Help", "menu": "Menu"},
+    "$DateUtil": {"april": "April"},
+    "$Preferences": {"themes": "Themes"},
+}
+
+LANGUAGE = {
+    "$Menu": {"ok": "OK", "help": "Ajuda", "extra": "Extra"},
+    "$DateUtil": {"april": "April"},
+    "$Unknown": {"key": "Value"},
+}
+
+
+def sorted_lists(keys: dict) -> dict:
+    return {scope: sorted(scope_keys) for scope, scope_keys in keys.items()}
+
+
+class TestKeyIndex(TestCase):
+    def test_ids(self):
+        index = KeyIndex(BASELINE)
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.keys[index.ids["$DateUtil"]["april"]], ("$DateUtil", "april"))
+        self.assertEqual(index.scope_ranges["$Menu"], (0, 3))
+
+    def test_coverage(self):
+        coverage = KeyIndex(BASELINE).get_coverage(LANGUAGE)
+        self.assertEqual(coverage.missing_keys(), {"$Menu": ["menu"], "$Preferences": []})
+        self.assertEqual(coverage.extra_keys(), {"$Menu": ["extra"], "$Unknown": []})
+        self.assertEqual(
+            coverage.untranslated(lambda scope: ["april"] if scope == "$DateUtil" else []),
+            {"$Menu": {"ok": "OK", "extra": "Extra"}},
+        )
+
+    def test_counts(self):
+        coverage = KeyIndex(BASELINE).get_coverage(LANGUAGE)
+        # A missing (or unknown) scope counts all its keys
+        waived = coverage.waived(lambda scope: ["april"] if scope == "$DateUtil" else [])
+        self.assertEqual(coverage.counts(waived), {"missing_keys": 2, "extra_keys": 2, "missing_translations": 2})
+
+    def test_same_as_dict_checks(self):
+        # The index must give the same results as the dict based checks for every locale
+        baseline_language = get_language(BASELINE_LANGUAGE, LOCALES_PATH)
+        index = KeyIndex(baseline_language)
+        locales = os.listdir(LOCALES_PATH)
+        locales.remove(BASELINE_LANGUAGE)
+        for locale in locales:
+            language = get_language(locale, LOCALES_PATH)
+            coverage = index.get_coverage(language)
+            self.assertEqual(
+                sorted_lists(coverage.missing_keys()),
+                sorted_lists(get_missing_keys(baseline_language, language)),
+            )
+            self.assertEqual(
+                sorted_lists(coverage.extra_keys()),
+                sorted_lists(get_missing_keys(language, baseline_language)),
+            )
+            self.assertEqual(
+                coverage.untranslated(lambda scope: get_keys_to_ignore(locale, scope)),
+                compare_language(locale, baseline_language, copy.deepcopy(language)),
+            )
@@ -0,0 +1,64 @@
+from unittest import TestCase
+from localization_cache import ResultCache, get_cache_key
+import os
+import stat
+import tempfile
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmp_dir.name, "cache.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cache_key(self):
+        self.assertEqual(get_cache_key("a", "b"), get_cache_key("a", "b"))
+        self.assertNotEqual(get_cache_key("a", "b"), get_cache_key("b", "a"))
+
+    def test_get_and_put(self):
+        cache = ResultCache(self.cache_file).load()
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", {"missing_keys": {}})
+        self.assertEqual(cache.get("key"), {"missing_keys": {}})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_persistence(self):
+        cache = ResultCache(self.cache_file).load()
+        cache.put("key", {"missing_translations": {"$Menu": {"ok": "OK"}}})
+        cache.save()
+
+        cache = ResultCache(self.cache_file).load()
+        self.assertEqual(cache.get("key"), {"missing_translations": {"$Menu": {"ok": "OK"}}})
+
+    def test_file_mode(self):
+        cache = ResultCache(self.cache_file).load()
+        cache.put("key", {})
+        cache.save()
+        # Created with the permissions of any new file, kept once changed
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_file).st_mode), 0o666 & ~umask)
+        os.chmod(self.cache_file, 0o640)
+        cache.put("other", {})
+        cache.save()
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_file).st_mode), 0o640)
+
+    def test_corrupted_file(self):
+        with open(self.cache_file, "w") as f:
+            f.write("{not json")
+        cache = ResultCache(self.cache_file).load()
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = ResultCache(self.cache_file, max_entries=2).load()
+        cache.put("a", {})
+        cache.put("b", {})
+        # Using "a" makes "b" the least recently used entry
+        cache.get("a")
+        cache.put("c", {})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
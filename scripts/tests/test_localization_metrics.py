@@ -0,0 +1,105 @@
+from unittest import TestCase
+from check_languages import check_locale
+from localization_metrics import Commit, LocaleMetrics, MetricsStore, backfill, get_history, main
+import contextlib
+import io
+import json
+import os
+import subprocess
+import tempfile
+
+BASELINE = {"$Menu": {"ok": "OK", "help": "Help"}, "$About": {"title": "About"}}
+
+
+def get_metrics(missing_strings: dict) -> dict:
+    # Metrics of locale "xx" with the given missing strings per scope
+    language = {"$Menu": {"ok": "Ok", "help": "Ajuda"}, "$About": {"title": "Sobre"}}
+    for scope, count in missing_strings.items():
+        for key in list(BASELINE[scope])[:count]:
+            language[scope][key] = BASELINE[scope][key]
+    return {"xx": LocaleMetrics(BASELINE, check_locale("xx", BASELINE, language))}
+
+
+class TestLocaleMetrics(TestCase):
+    def test_locale_metrics(self):
+        result = check_locale("xx", BASELINE, {"$Menu": {"ok": "OK", "extra": "Extra"}})
+        metrics = LocaleMetrics(BASELINE, result)
+        self.assertEqual(metrics.scopes, [("$Menu", 2, 1, 2), ("$About", 1, 1, 0)])
+        self.assertEqual((metrics.missing_keys, metrics.missing_translations), (2, 2))
+        self.assertAlmostEqual(metrics.percentage_translated, 100 / 3)
+
+
+class TestMetricsStore(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = MetricsStore(os.path.join(self.tmp_dir.name, "metrics.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_trend(self):
+        self.store.add_commit(Commit("b", 2, 100), 3, get_metrics({"$Menu": 1}))
+        self.store.add_commit(Commit("a", 1, 100), 3, get_metrics({"$Menu": 2}))
+        self.store.add_commit(Commit("c", 3, 100), 3, get_metrics({}))
+        self.assertEqual([row[0] for row in self.store.get_trend("xx")], ["a", "b", "c"])
+        self.assertEqual([row[3] for row in self.store.get_trend("xx", 2)], [1, 0])
+        self.assertEqual(self.store.get_trend("yy"), [])
+
+    def test_regressions(self):
+        self.store.add_commit(Commit("a", 1, 100), 3, get_metrics({}))
+        self.store.add_commit(Commit("c", 3, 100), 3, get_metrics({"$Menu": 2, "$About": 1}))
+        self.assertEqual(self.store.get_regressions(), [("$Menu", 1, 2, 1), ("$About", 1, 1, 1)])
+        # Recorded out of order, the regressions of the next commit are updated
+        self.store.add_commit(Commit("b", 2, 100), 3, get_metrics({"$Menu": 1}))
+        self.assertEqual(self.store.get_regressions(), [("$Menu", 2, 2, 1), ("$About", 1, 1, 1)])
+        self.assertEqual(self.store.get_regressions(last=1, top=1), [("$About", 1, 1, 1)])
+        # Recording a commit again replaces its metrics
+        self.store.add_commit(Commit("c", 3, 100), 3, get_metrics({}))
+        self.assertEqual(self.store.get_regressions(), [("$Menu", 1, 1, 1)])
+
+
+class TestBackfill(TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        self.git("init", "-q")
+        self.commit({"en": BASELINE, "xx": {"$Menu": {"ok": "Ok", "help": "Help"}, "$About": {"title": "Sobre"}}})
+        self.commit({"yy": {"$Menu": {"ok": "Ok", "help": "Ajuda"}}})
+        self.commit({"en": {"$Menu": {"ok": "OK", "help": "Help", "new": "New"}, "$About": {"title": "About"}}})
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def git(self, *args):
+        subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@test", *args], check=True)
+
+    def commit(self, locales: dict):
+        for locale, language in locales.items():
+            os.makedirs(os.path.join("locales", locale), exist_ok=True)
+            with open(os.path.join("locales", locale, "translation.json"), "w", encoding="utf8") as f:
+                json.dump(language, f)
+        self.git("add", "locales")
+        self.git("commit", "-q", "-m", "update")
+
+    def test_backfill(self):
+        history = get_history("HEAD")
+        with MetricsStore("metrics.db") as store:
+            self.assertEqual(backfill(store, "HEAD", 2), 2)
+            self.assertEqual(backfill(store, "HEAD"), 1)
+            self.assertEqual(backfill(store, "HEAD"), 0)
+            trend = store.get_trend("xx")
+            self.assertEqual([row[0] for row in trend], [commit.sha for commit in history])
+            # Missing strings, then missing keys
+            self.assertEqual([(row[3], row[4]) for row in trend], [(1, 0), (1, 0), (1, 1)])
+            self.assertEqual([row[4] for row in store.get_trend("yy")], [1, 2])
+            self.assertEqual(store.get_regressions(), [("$Menu", 2, 2, 2)])
+
+    def test_backfill_cache_file(self):
+        # The backfill leaves the cache of check_languages.py alone
+        with contextlib.redirect_stdout(io.StringIO()):
+            main(["backfill", "-db", "metrics.db"])
+        self.assertTrue(os.path.isfile(".localization_metrics_cache.json"))
+        self.assertFalse(os.path.exists(".localization_cache.json"))
@@ -0,0 +1,35 @@
+from unittest import TestCase
+from profiler import Profiler
+import json
+
+
+class TestProfiler(TestCase):
+    def test_disabled(self):
+        profiler = Profiler()
+        with profiler.phase("load"):
+            pass
+        self.assertEqual(profiler.stats, {})
+
+    def test_phases(self):
+        profiler = Profiler(enabled=True)
+        try:
+            with profiler.phase("check"):
+                for locale in ["es", "pl", "es"]:
+                    with profiler.phase("coverage", locale):
+                        data = [0] * 100000
+                        del data
+        finally:
+            profiler.disable()
+
+        self.assertEqual(profiler.stats[("coverage", "es")].calls, 2)
+        self.assertEqual(profiler.stats[("coverage", "pl")].calls, 1)
+        check = profiler.stats[("check", None)]
+        self.assertEqual(check.calls, 1)
+        # Memory allocated by the inner phases counts for the outer one
+        self.assertGreaterEqual(check.peak_memory, 800000)
+        self.assertGreaterEqual(profiler.stats[("coverage", "pl")].peak_memory, 800000)
+        self.assertGreaterEqual(check.seconds, profiler.stats[("coverage", "pl")].seconds)
+
+        entries = json.loads(profiler.to_json())
+        self.assertEqual(len(entries), 3)
+        self.assertIn("| coverage | pl | 1 |", profiler.get_table())
@@ -0,0 +1,58 @@
+from unittest import TestCase
+from check_languages import Config, Report
+from compare_language_reports import ComparisonReport, load_report
+from raw_report import BinaryReport, is_binary_report, write_binary_report
+import os
+import tempfile
+
+
+def get_report(**changes) -> Report:
+    report = {
+        "errors_missing_keys": {"pl": {"$Menu": ["help", "menu"], "$DateUtil": []}},
+        "errors_extra_keys": {},
+        "missing_translations": {
+            "pl": {"$Menu": {"ok": "OK"}},
+            "it": {"$Menu": {"ok": "OK", "help": "Help"}, "$DayCalendar": {"no": "No"}},
+            "es": {},
+        },
+    }
+    report.update(changes)
+    return Report(Config(True, False, True, True, "missing.md"), **report)
+
+
+class TestBinaryReport(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "report.ttlr")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        report = get_report()
+        write_binary_report(report, self.file_path)
+        self.assertTrue(is_binary_report(self.file_path))
+        with BinaryReport(self.file_path) as binary_report:
+            self.assertEqual(binary_report.errors_missing_keys, report.errors_missing_keys)
+            self.assertEqual(binary_report.errors_extra_keys, report.errors_extra_keys)
+            self.assertEqual(binary_report.missing_translations, report.missing_translations)
+            self.assertEqual(binary_report.config, report.config.__dict__)
+
+    def test_keys_without_values(self):
+        write_binary_report(get_report(missing_translations={"it": {"$Menu": {"ok": "Value"}}}), self.file_path)
+        with BinaryReport(self.file_path) as binary_report:
+            self.assertEqual(binary_report.get_keys("missing_translations"), {"it": {"$Menu": ["ok"]}})
+            self.assertNotIn("Value", binary_report._strings.values())
+
+    def test_compare_binary_reports(self):
+        baseline = get_report()
+        target = get_report(missing_translations={"pl": {}, "it": {"$Menu": {"ok": "OK"}, "$Preferences": {"themes": "Themes"}}})
+        baseline_file = os.path.join(self.tmp_dir.name, "baseline.ttlr")
+        write_binary_report(baseline, baseline_file)
+        write_binary_report(target, self.file_path)
+        json_comparison = ComparisonReport(None)
+        json_comparison.report(baseline, target)
+        binary_comparison = ComparisonReport(None)
+        binary_comparison.report(load_report(baseline_file), load_report(self.file_path))
+        self.assertEqual(binary_comparison.fixed_missing_translations, json_comparison.fixed_missing_translations)
+        self.assertEqual(binary_comparison.introduced_missing_translations, {"it": ["$Preferences.themes"]})
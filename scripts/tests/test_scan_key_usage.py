@@ -0,0 +1,86 @@
+from unittest import TestCase
+from unittest.mock import patch
+import localization_cache
+from localization_cache import ResultCache
+import scan_key_usage
+from scan_key_usage import KeyUsageReport, get_dynamic_key_pattern, get_source_files, scan_files, scan_source
+import os
+import tempfile
+
+BASELINE = {
+    "$Menu": {"ok": "OK", "quit": "Quit", "unused": "Unused"},
+    "$DateUtil": {"january": "January", "february": "February"},
+    "$Preferences": {"title": "Preferences", "hours": "Hours"},
+}
+
+SOURCE = """const ok = getTranslationInLanguageData(languageData, '$Menu.ok');
+const quit = "$Menu.quit";
+const month = `$DateUtil.${monthNames[monthIndex]}`;
+const missing = '$Menu.missing';
+const total = `${hours}h`;
+"""
+
+
+class TestScanSource(TestCase):
+    def test_keys(self):
+        usage = scan_source(SOURCE)
+        self.assertEqual(usage["keys"], [["$Menu", "ok", 1], ["$Menu", "quit", 2], ["$Menu", "missing", 4]])
+        self.assertEqual(usage["dynamic_keys"], [["$DateUtil.${monthNames[monthIndex]}", 3]])
+
+    def test_data_i18n_attributes(self):
+        usage = scan_source('<input data-i18n="[placeholder]$Preferences.hours;[title]$Preferences.title">')
+        self.assertEqual(usage["keys"], [["$Preferences", "hours", 1], ["$Preferences", "title", 1]])
+
+    def test_dynamic_key_pattern(self):
+        self.assertEqual(get_dynamic_key_pattern("$DateUtil.${dayAbbrs[dayIndex]}"), "$DateUtil.*")
+        self.assertEqual(get_dynamic_key_pattern("$${windowName}.title"), "$*.title")
+        self.assertIsNone(get_dynamic_key_pattern("${amount}"))
+
+
+class TestKeyUsageReport(TestCase):
+    def test_report(self):
+        report = KeyUsageReport(BASELINE, {"js/menus.mjs": scan_source(SOURCE)})
+        self.assertEqual(report.undefined_keys, [["js/menus.mjs", 4, "$Menu.missing"]])
+        self.assertEqual(report.unused_keys, {"$Menu": ["unused"], "$Preferences": ["title", "hours"]})
+        self.assertEqual(report.dynamic_keys, [["js/menus.mjs", 3, "$DateUtil.${monthNames[monthIndex]}", 2]])
+        self.assertIn("- `$Menu.missing` (js/menus.mjs:4)", report.get_markdown())
+
+
+class TestScanFiles(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source_dir = os.path.join(self.tmp_dir.name, "js")
+        os.makedirs(os.path.join(self.source_dir, "__tests__"))
+        self.files = [os.path.join(self.source_dir, name) for name in ["a.mjs", "b.html"]]
+        for file_path in self.files:
+            with open(file_path, "w", encoding="utf8") as f:
+                f.write(SOURCE)
+        with open(os.path.join(self.source_dir, "__tests__", "a.mjs"), "w", encoding="utf8") as f:
+            f.write(SOURCE)
+        with open(os.path.join(self.source_dir, "notes.txt"), "w", encoding="utf8") as f:
+            f.write(SOURCE)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_source_files(self):
+        self.assertEqual(get_source_files([self.source_dir]), self.files)
+
+    def test_cached_results(self):
+        cache = ResultCache(os.path.join(self.tmp_dir.name, "cache.json"))
+        expected = scan_files(self.files, cache)
+        self.assertEqual(expected[self.files[0]], scan_source(SOURCE))
+
+        # Unchanged files are not scanned again, even if their modification time changed
+        os.utime(self.files[0], (1, 1))
+        with patch("scan_key_usage.scan_source", side_effect=AssertionError("scanned")):
+            self.assertEqual(scan_files(self.files, cache), expected)
+
+        with open(self.files[1], "w", encoding="utf8") as f:
+            f.write("'$Menu.ok'")
+        self.assertEqual(scan_files(self.files, cache)[self.files[1]]["keys"], [["$Menu", "ok", 1]])
+
+    def test_own_cache_file(self):
+        # The results of the source files never evict the results of the locales
+        self.assertNotEqual(scan_key_usage.DEFAULT_CACHE_FILE, localization_cache.DEFAULT_CACHE_FILE)
+        self.assertGreater(scan_key_usage.MAX_CACHE_ENTRIES, localization_cache.DEFAULT_MAX_ENTRIES)
@@ -0,0 +1,112 @@
+from unittest import TestCase
+from unittest.mock import patch
+from benchmarks.generate_locales import generate_locales
+from check_languages import check_locale, main
+from streaming_loader import BaselineDigests, TranslationReader, check_locale_file
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+BASELINE = {
+    "$Menu": {"import": "Import", "export": "Export", "help": "Help"},
+    "$Balance": {"total": "Total: {count} <b>hours</b>", "day": "Day"},
+    "$About": {"version": "Version"},
+}
+LANGUAGE = {
+    "$Menu": {"import": "Importer", "export": "Export", "old": "Old é\\\"quoted\\\""},
+    "$Balance": {"total": "Total : {nombre} <b>heures", "day": "Jour "},
+    "$Removed": {"key": "Value"},
+}
+
+
+class TestTranslationReader(TestCase):
+    def read(self, text, chunk_size):
+        return list(TranslationReader(io.StringIO(text), chunk_size))
+
+    def test_events(self):
+        text = json.dumps(LANGUAGE, ensure_ascii=False, indent=4)
+        events = self.read(text, 3)
+        self.assertEqual(events[:2], [("$Menu", None, None), ("$Menu", "import", "Importer")])
+        # Strings split over chunks, escapes included, are read whole at any chunk size
+        for chunk_size in (1, 2, 5, 1 << 16):
+            self.assertEqual(self.read(text, chunk_size), events)
+        self.assertEqual(self.read(json.dumps(LANGUAGE, separators=(",", ":")), 4), events)
+        self.assertEqual(self.read('{"$Empty": {}}', 2), [("$Empty", None, None)])
+        self.assertEqual(self.read("{}", 1), [])
+
+    def test_long_strings(self):
+        value = 'a\\"é' * 20000
+        text = json.dumps({"$A": {"long": value, "short": "b"}}, ensure_ascii=False)
+        # Escapes split over chunks included
+        for chunk_size in (7, 64, 1 << 16):
+            self.assertEqual(self.read(text, chunk_size)[1:], [("$A", "long", value), ("$A", "short", "b")])
+
+    def test_invalid_escape(self):
+        file = io.StringIO('{"$A": {"a": "\\q", "b": "' + "x" * 10000 + '"}}')
+        with self.assertRaises(ValueError):
+            list(TranslationReader(file, 8))
+        # Raised at the end of the string, without reading the rest of the file
+        self.assertLess(file.tell(), 100)
+
+    def test_invalid(self):
+        for text in ('{"$Menu": {"import": 1}}', '{"$Menu": {"import": "Import"}', '{"$Menu": []}', '{} {}', '{"$Menu": {"a": "b'):
+            with self.assertRaises(ValueError):
+                self.read(text, 4)
+
+
+class TestCheckLocaleFile(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = lambda name: os.path.join(self.tmp_dir.name, name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, content):
+        with open(self.path(name), "w", encoding="utf8") as f:
+            f.write(content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, indent=4))
+        return self.path(name)
+
+    def test_same_results(self):
+        baseline = BaselineDigests.from_file(self.write("en.json", BASELINE), 4)
+        language_file = self.write("fr.json", LANGUAGE)
+        keys_to_ignore = {"$Menu": ["export"]}
+        result = check_locale_file(baseline, language_file, lambda scope: keys_to_ignore.get(scope, []), 4)
+        self.assertEqual(result["missing_translations"], {"$Menu": {"old": 'Old é\\"quoted\\"'}})
+        self.assertEqual(result["waived_translations"], {"$Menu": ["export"]})
+        self.assertEqual(result["invalid_translations"]["$Balance"]["day"],
+                         ["different leading or trailing whitespace than the baseline"])
+        # Same results, in the same order, as the check of the loaded files
+        with patch("locale_checks.get_keys_to_ignore", lambda locale, scope: keys_to_ignore.get(scope, [])):
+            expected = check_locale("fr", BASELINE, LANGUAGE)
+        self.assertEqual(json.dumps(result), json.dumps(expected))
+
+    def test_custom_validators(self):
+        baseline = BaselineDigests.from_file(self.write("en.json", BASELINE))
+        key_id = baseline.ids["$About"]["version"]
+        self.assertEqual(baseline.validate(key_id, "Versión"), [])
+        self.assertEqual(baseline.validate(key_id, "Versión", [lambda baseline, translation: "rejected"]), ["rejected"])
+
+    def test_duplicates(self):
+        baseline = BaselineDigests.from_file(self.write("en.json", BASELINE))
+        # As json.load, the last value of a duplicate key is kept
+        language_file = self.write("fr.json", '{"$About": {"version": "Version", "version": "Vers."}}')
+        self.assertEqual(check_locale_file(baseline, language_file, lambda scope: [])["missing_translations"], {})
+        language_file = self.write("fr.json", '{"$About": {}, "$About": {}}')
+        with self.assertRaises(ValueError):
+            check_locale_file(baseline, language_file, lambda scope: [])
+
+    def test_no_result_cache(self):
+        generate_locales(self.tmp_dir.name, 1, 2, 5, untranslated_ratio=1)
+        cache_file = self.path("cache.json")
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                main(["-streaming", "-report_missing_translations", "-cache_file", cache_file])
+        finally:
+            os.chdir(cwd)
+        self.assertIn("aaa", output.getvalue())
+        self.assertFalse(os.path.exists(cache_file))
@@ -0,0 +1,69 @@
+from unittest import TestCase
+from check_languages import check_locale
+from key_index import KeyIndex
+from string_validators import (StringTokens, TranslationValidator, check_placeholders, check_tags, check_whitespace,
+                               is_plain, validate_translation)
+
+
+def check_no_placeholders(baseline, translation):
+    return None if translation.placeholders else "no placeholders"
+
+
+def check(validator, baseline, translation):
+    return validator(StringTokens(baseline), StringTokens(translation))
+
+
+class TestStringTokens(TestCase):
+    def test_tokens(self):
+        tokens = StringTokens(" Hello {{name}}, you have %d <b>new</b> messages<br> ")
+        self.assertEqual(dict(tokens.placeholders), {"{{name}}": 1, "%d": 1})
+        self.assertEqual(tokens.tags, [("b", False), ("b", True)])
+        self.assertEqual((tokens.leading, tokens.trailing), (" ", " "))
+
+    def test_plain_strings(self):
+        self.assertTrue(is_plain(["Import", "Import database"]))
+        self.assertFalse(is_plain(["Import", "Balance: "]))
+        self.assertFalse(is_plain(["Import", "{count} items"]))
+        self.assertFalse(is_plain(["<b>Import</b>"]))
+
+
+class TestValidators(TestCase):
+    def test_placeholders(self):
+        self.assertIsNone(check(check_placeholders, "{count} of ${total}", "${total} sur {count}"))
+        self.assertEqual(check(check_placeholders, "{count} of {total}", "{count} sur {totale}"),
+                         "missing placeholders {total}; unexpected placeholders {totale}")
+        self.assertEqual(check(check_placeholders, "%s and %s", "%s et"), "missing placeholders %s")
+
+    def test_tags(self):
+        self.assertIsNone(check(check_tags, "<b>Bold</b> text<br/>", "Texte <b>gras</b>"))
+        self.assertEqual(check(check_tags, "<b>Bold</b>", "<b>Gras"), "unclosed tag <b>")
+        self.assertEqual(check(check_tags, "<b><i>Bold</i></b>", "<b><i>Gras</b></i>"), "unbalanced tag </b>")
+        self.assertEqual(check(check_tags, "<b>Bold</b>", "<i>Gras</i>"), "different tags than the baseline")
+
+    def test_whitespace(self):
+        self.assertIsNone(check(check_whitespace, "Balance: ", "Saldo: "))
+        self.assertEqual(check(check_whitespace, "Import", "Importar "), "different leading or trailing whitespace than the baseline")
+
+    def test_every_validator_runs(self):
+        self.assertEqual(len(validate_translation("<b>{count}</b>", " <b>count ")), 3)
+        self.assertEqual(validate_translation("<b>{count}</b>", "<b>{count}</b> !"), [])
+
+
+class TestCheckLocale(TestCase):
+    def test_invalid_translations(self):
+        baseline = {"$Menu": {"ok": "OK", "count": "{count} items", "import": "Import"}}
+        language = {"$Menu": {"import": "Importar ", "ok": "OK", "count": "{count} elementos", "extra": " Extra"}}
+        index = KeyIndex(baseline)
+        result = check_locale("xx", baseline, language, index, TranslationValidator(index))
+        # Untranslated and extra keys are not validated
+        self.assertEqual(result["invalid_translations"], {
+            "$Menu": {"import": ["different leading or trailing whitespace than the baseline"]}})
+
+    def test_custom_validator_on_plain_strings(self):
+        # Plain strings are only skipped for the default validators
+        baseline = {"$Menu": {"ok": "OK", "import": "Import"}}
+        language = {"$Menu": {"ok": "OK", "import": "Importar"}}
+        index = KeyIndex(baseline)
+        result = check_locale("xx", baseline, language, index, TranslationValidator(index, [check_no_placeholders]))
+        self.assertEqual(result["invalid_translations"], {"$Menu": {"import": ["no placeholders"]}})
+        self.assertEqual(check_locale("xx", baseline, language, index, TranslationValidator(index))["invalid_translations"], {})
@@ -0,0 +1,96 @@
+from unittest import TestCase
+from check_languages import LocaleStore, get_locale_results, get_new_issue_url, get_suggestions, write_suggestions
+from translation_memory import TranslationMemory, apply_suggestions, normalize, write_translation_file
+from tests.test_check_languages import write_locales
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+BASELINE = {
+    "$DayCalendar": {"no": "No", "ok": "OK", "total": "Total"},
+    "$MonthCalendar": {"no": "No", "ok": "OK ", "total": "Total", "day": "Day"},
+    "$WorkdayWaiver": {"no": "no", "total": "Total"},
+}
+LANGUAGE = {
+    "$DayCalendar": {"no": "Não", "ok": "OK", "total": "Total"},
+    "$MonthCalendar": {"no": "Não", "ok": "Certo", "total": "Totais", "day": "Dia"},
+    "$WorkdayWaiver": {"total": "Totais"},
+}
+
+
+class TestTranslationMemory(TestCase):
+    def setUp(self):
+        self.memory = TranslationMemory(BASELINE)
+        self.memory.add_locale("xx", LANGUAGE)
+
+    def test_normalize(self):
+        self.assertEqual(normalize("  Yes,   Please "), "yes, please")
+
+    def test_suggest(self):
+        self.assertEqual(self.memory.suggest("xx", "NO"), "Não")
+        self.assertEqual(self.memory.suggest("xx", "ok"), "Certo")
+        self.assertIsNone(self.memory.suggest("xx", "Day off"))
+
+    def test_suggestions(self):
+        suggestions = self.memory.get_suggestions("xx", {"$DayCalendar": ["ok", "total", "extra"], "$WorkdayWaiver": ["no"]})
+        self.assertEqual(suggestions, {
+            "$DayCalendar": {"ok": "Certo", "total": "Totais"},
+            "$WorkdayWaiver": {"no": "Não"},
+        })
+        # All the keys of missing scopes
+        self.assertEqual(self.memory.get_suggestions("xx", {"$WorkdayWaiver": []}),
+                         {"$WorkdayWaiver": {"no": "Não", "total": "Totais"}})
+
+    def test_apply_suggestions(self):
+        baseline = {"$A": {"x": "X", "y": "Y", "z": "Z"}, "$B": {"k": "K"}, "$C": {"m": "M"}}
+        language = {"$C": {"m": "Em"}, "$A": {"z": "Zed", "extra": "E", "x": "X"}}
+        language = apply_suggestions(language, baseline, {"$A": {"x": "Ex", "y": "Why"}, "$B": {"k": "Ka"}})
+        self.assertEqual(json.dumps(language), json.dumps({
+            "$C": {"m": "Em"},
+            "$A": {"z": "Zed", "extra": "E", "x": "Ex", "y": "Why"},
+            "$B": {"k": "Ka"},
+        }))
+
+
+class TestSuggestions(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.locales_path = self.tmp_dir.name
+        write_locales(self.locales_path, {"en": BASELINE, "xx": LANGUAGE})
+        self.store = LocaleStore(self.locales_path)
+        self.results = get_locale_results(["xx"], self.store)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_suggestions(self):
+        self.assertEqual(get_suggestions(self.results, self.store), {"xx": {
+            "$DayCalendar": {"ok": "Certo", "total": "Totais"},
+            "$WorkdayWaiver": {"no": "Não"},
+        }})
+
+    def test_issue_url(self):
+        suggestions = get_suggestions(self.results, self.store)["xx"]
+        self.assertIn("Suggested+translations", get_new_issue_url("xx", self.results["xx"]["missing_translations"], None, suggestions))
+
+    def test_write_suggestions(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_suggestions(get_suggestions(self.results, self.store), self.store)
+        results = get_locale_results(["xx"], LocaleStore(self.locales_path))
+        self.assertEqual(results["xx"]["missing_translations"], {})
+        self.assertEqual(results["xx"]["missing_keys"], {})
+        with open(os.path.join(self.locales_path, "xx", "translation.json"), encoding="utf8") as f:
+            content = f.read()
+        self.assertTrue(content.endswith("}\n"))
+        self.assertIn('        "no": "Não",\n        "total": "Totais"', content)
+
+    def test_write_translation_file(self):
+        file_path = os.path.join(self.locales_path, "xx", "translation.json")
+        os.chmod(file_path, 0o644)
+        write_translation_file(file_path, {"$Menu": {"ok": "Está bem"}})
+        self.assertEqual(os.stat(file_path).st_mode & 0o777, 0o644)
+        with open(file_path, encoding="utf8") as f:
+            self.assertEqual(f.read(), '{\n    "$Menu": {\n        "ok": "Está bem"\n    }\n}\n')
+        self.assertEqual(os.listdir(os.path.dirname(file_path)), ["translation.json"])
@@ -0,0 +1,112 @@
+from unittest import TestCase
+from ignore_rules import get_ignore_rules
+from profiler import get_profiler
+from tool_context import ToolContext, get_context
+from ttl_tools import main, run_pipeline
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+CHANGELOG = """## 1.0.1 (in development)
+
+<!--- Begin changes - Do not remove -->
+
+- Fix [#1]: First
+
+<!--- End changes - Do not remove -->
+
+Who built 1.0.1:
+
+<!--- Begin users - Do not remove -->
+
+- alice
+
+<!--- End users - Do not remove -->
+
+## 1.0.0
+
+- Enhancement [#0]: Initial
+
+Who built 1.0.0:
+
+- alice
+"""
+
+
+class TestToolContext(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.changelog_file = os.path.join(self.tmp_dir.name, "changelog.md")
+        with open(self.changelog_file, "w") as f:
+            f.write(CHANGELOG)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_disabled(self):
+        context = ToolContext()
+        self.assertIsNot(context.get_locale_store(), context.get_locale_store())
+        self.assertIsNot(context.get_changelog_index(self.changelog_file), context.get_changelog_index(self.changelog_file))
+
+    def test_shared_models(self):
+        context = ToolContext(enabled=True)
+        self.assertIs(context.get_locale_store(), context.get_locale_store())
+        index = context.get_changelog_index(self.changelog_file)
+        self.assertIs(context.get_changelog_index(self.changelog_file), index)
+        # Built again once the changelog changed
+        with open(self.changelog_file, "a") as f:
+            f.write("\n## 0.9.0\n")
+        self.assertEqual(context.get_changelog_index(self.changelog_file).versions, ["1.0.1", "1.0.0", "0.9.0"])
+
+
+class TestPipeline(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = lambda name: os.path.join(self.tmp_dir.name, name)
+        with open(self.path("changelog.md"), "w") as f:
+            f.write(CHANGELOG)
+        with open(self.path("changes.jsonl"), "w") as f:
+            f.write(json.dumps({"Message": "Fix: Second", "Pull request number": 2, "User": "bob"}) + "\n")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_pipeline(self):
+        changelog = self.path("changelog.md")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run_pipeline([
+                f"changelog-analytics -changelog-file {changelog} -format csv -table types",
+                f"update-changelog -changelog-file {changelog} -changes-jsonl {self.path('changes.jsonl')}",
+                f"update-release -changelog-file {changelog} -all-versions -output-file {self.path('release_{V}.md')}",
+                f"changelog-analytics -changelog-file {changelog} -format csv -table types",
+            ])
+        # The steps after update-changelog see its changes
+        self.assertEqual(output.getvalue(), "Version,Enhancement,Fix,Translation,Total\n1.0.1,0,1,0,1\n1.0.0,1,0,0,1\n"
+                                            "Version,Enhancement,Fix,Translation,Total\n1.0.1,0,2,0,2\n1.0.0,1,0,0,1\n")
+        with open(self.path("release_1.0.1.md")) as f:
+            self.assertIn("- Fix [#2]: Second", f.read())
+        self.assertTrue(os.path.isfile(self.path("release_1.0.0.md")))
+        self.assertFalse(get_context().enabled)
+
+    def test_step_state_reset(self):
+        report = {"config": {}, "errors_missing_keys": {}, "errors_extra_keys": {}, "missing_translations": {"xx": {}}}
+        with open(self.path("report.json"), "w") as f:
+            json.dump(report, f)
+        ignore_rules = get_ignore_rules()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as error:
+            run_pipeline([f"compare-reports -baseline {self.path('report.json')} -target {self.path('report.json')} -profile"])
+        self.assertIn("diff_reports", error.getvalue())
+        # Neither the -profile option nor the hits of the ignore rules leak into the next step
+        self.assertFalse(get_profiler().enabled)
+        self.assertEqual(get_profiler().stats, {})
+        self.assertIsNot(get_ignore_rules(), ignore_rules)
+
+    def test_failing_step(self):
+        with contextlib.redirect_stderr(io.StringIO()) as error, self.assertRaises(SystemExit):
+            main(["pipeline", f"changelog-analytics -changelog-file {self.path('changelog.md')} -format xml"])
+        self.assertIn("Step 1 (changelog-analytics) failed", error.getvalue())
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(["unknown-command"])
@@ -0,0 +1,130 @@
+from unittest import TestCase
+from unittest.mock import patch
+import importlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+update_changelog = importlib.import_module("update-changelog")
+
+CHANGELOG = """## 3.0.1 (in development)
+
+<!--- Begin changes - Do not remove -->
+
+- Enhancement [#10]: Second
+- Fix [#5]: First
+
+<!--- End changes - Do not remove -->
+
+Who built 3.0.1:
+
+<!--- Begin users - Do not remove -->
+
+- alice
+- bob
+
+<!--- End users - Do not remove -->
+
+## 3.0.0
+"""
+
+
+class TestBatchUpdate(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.changelog_file = os.path.join(self.tmp_dir.name, "changelog.md")
+        with open(self.changelog_file, "w") as f:
+            f.write(CHANGELOG)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_changelog(self) -> str:
+        with open(self.changelog_file) as f:
+            return f.read()
+
+    def test_same_as_single_updates(self):
+        changes = [("Fix [#7]: Third", "carol"), ("Enhancement [#10]: Second", "alice"), (None, "dave")]
+        for message, user in changes:
+            update_changelog.update_changelog(self.changelog_file, message, user)
+        expected = self.read_changelog()
+        with open(self.changelog_file, "w") as f:
+            f.write(CHANGELOG)
+        os.chmod(self.changelog_file, 0o644)
+        update_changelog.update_changelog_batch(self.changelog_file, *zip(*changes))
+        self.assertEqual(self.read_changelog(), expected)
+        self.assertIn("- Fix [#5]: First\n- Fix [#7]: Third\n\n<!--- End changes", expected)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["changelog.md", "changelog.md.lock"])
+        self.assertEqual(os.stat(self.changelog_file).st_mode & 0o777, 0o644)
+
+    def test_merged_unique_entries(self):
+        for _ in range(100):
+            entries = random.choices(["", "a", "b", "c", "d"], k=4)
+            new_entries = random.choices(["a", "c", "e"], k=3)
+            self.assertEqual(update_changelog.get_merged_unique_entries(entries, new_entries),
+                             update_changelog.get_sorted_unique_entries(entries + new_entries))
+
+    def test_merge_of_changelog_section(self):
+        # The entries between the markers, blank lines included, are already sorted
+        entries = ["", "Enhancement [#10]: Second", "Fix [#5]: First", ""]
+        with patch.object(update_changelog.heapq, "merge", wraps=update_changelog.heapq.merge) as merge:
+            merged = update_changelog.get_merged_unique_entries(entries, ["Fix [#7]: Third"])
+        merge.assert_called_once()
+        self.assertEqual(merged, ["", "- Enhancement [#10]: Second", "- Fix [#5]: First", "- Fix [#7]: Third"])
+        self.assertEqual(merged, update_changelog.get_sorted_unique_entries(entries + ["Fix [#7]: Third"]))
+
+    def test_jsonl(self):
+        stream = io.StringIO('{"Message": "Fix: Crash", "Pull request number": 12, "User": "carol"}\n\n'
+                             '{"Message": "Translation: Polish", "User": "dave"}\n')
+        messages, users = update_changelog.get_changes_and_users_from_jsonl(stream)
+        self.assertEqual(messages, ["Fix [#12]: Crash", "Translation: Polish"])
+        self.assertEqual(users, ["carol", "dave"])
+
+
+class TestConcurrentUpdates(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.changelog_file = os.path.join(self.tmp_dir.name, "changelog.md")
+        self.journal_file = os.path.join(self.tmp_dir.name, "journal.jsonl")
+        with open(self.changelog_file, "w") as f:
+            f.write(CHANGELOG)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_updates(self, count: int, *args):
+        # Starts the updates all at once, each adding its own change and user
+        processes = [subprocess.Popen([sys.executable, update_changelog.__file__, "-changelog-file", self.changelog_file,
+                                       "-changes-jsonl", "-", *args], stdin=subprocess.PIPE)
+                     for _ in range(count)]
+        for i, process in enumerate(processes):
+            process.communicate(json.dumps({"Message": f"Fix: Change {i}", "Pull request number": i, "User": f"user{i}"}).encode())
+            self.assertEqual(process.returncode, 0)
+
+    def test_no_lost_entries(self):
+        self.run_updates(8)
+        with open(self.changelog_file) as f:
+            changelog = f.read()
+        for i in range(8):
+            self.assertIn(f"- Fix [#{i}]: Change {i}\n", changelog)
+            self.assertIn(f"- user{i}\n", changelog)
+
+    def test_journal(self):
+        self.run_updates(4, "-journal-file", self.journal_file)
+        with open(self.changelog_file) as f:
+            self.assertEqual(f.read(), CHANGELOG)
+        self.assertEqual(update_changelog.compact_journal(self.changelog_file, self.journal_file), 4)
+        self.assertEqual(update_changelog.compact_journal(self.changelog_file, self.journal_file), 0)
+        with open(self.changelog_file) as f:
+            changelog = f.read()
+        self.assertIn("- Fix [#3]: Change 3\n", changelog)
+        self.assertIn("- user0\n", changelog)
+
+    def test_lock_timeout(self):
+        with update_changelog.locked(self.changelog_file):
+            with self.assertRaises(Exception):
+                update_changelog.update_changelog_batch(self.changelog_file, ["Fix: Late"], ["late"], lock_timeout=0.2)
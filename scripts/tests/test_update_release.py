@@ -1,6 +1,7 @@
 from unittest import TestCase
-from update_release import ChangeLogParser
+from update_release import ChangeLogIndex, ChangeLogParser, ReleaseComposer, ReleaseTemplate, get_template
 import os
+import tempfile
 
 expected_changes = [
     "-   Enhancement: [#328] Swap position for overall and month balance on day view",
@@ -63,4 +64,62 @@ def test_parging_providing_fix_version(self):
         parser = ChangeLogParser(self.changelog_file, "1.2.42")
         parser.parse()
 
-        self.assertEqual(parser.version, "1.2.42")
\ No newline at end of file
+        self.assertEqual(parser.version, "1.2.42")
+
+
+class TestChangelogIndex(TestCase):
+    def setUp(self):
+        self.changelog_file = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), "changelog_mock.md"
+        )
+        self.index = ChangeLogIndex(self.changelog_file)
+
+    def test_versions(self):
+        self.assertEqual(self.index.versions[:5], ["1.25.6", "1.5.5", "1.5.4", "1.5.3", "1.5.2"])
+        with open(self.changelog_file, "rb") as f:
+            content = f.read()
+        section = self.index.sections[1]
+        self.assertTrue(content[section.start:section.end].startswith(b"## 1.5.5\n"))
+        self.assertTrue(content[section.end:].startswith(b"## 1.5.4\n"))
+
+    def test_sections(self):
+        # Same as parsing the top-most version
+        self.assertEqual(self.index.get().changes, expected_changes)
+        self.assertEqual(self.index.get().users, expected_users)
+        # Sections without markers
+        section = self.index.get("1.5.5")
+        self.assertEqual(len(section.changes), 3)
+        self.assertEqual(section.users, ["thamara", "tupaschoal", "araujoarthur0"])
+        self.assertEqual(self.index.get("1.5.3").changes, [])
+        self.assertIsNone(self.index.get("1.2.42"))
+
+    def test_version_in_entry(self):
+        # Lines that are not headings never start a section
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            changelog_file = os.path.join(tmp_dir, "changelog.md")
+            with open(changelog_file, "w") as f:
+                f.write("## 2.0.0\n\n- Fix: Crash when upgrading from\n1.9.9 fixed\n\nWho built 2.0.0:\n\n- alice\n\n## 1.9.9\n\n- Fix: First\n")
+            index = ChangeLogIndex(changelog_file)
+            self.assertEqual(index.versions, ["2.0.0", "1.9.9"])
+            self.assertEqual(index.get("2.0.0").changes, ["- Fix: Crash when upgrading from", "1.9.9 fixed"])
+
+    def test_range(self):
+        sections = self.index.get_range("1.5.3", "1.5.5")
+        self.assertEqual([section.version for section in sections], ["1.5.5", "1.5.4", "1.5.3"])
+        self.assertEqual(sections[1].changes, ["Fix: [#276] Fixed launch of app in debian"])
+        self.assertEqual(len(self.index.get_range(max_version="1.5.5")), len(self.index.sections) - 1)
+
+
+class TestReleaseComposer(TestCase):
+    def test_template(self):
+        template = ReleaseTemplate("# v{APP_VERSION}\n{UPDATES}\n{OTHER} {APP_VERSION}")
+        self.assertEqual(template.render({"APP_VERSION": "1.0.0", "UPDATES": "{APP_VERSION}"}),
+                         "# v1.0.0\n{APP_VERSION}\n{OTHER} 1.0.0")
+        self.assertEqual(ReleaseTemplate("no placeholders").render({}), "no placeholders")
+
+    def test_render(self):
+        first = ReleaseComposer().with_version("1.0.0").with_changes(["- Fix: A"]).with_users(["- a"])
+        second = ReleaseComposer().with_version("2.0.0")
+        self.assertIn("# Who built TTL v1.0.0\nThis version was developed with <3 by:\n\n- a", first.render())
+        self.assertIn("## Full changelog\n\n", second.render())
+        self.assertIs(get_template(first._template), get_template(second._template))
@@ -0,0 +1,113 @@
+from unittest import TestCase
+from check_languages import LocaleStore, check_locale
+from incremental import BaselineDelta, update_locale_results
+from watch_locales import LocaleWatcher
+from tests.test_check_languages import write_locales
+import json
+import os
+import tempfile
+
+BASELINE = {
+    "$Menu": {"ok": "OK", "help": "Help", "menu": "Menu"},
+    "$About": {"title": "About", "version": "Version"},
+}
+LANGUAGE = {
+    "$Menu": {"ok": "OK", "help": "Ajuda ", "extra": "Extra"},
+    "$Old": {"key": "Value"},
+}
+
+
+def no_keys_to_ignore(scope):
+    return []
+
+
+class TestBaselineDelta(TestCase):
+    def test_changed_keys(self):
+        baseline = {"$Menu": {"ok": "Ok", "help": "Help", "new": "New"}, "$Other": {"x": "X"}}
+        delta = BaselineDelta(BASELINE, baseline)
+        self.assertEqual(delta.changed_keys, {"$Menu": ["ok", "new", "menu"]})
+        self.assertEqual(delta.added_scopes, ["$Other"])
+        self.assertEqual(delta.removed_scopes, ["$About"])
+        self.assertFalse(BaselineDelta(BASELINE, BASELINE))
+
+    def assertSameResults(self, results, expected):
+        self.assertEqual(results, expected)
+        # Same order as a full check as well, so the reports do not change
+        for section in expected:
+            if section == "counts":
+                continue
+            self.assertEqual(list(results[section]), list(expected[section]))
+            for scope in expected[section]:
+                self.assertEqual(list(results[section][scope]), list(expected[section][scope]))
+
+    def test_update_matches_full_check(self):
+        baselines = [
+            {"$Menu": {"ok": "Okay", "help": "Help", "menu": "Menu"}, "$About": BASELINE["$About"]},
+            {"$Menu": {"extra": "Extra", "ok": "OK", "help": "Ajuda"}, "$About": BASELINE["$About"]},
+            {"$Old": {"key": "Value"}, "$Menu": {"ok": "OK"}},
+            {"$About": BASELINE["$About"], "$New": {"a": "A"}},
+            {"$Menu": {"ok": "OK", "help": "Help ", "menu": "Menu"}, "$About": BASELINE["$About"]},
+            # The key missing in the language renamed
+            {"$Menu": {"ok": "OK", "help": "Help", "close": "Close"}, "$About": BASELINE["$About"]},
+        ]
+        for baseline in baselines:
+            results = check_locale("xx", BASELINE, LANGUAGE)
+            update_locale_results(results, BaselineDelta(BASELINE, baseline), baseline, LANGUAGE, no_keys_to_ignore)
+            self.assertSameResults(results, check_locale("xx", baseline, LANGUAGE))
+
+
+class TestLocaleWatcher(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.locales_path = self.tmp_dir.name
+        write_locales(self.locales_path, {"en": BASELINE, "xx": LANGUAGE, "yy": BASELINE})
+        self.watcher = LocaleWatcher(["xx", "yy"], LocaleStore(self.locales_path))
+        self.watcher.start()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, locale, language, mtime):
+        file_path = os.path.join(self.locales_path, locale, "translation.json")
+        with open(file_path, "w", encoding="utf8") as f:
+            json.dump(language, f)
+        # Modification times can be too coarse to tell two writes apart
+        os.utime(file_path, (mtime, mtime))
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_only_changed_locale_is_checked(self):
+        self.write("yy", {"$Menu": {"ok": "Ok"}}, 1)
+        changed = self.watcher.poll()
+        self.assertEqual(changed, ["yy"])
+        self.assertEqual(self.watcher.update(changed), ["yy"])
+        self.assertEqual(self.watcher.results["yy"]["missing_keys"], {"$Menu": ["help", "menu"], "$About": []})
+        self.assertEqual(self.watcher.results["xx"], check_locale("xx", BASELINE, LANGUAGE))
+
+    def test_baseline_change(self):
+        baseline = {"$Menu": {"ok": "OK", "help": "Help", "menu": "Menu", "new": "New"}, "$About": BASELINE["$About"]}
+        self.write("en", baseline, 1)
+        self.assertEqual(self.watcher.update(self.watcher.poll()), ["xx", "yy"])
+        self.assertEqual(self.watcher.results["xx"], check_locale("xx", baseline, LANGUAGE))
+        self.assertEqual(self.watcher.results["yy"]["missing_keys"], {"$Menu": ["new"]})
+
+    def test_baseline_change_with_same_counts(self):
+        # xx misses another key of $Menu, as many keys as before
+        baseline = {"$Menu": {"ok": "OK", "help": "Help", "close": "Close"}, "$About": BASELINE["$About"]}
+        self.write("en", baseline, 1)
+        self.assertEqual(self.watcher.update(self.watcher.poll()), ["xx", "yy"])
+        self.assertEqual(self.watcher.results["xx"]["missing_keys"], {"$Menu": ["close"], "$About": []})
+
+    def test_invalid_file_keeps_results(self):
+        file_path = os.path.join(self.locales_path, "xx", "translation.json")
+        with open(file_path, "w", encoding="utf8") as f:
+            f.write('{"$Menu": ')
+        os.utime(file_path, (1, 1))
+        results = self.watcher.results["xx"]
+        self.assertEqual(self.watcher.update(self.watcher.poll()), [])
+        self.assertIs(self.watcher.results["xx"], results)
+
+    def test_status(self):
+        status = self.watcher.get_status("xx")
+        self.assertTrue(status.startswith("xx: 60.0% translated, 2 missing translations, 3 missing keys, 2 extra keys"))
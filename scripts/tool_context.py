@@ -0,0 +1,51 @@
+import os
+from changelog_index import ChangeLogIndex
+from locale_checks import LOCALES_PATH, LocaleStore
+
+# Parsed models shared by the tools run in the same process, like the steps of a
+# ttl_tools.py pipeline. Sharing is disabled by default, in which case every tool
+# gets models of its own, as when run as a script.
+#
+# The locale stores are kept up to date by the tools writing translation files. The
+# changelog indexes are built again when the changelog file changed on disk.
+
+class ToolContext:
+    def __init__(self, enabled : bool = False):
+        self.enabled = enabled
+        # locales path -> LocaleStore
+        self._locale_stores = {}
+        # changelog path -> (file stat, ChangeLogIndex)
+        self._changelog_indexes = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self._locale_stores.clear()
+        self._changelog_indexes.clear()
+
+    def get_locale_store(self, locales_path : str = None) -> LocaleStore:
+        locales_path = locales_path or LOCALES_PATH
+        if not self.enabled:
+            return LocaleStore(locales_path)
+        if locales_path not in self._locale_stores:
+            self._locale_stores[locales_path] = LocaleStore(locales_path)
+        return self._locale_stores[locales_path]
+
+    def get_changelog_index(self, changelog_file : str) -> ChangeLogIndex:
+        if not self.enabled:
+            return ChangeLogIndex(changelog_file)
+        path = os.path.realpath(changelog_file)
+        stat = os.stat(path)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+        cached = self._changelog_indexes.get(path)
+        if cached is None or cached[0] != file_stat:
+            cached = (file_stat, ChangeLogIndex(path))
+            self._changelog_indexes[path] = cached
+        return cached[1]
+
+_context = ToolContext()
+
+def get_context() -> ToolContext:
+    return _context
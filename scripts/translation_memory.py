@@ -0,0 +1,73 @@
+import json
+from atomic_write import write_file_atomically
+from collections import Counter
+
+# Translation memory of the locales: for each locale, the translation already used for
+# a baseline (English) text. Missing strings whose English text is translated elsewhere
+# in the same locale, like 'OK' or 'Total' repeated across scopes, get that translation
+# suggested, each lookup being a single dict access.
+# When the same text has different translations in a locale, the most used one is kept.
+
+# Texts differing only in case or whitespace are the same text
+def normalize(value : str) -> str:
+    return ' '.join(value.split()).casefold()
+
+class TranslationMemory:
+    def __init__(self, baseline_language : dict):
+        self.baseline_language = baseline_language
+        # locale -> {normalized baseline text: translation}
+        self._memory = {}
+
+    # Adds the translations of the locale to the memory, built once per locale
+    def add_locale(self, locale : str, language : dict):
+        if locale in self._memory:
+            return
+        counts = {}
+        for scope, entries in self.baseline_language.items():
+            scope_values = language.get(scope, {})
+            for key, value in entries.items():
+                translation = scope_values.get(key)
+                if isinstance(translation, str) and translation != value:
+                    counts.setdefault(normalize(value), Counter())[translation] += 1
+        self._memory[locale] = {text: translations.most_common(1)[0][0] for text, translations in counts.items()}
+
+    def suggest(self, locale : str, baseline_value : str) -> str:
+        return self._memory[locale].get(normalize(baseline_value))
+
+    # Returns the suggested translations of the keys, a dict of scope -> keys (all the keys
+    # of the scope if empty, as in the missing keys), as a dict of scope -> {key: translation}
+    def get_suggestions(self, locale : str, keys : dict) -> dict:
+        suggestions = {}
+        for scope, scope_keys in keys.items():
+            baseline_scope = self.baseline_language.get(scope, {})
+            scope_suggestions = {}
+            for key in scope_keys or baseline_scope:
+                if key in baseline_scope:
+                    translation = self.suggest(locale, baseline_scope[key])
+                    if translation is not None:
+                        scope_suggestions[key] = translation
+            if scope_suggestions:
+                suggestions[scope] = scope_suggestions
+        return suggestions
+
+# Returns the entries with the new ones added, each placed after the closest entry
+# preceding it in the baseline order (first if there is none)
+def _insert_in_baseline_order(entries : dict, baseline_order : list, new_entries : dict) -> dict:
+    keys = list(entries)
+    for position, key in enumerate(baseline_order):
+        if key not in new_entries or key in entries:
+            continue
+        previous = next((x for x in reversed(baseline_order[:position]) if x in keys), None)
+        keys.insert(keys.index(previous) + 1 if previous is not None else 0, key)
+    return {key: new_entries[key] if key in new_entries else entries[key] for key in keys}
+
+# Returns the language with the suggested translations, the existing keys keeping their place
+def apply_suggestions(language : dict, baseline_language : dict, suggestions : dict) -> dict:
+    new_scopes = {}
+    for scope, scope_suggestions in suggestions.items():
+        new_scopes[scope] = _insert_in_baseline_order(language.get(scope, {}), list(baseline_language.get(scope, {})), scope_suggestions)
+    return _insert_in_baseline_order(language, list(baseline_language), new_scopes)
+
+# Writes the translation file, formatted as the files in the repo, never leaving a broken file
+def write_translation_file(file_path : str, language : dict):
+    write_file_atomically(file_path, json.dumps(language, indent=4, ensure_ascii=False) + '\n', 'utf8')
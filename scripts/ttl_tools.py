@@ -0,0 +1,79 @@
+import argparse
+import importlib
+import shlex
+import sys
+from ignore_rules import reset_ignore_rules
+from profiler import get_profiler
+from tool_context import get_context
+
+# Single entry point for the scripts, as subcommands. The module of a subcommand is only
+# imported when it runs, so each command pays for its own imports only.
+#
+# The pipeline subcommand runs several commands in the same process, sharing the parsed
+# translation files and changelogs between them:
+#   python scripts/ttl_tools.py pipeline "check-languages -report_summary -output missing.md" "scan-keys -no_cache"
+
+# subcommand -> (module, description)
+COMMANDS = {
+    'check-languages': ('check_languages', "Checks the translations of the locales against the baseline language"),
+    'compare-reports': ('compare_language_reports', "Compares two raw localization reports"),
+    'scan-keys': ('scan_key_usage', "Reports the translation keys undefined in, or unused from, the baseline language"),
+    'metrics': ('localization_metrics', "Records and queries the localization metrics of the commits"),
+    'update-changelog': ('update-changelog', "Adds changes and users to the changelog"),
+    'update-release': ('update_release', "Produces release files from the changelog"),
+    'changelog-analytics': ('changelog_analytics', "Reports the change types and contributors of each version"),
+}
+
+def run_command(command : str, argv : list):
+    if command not in COMMANDS:
+        raise Exception(f"Unknown command {command}, expected one of {', '.join(COMMANDS)}")
+    module = importlib.import_module(COMMANDS[command][0])
+    module.main(argv)
+
+# Resets the state a step leaves in the globals of the process, its -profile option and
+# the hits of the ignore rules, so it does not leak into the next step
+def reset_step_state():
+    get_profiler().reset()
+    reset_ignore_rules()
+
+# Runs the steps, each a command line of a subcommand, stopping at the first failing one
+def run_pipeline(steps : list):
+    context = get_context()
+    context.enable()
+    try:
+        for number, step in enumerate(steps, 1):
+            command, *argv = shlex.split(step)
+            if command == 'pipeline':
+                raise Exception("A pipeline cannot run another pipeline")
+            try:
+                run_command(command, argv)
+            except SystemExit as e:
+                if e.code:
+                    print(f"Step {number} ({command}) failed", file=sys.stderr)
+                    raise
+            finally:
+                reset_step_state()
+    finally:
+        context.disable()
+
+def get_arguments(argv : list = None):
+    parser = argparse.ArgumentParser(prog='ttl-tools', description="Runs the Time to Leave scripts.")
+    subparsers = parser.add_subparsers(dest='command', metavar='command', required=True)
+    for command, (_, description) in COMMANDS.items():
+        # The arguments are parsed by the command itself
+        subparsers.add_parser(command, help=description, add_help=False)
+    pipeline = subparsers.add_parser('pipeline', help="Runs several commands in one process, sharing the parsed files")
+    pipeline.add_argument('steps', nargs='+', help="Command lines of the steps, such as \"check-languages -report_summary\"")
+    return parser.parse_known_args(argv)
+
+def main(argv : list = None):
+    args, command_argv = get_arguments(argv)
+    if args.command == 'pipeline':
+        if command_argv:
+            raise Exception(f"Unexpected arguments {' '.join(command_argv)}")
+        run_pipeline(args.steps)
+    else:
+        run_command(args.command, command_argv)
+
+if __name__ == "__main__":
+    main()
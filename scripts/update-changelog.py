@@ -1,16 +1,39 @@
 import argparse
+import heapq
+import json
+import random
 import sys
 import re
-from pathlib import Path
+import time
+from atomic_write import write_file_atomically
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
 
 # Parses a comment that must follow the strict rule of being:
 # <trigger expression>
 # Message: <some one line message here>
 # User: <some user name here>
 # And updates the the changelog file to include the new information
+#
+# Many changes can be applied at once, from several changes files or from a JSONL stream
+# of {"Message": ..., "User": ..., "Pull request number": ...} records. The changelog is
+# then read, merged and written a single time, whatever the number of changes.
+#
+# Concurrent runs are serialized by an advisory lock on a '<changelog>.lock' file, taken
+# with retries and an increasing backoff. With a journal file, runs only append their
+# changes to the journal, and a single run compacts the journal into the changelog.
 
 # Global settings
 g_prefix_line = '- '
+g_lock_timeout = 60
+g_lock_initial_delay = 0.05
+g_lock_max_delay = 2
 g_begin_changes = '<!--- Begin changes - Do not remove -->'
 g_end_changes = '<!--- End changes - Do not remove -->'
 g_begin_users = '<!--- Begin users - Do not remove -->'
@@ -26,27 +49,45 @@ def get_sorted_unique_entries(entries) -> list:
     entries.sort()
     return [('{}{}'.format(g_prefix_line, entry) if entry else '') for entry in entries]
 
-def get_updated_file_content(current_changelog_lines: str, new_change: any, new_user: any) -> list:
-    """Returns the list of content for the updated changelog"""
+def get_merged_unique_entries(entries: list, new_entries: list) -> list:
+    """Same as get_sorted_unique_entries(entries + new_entries), merging the new entries
+    into the entries of the changelog, already sorted unless edited by hand"""
+    # The blank lines around the entries would break the sort check, a single one is
+    # put back before the entries, where sorting them all would place it
+    has_blank_entries = '' in entries or '' in new_entries
+    entries = [entry for entry in entries if entry]
+    new_entries = sorted(set(entry for entry in new_entries if entry))
+    if all(entries[i] <= entries[i + 1] for i in range(len(entries) - 1)):
+        merged = heapq.merge(entries, new_entries)
+    else:
+        merged = sorted(entries + new_entries)
+    unique_entries = [''] if has_blank_entries else []
+    for entry in merged:
+        if not unique_entries or unique_entries[-1] != entry:
+            unique_entries.append(entry)
+    return [('{}{}'.format(g_prefix_line, entry) if entry else '') for entry in unique_entries]
+
+def get_updated_file_content(current_changelog_lines: str, new_changes: list, new_users: list) -> list:
+    """Returns the list of content for the updated changelog, given the lists of new changes and users"""
     new_file_content = []
     is_sourcing_changes = False
     is_sourcing_users = False
-    changes = [new_change] if new_change else []
-    users = [new_user] if new_user else []
+    changes = []
+    users = []
     processed_info = False
 
     for line in current_changelog_lines:
         line = line.strip()
         if line == g_end_changes:
             is_sourcing_changes = False
-            new_file_content.extend(get_sorted_unique_entries(changes))
+            new_file_content.extend(get_merged_unique_entries(changes, [change for change in new_changes if change]))
             # adds an extra item to avoid issues with the linter, but only if there is at least one entry
             if new_file_content[-1] != '':
                 new_file_content.append('')
 
         if line == g_end_users:
             is_sourcing_users = False
-            new_file_content.extend(get_sorted_unique_entries(users))
+            new_file_content.extend(get_merged_unique_entries(users, [user for user in new_users if user]))
             # adds an extra item to avoid issues with the linter
             new_file_content.append('')
             # stop processing changelog, but needs to read the remaining of the code anyway
@@ -72,20 +113,104 @@ def get_updated_file_content(current_changelog_lines: str, new_change: any, new_
 
     return new_file_content
 
+def write_file(filename: str, content: str):
+    """Writes the file through a temporary file renamed over it, so it is never left half written"""
+    write_file_atomically(filename, content)
+
+def try_lock(file_handler) -> bool:
+    """Takes an exclusive lock on the open file, returning False if another process holds it"""
+    try:
+        if fcntl:
+            fcntl.flock(file_handler.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file_handler.seek(0)
+            msvcrt.locking(file_handler.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def unlock(file_handler):
+    if fcntl:
+        fcntl.flock(file_handler.fileno(), fcntl.LOCK_UN)
+    else:
+        file_handler.seek(0)
+        msvcrt.locking(file_handler.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def locked(filename: str, timeout: float = g_lock_timeout):
+    """Holds the lock of the file, retrying with an exponential backoff (and some jitter,
+    so that waiting runs do not retry all at once) until the timeout"""
+    # The file itself cannot be locked, as it is replaced on each write
+    with open(filename + '.lock', 'a') as lock_handler:
+        deadline = time.monotonic() + timeout
+        delay = g_lock_initial_delay
+        while not try_lock(lock_handler):
+            if time.monotonic() >= deadline:
+                raise Exception(f"Could not lock {filename} in {timeout} seconds")
+            time.sleep(min(delay, g_lock_max_delay) * random.uniform(0.5, 1.5))
+            delay *= 2
+        try:
+            yield
+        finally:
+            unlock(lock_handler)
+
+def update_changelog_batch(changelog_filename: str, new_changes: list, new_users: list, lock_timeout: float = g_lock_timeout):
+    """Updates the changelog file to include all the new changes and users at once"""
+    with locked(changelog_filename, lock_timeout):
+        with open(changelog_filename) as file_handler:
+            new_file_content = get_updated_file_content(file_handler.readlines(), new_changes, new_users)
+
+        write_file(changelog_filename, '\n'.join(new_file_content))
+
+def append_to_journal(journal_filename: str, new_changes: list, new_users: list, lock_timeout: float = g_lock_timeout):
+    """Appends the new changes and users to the journal of pending entries"""
+    records = ''.join(json.dumps({"Message": change, "User": user}) + '\n' for change, user in zip(new_changes, new_users))
+    # Only held while appending, so that compact_journal never misses an entry
+    with locked(journal_filename, lock_timeout):
+        with open(journal_filename, 'a') as file_handler:
+            file_handler.write(records)
+
+def compact_journal(changelog_filename: str, journal_filename: str, new_changes: list = None, new_users: list = None,
+                    lock_timeout: float = g_lock_timeout) -> int:
+    """Applies the entries of the journal (and the new changes and users) to the changelog and empties
+    the journal, returning the number of entries applied. Applying an entry again leaves the changelog
+    unchanged, so a compaction interrupted before emptying the journal is simply done again."""
+    with locked(journal_filename, lock_timeout):
+        try:
+            with open(journal_filename) as file_handler:
+                [journal_changes, journal_users] = get_changes_and_users_from_jsonl(file_handler)
+        except FileNotFoundError:
+            [journal_changes, journal_users] = [[], []]
+        changes = journal_changes + (new_changes or [])
+        users = journal_users + (new_users or [])
+        if any(changes) or any(users):
+            update_changelog_batch(changelog_filename, changes, users, lock_timeout)
+        if journal_changes:
+            write_file(journal_filename, '')
+    return len(journal_changes)
+
 def update_changelog(changelog_filename: str, new_change: any, new_user: any):
     """Updates the changelog file to include the new changes"""
-    new_file_content = []
-    with open(changelog_filename) as file_handler:
-        lines = file_handler.readlines()
-        new_file_content = get_updated_file_content(lines, new_change, new_user)
+    update_changelog_batch(changelog_filename, [new_change], [new_user])
 
-    Path(changelog_filename).write_text('\n'.join(new_file_content))
-
-def get_arguments():
+def get_arguments(argv: list = None):
     parser = argparse.ArgumentParser()
     parser.add_argument("-changelog-file", help="Changelog file")
-    parser.add_argument("-changes-file", help="Changes file, containing 'Message' and 'User'")
-    return parser.parse_args()
+    parser.add_argument("-changes-file", nargs='+', default=[], help="Changes files, each containing 'Message' and 'User'")
+    parser.add_argument("-changes-jsonl", help="JSONL file with one 'Message'/'User'/'Pull request number' record per line ('-' for stdin)")
+    parser.add_argument("-journal-file", help="Journal of pending entries the changes are appended to, instead of the changelog")
+    parser.add_argument("-compact-journal", action='store_true', help="Applies the entries of -journal-file to the changelog and empties it")
+    parser.add_argument("-lock-timeout", type=float, default=g_lock_timeout, help="Seconds to wait for other updates to finish")
+    return parser.parse_args(argv)
+
+def get_message(message: str, number: str) -> str:
+    """Adds the pull request number reference after the change type of the message"""
+    if message:
+        message_parts = message.split(": ")
+        if number:
+            message_parts[0] = f"{message_parts[0]} [#{number}]"
+        message = ": ".join(message_parts)
+    return message
 
 def get_change_and_user(changes_file: str) -> list:
     """Parses changes file retrieving Message and User"""
@@ -99,22 +224,52 @@ def get_change_and_user(changes_file: str) -> list:
                 message = match.group(1)
             match = re.match("Pull request number: (.*)", line.strip())
             if match:
-                number =  f"[#{match.group(1)}]"
+                number = match.group(1)
             match = re.match("User: (.*)", line.strip())
             if match:
                 user = match.group(1)
-    if message:
-        message_parts = message.split(": ")
-        if number:
-            message_parts[0] = f"{message_parts[0]} {number}"
-        message = ": ".join(message_parts)
-    return [message, user]
+    return [get_message(message, number), user]
+
+def get_changes_and_users_from_jsonl(file_handler) -> list:
+    """Parses a JSONL stream of changes retrieving the lists of Messages and Users"""
+    messages = []
+    users = []
+    for line in file_handler:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        number = record.get("Pull request number")
+        messages.append(get_message(record.get("Message"), None if number is None else str(number)))
+        users.append(record.get("User"))
+    return [messages, users]
 
-def main():
-    args = get_arguments()
-    [message, user] = get_change_and_user(args.changes_file)
-    if message or user:
-        update_changelog(args.changelog_file, message, user)
+def main(argv: list = None):
+    args = get_arguments(argv)
+    messages = []
+    users = []
+    for changes_file in args.changes_file:
+        [message, user] = get_change_and_user(changes_file)
+        messages.append(message)
+        users.append(user)
+    if args.changes_jsonl == '-':
+        [messages_jsonl, users_jsonl] = get_changes_and_users_from_jsonl(sys.stdin)
+    elif args.changes_jsonl:
+        with open(args.changes_jsonl) as file_handler:
+            [messages_jsonl, users_jsonl] = get_changes_and_users_from_jsonl(file_handler)
+    else:
+        [messages_jsonl, users_jsonl] = [[], []]
+    messages.extend(messages_jsonl)
+    users.extend(users_jsonl)
+    if args.compact_journal:
+        if not args.journal_file:
+            raise Exception("-compact-journal requires -journal-file")
+        compact_journal(args.changelog_file, args.journal_file, messages, users, args.lock_timeout)
+    elif not any(messages) and not any(users):
+        return
+    elif args.journal_file:
+        append_to_journal(args.journal_file, messages, users, args.lock_timeout)
+    else:
+        update_changelog_batch(args.changelog_file, messages, users, args.lock_timeout)
 
 if __name__ == "__main__":
     main()
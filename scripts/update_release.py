@@ -1,6 +1,9 @@
 import argparse
+import functools
 import re
 import os
+from changelog_index import ChangeLogIndex
+from tool_context import get_context
 
 RESOURCES_DIR = "resources"
 OUTPUT_DIR = "."
@@ -8,11 +11,33 @@
 DEFAULT_RELEASE_TEMPLATE = "release_template.md"
 
 
-class ReleaseComposer:
-    _version = ""
-    _changes = []
-    _users = []
+PLACEHOLDER_REGEX = re.compile(r"\{([A-Z_]+)\}")
+
+
+class ReleaseTemplate:
+    """A template parsed once into its literal and placeholder segments, so that
+    rendering it is a single join. Unknown placeholders are kept as they are."""
+
+    def __init__(self, text: str):
+        # The split alternates literals and placeholder names, starting with a literal
+        segments = PLACEHOLDER_REGEX.split(text)
+        self._literals = segments[0::2]
+        self._placeholders = segments[1::2]
+
+    def render(self, values: dict) -> str:
+        segments = [None] * (len(self._literals) + len(self._placeholders))
+        segments[0::2] = self._literals
+        segments[1::2] = [values.get(name, "{" + name + "}") for name in self._placeholders]
+        return "".join(segments)
+
 
+@functools.lru_cache(maxsize=None)
+def get_template(template_path: str) -> ReleaseTemplate:
+    with open(template_path, "r", encoding="utf-8") as template:
+        return ReleaseTemplate(template.read())
+
+
+class ReleaseComposer:
     def __init__(
         self,
         output_file_name: str = DEFAULT_OUTPUT_FILE,
@@ -24,6 +49,9 @@ def __init__(
         self._template = os.path.join(script_path, RESOURCES_DIR, template_file)
         assert os.path.isfile(self._template)
         self._release = os.path.join(OUTPUT_DIR, output_file_name)
+        self._version = ""
+        self._changes = ""
+        self._users = ""
 
     def with_version(self, version: str):
         if not version:
@@ -42,25 +70,18 @@ def with_users(self, users: list):
     def _stringfy_list(self, items: list) -> str:
         return "\n".join(items)
 
+    def render(self) -> str:
+        return get_template(self._template).render(
+            {"APP_VERSION": self._version, "UPDATES": self._changes, "PEOPLE": self._users}
+        )
+
     def write(self):
         output_file = self._release.replace(r"{V}", self._version)
         with open(output_file, "w", encoding="utf-8") as output:
-            with open(self._template, "r") as template:
-                for line in template:
-                    output.write(
-                        line.replace(r"{APP_VERSION}", self._version)
-                        .replace(r"{UPDATES}", self._changes)
-                        .replace(r"{PEOPLE}", self._users)
-                    )
+            output.write(self.render())
 
 
 class ChangeLogParser:
-    _g_prefix_line = "-   "
-    _g_begin_changes = "<!--- Begin changes - Do not remove -->"
-    _g_end_changes = "<!--- End changes - Do not remove -->"
-    _g_begin_users = "<!--- Begin users - Do not remove -->"
-    _g_end_users = "<!--- End users - Do not remove -->"
-
     version = ""
     changes = []
     users = []
@@ -69,42 +90,15 @@ def __init__(self, changelog_file: str, version: str = None):
         self._file_path = changelog_file
         self.version = version
 
-    def parse(self):
-        with open(self._file_path, "r") as self._file:
-            self._parse_version()
-            self._parse_changes()
-            self._parse_users()
-
-    def _parse_version(self):
-        version_regex = re.compile(r"#* *(\d+.\d+.\d+)")
-        for line in self._file:
-            if match := version_regex.match(line):
-                if not self.version or (match.group(1) == self.version):
-                    self.version = match.group(1)
-                    return
-
-    def _parse_changes(self):
-        self.changes = self._get_list_between(
-            self._g_begin_changes, self._g_end_changes
-        )
-
-    def _parse_users(self):
-        self.users = self._get_list_between(self._g_begin_users, self._g_end_users)
-
-    def _get_list_between(self, start_str: str, end_str: str):
-        # retrieves a list of lines between a start and an end token
-        in_items = False
-        items = []
-        for line in self._file:
-            if start_str in line:
-                in_items = True
-            elif in_items and end_str in line:
-                in_items = False
-                break
-            elif in_items and "-" in line[0]:
-                items.append(line.strip())
-
-        return items
+    def parse(self, index: ChangeLogIndex = None):
+        section = (index or ChangeLogIndex(self._file_path)).get(self.version)
+        if section is None:
+            self.changes = []
+            self.users = []
+            return
+        self.version = section.version
+        self.changes = section.changes
+        self.users = section.users
 
     def __repr__(self):
         return (
@@ -116,7 +110,7 @@ def __repr__(self):
         )
 
 
-def get_arguments():
+def get_arguments(argv: list = None):
     parser = argparse.ArgumentParser(
         description="Parses a changelog file to produce a release file."
     )
@@ -129,18 +123,44 @@ def get_arguments():
         default=None,
         help="Version of current changelong. (Default is the top-most change version in changelog file)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "-all-versions",
+        action="store_true",
+        help="Produces a release file for every version of the changelog file",
+    )
+    parser.add_argument(
+        "-version-range",
+        help="Produces a release file for every version in the range MIN..MAX (both included, either can be omitted)",
+    )
+    return parser.parse_args(argv)
+
 
+def write_releases(sections: list, output_file: str = None):
+    if len(sections) > 1 and output_file and r"{V}" not in output_file:
+        raise Exception("The output file name needs a {V} to write several versions")
+    for section in sections:
+        ReleaseComposer(output_file_name=output_file)\
+            .with_version(section.version)\
+            .with_changes(section.changes)\
+            .with_users(section.users)\
+            .write()
 
-def main():
-    args = get_arguments()
+
+def main(argv: list = None):
+    args = get_arguments(argv)
 
     if not os.path.isfile(args.changelog_file):
         print("Could not find file {parser.changelog_file}")
         return
 
+    if args.all_versions or args.version_range:
+        min_version, _, max_version = (args.version_range or "..").partition("..")
+        index = get_context().get_changelog_index(args.changelog_file)
+        write_releases(index.get_range(min_version, max_version), args.output_file)
+        return
+
     parser = ChangeLogParser(args.changelog_file, args.version)
-    parser.parse()
+    parser.parse(get_context().get_changelog_index(args.changelog_file))
 
     composer = ReleaseComposer(output_file_name=args.output_file)
     composer\
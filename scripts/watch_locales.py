@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+from incremental import BaselineDelta, update_locale_results
+from key_index import KeyIndex
+from locale_checks import BASELINE_LANGUAGE, LocaleStats, LocaleStore, check_locale, dump_json, get_keys_to_ignore, get_translation_file
+from string_validators import TranslationValidator
+
+# Watches the translation files, checking again only the locales whose file changed.
+# The baseline, its key index and the parsed locales are kept in memory between checks.
+# When the baseline changes, the results of the locales are updated incrementally
+# with the keys that changed, instead of checking every locale again.
+# The files are polled, as there's no portable file notification in the standard
+# library, and changes are only processed once the files stopped changing for
+# debounce seconds, so an editor saving in several writes triggers a single check.
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 0.3
+
+class LocaleWatcher:
+    def __init__(self, locales : list, store : LocaleStore, report_key_mismatch : bool = False, report_missing_translations : bool = False):
+        self.locales = list(locales)
+        self.store = store
+        self.report_key_mismatch = report_key_mismatch
+        self.report_missing_translations = report_missing_translations
+        self.results = {}
+        self.baseline_language = None
+        self.index = None
+        self.validator = None
+        # locale -> (modification time, size) of its translation file
+        self._file_states = {}
+
+    def _get_file_state(self, locale : str) -> tuple:
+        try:
+            stat = os.stat(get_translation_file(locale, self.store.locales_path))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    # Returns the locales (and baseline) whose translation file changed since the last poll
+    def poll(self) -> list:
+        changed = []
+        for locale in [BASELINE_LANGUAGE] + self.locales:
+            state = self._get_file_state(locale)
+            if self._file_states.get(locale) != state:
+                self._file_states[locale] = state
+                changed.append(locale)
+        return changed
+
+    def _keys_to_ignore(self, locale : str):
+        return lambda scope: get_keys_to_ignore(locale, scope)
+
+    # Checks every locale, the first time
+    def start(self):
+        self.poll()
+        self.baseline_language = self.store.get(BASELINE_LANGUAGE)
+        self.index = KeyIndex(self.baseline_language)
+        self.validator = TranslationValidator(self.index)
+        for locale in self.locales:
+            self.results[locale] = check_locale(locale, self.baseline_language, self.store.get(locale), self.index, self.validator)
+        return self.locales
+
+    # Parses the translation files again and updates the results, returning the locales updated
+    def update(self, changed : list) -> list:
+        updated = []
+        if BASELINE_LANGUAGE in changed:
+            updated = self._update_baseline()
+        for locale in changed:
+            if locale == BASELINE_LANGUAGE:
+                continue
+            language = self._reload(locale)
+            if language is None:
+                continue
+            self.results[locale] = check_locale(locale, self.baseline_language, language, self.index, self.validator)
+            if locale not in updated:
+                updated.append(locale)
+        return updated
+
+    def _reload(self, locale : str) -> dict:
+        try:
+            return self.store.reload(locale)
+        except (OSError, ValueError) as e:
+            # Most likely a file saved halfway, it will be checked again on the next change
+            print(f'Skipping {locale}: {e}', file=sys.stderr)
+            return None
+
+    def _update_baseline(self) -> list:
+        baseline_language = self._reload(BASELINE_LANGUAGE)
+        if baseline_language is None:
+            return []
+        delta = BaselineDelta(self.baseline_language, baseline_language)
+        self.baseline_language = baseline_language
+        self.index = KeyIndex(baseline_language)
+        self.validator = TranslationValidator(self.index)
+        if not delta:
+            return []
+        updated = []
+        for locale in self.locales:
+            # The results are updated in place, the keys reported can change with the same counts
+            before = dump_json(self.results[locale])
+            update_locale_results(self.results[locale], delta, baseline_language, self.store.get(locale), self._keys_to_ignore(locale))
+            if dump_json(self.results[locale]) != before:
+                updated.append(locale)
+        return updated
+
+    def get_status(self, locale : str) -> str:
+        result = self.results[locale]
+        counts = result['counts']
+        stats = LocaleStats(locale, result['missing_translations'], len(self.index), missing_strings=counts['missing_translations'])
+        output = f'{locale}: {stats.percentage_translated:.1f}% translated, {stats.missing_strings} missing translations, {counts["missing_keys"]} missing keys, {counts["extra_keys"]} extra keys\n'
+        if self.report_key_mismatch and result['missing_keys']:
+            output += f'Missing keys: {dump_json(result["missing_keys"])}\n'
+        if self.report_key_mismatch and result['extra_keys']:
+            output += f'Extra keys: {dump_json(result["extra_keys"])}\n'
+        if self.report_missing_translations and result['missing_translations']:
+            output += f'Missing translations: {stats.get_json()}\n'
+        return output
+
+    def print_status(self, locales : list):
+        for locale in locales:
+            print(self.get_status(locale), end='', flush=True)
+
+    # Polls the files until interrupted
+    def run(self, interval : float = DEFAULT_INTERVAL, debounce : float = DEFAULT_DEBOUNCE):
+        self.print_status(self.start())
+        print(f'Watching {len(self.locales)} locales in {self.store.locales_path} (Ctrl+C to stop)', flush=True)
+        pending = []
+        last_change = 0
+        try:
+            while True:
+                time.sleep(interval)
+                changed = self.poll()
+                if changed:
+                    pending.extend(locale for locale in changed if locale not in pending)
+                    last_change = time.monotonic()
+                elif pending and time.monotonic() - last_change >= debounce:
+                    self.print_status(self.update(pending))
+                    pending = []
+        except KeyboardInterrupt:
+            pass